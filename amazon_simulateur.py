@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Simulateur local d'Amazon JP (tests de charge et d'endurance)
+
+Sert des pages au format Amazon (recherche /s?k=, produit /dp/ASIN, page d'accueil)
+générées depuis manga_alerts.db et manga_collection.json, avec injection de pannes
+(503, captcha, page courte). Le scraper s'y branche via MANGAVEGA_AMAZON_URL.
+Un run sur le simulateur est isolé comme un --replay : BDD (copie de celle de
+production, ou MANGAVEGA_DB) et manga_collection.json dans un dossier de
+travail, ni Gist, ni push, ni email.
+
+Usage:
+    python amazon_simulateur.py --port 8787 --taux-503 0.05 --taux-captcha 0.02
+    MANGAVEGA_AMAZON_URL=http://127.0.0.1:8787 python app.py --cache-mode off
+
+    # Liste de séries ×10 (séries réelles + séries synthétiques) pour un test de charge
+    python amazon_simulateur.py --exporter-liste /tmp/charge/mangas_liste.json --facteur 10
+"""
+
+import argparse
+import asyncio
+import hashlib
+import html as html_lib
+import json
+import os
+import random
+import sqlite3
+import time
+from typing import Dict, List, Optional
+from urllib.parse import quote_plus
+
+from aiohttp import web
+
+import config
+from utils import normaliser_titre, strip_type_suffix
+
+logger = config.logger
+
+RESULTATS_PAR_PAGE = 16
+EDITEURS_SYNTHETIQUES = ['Kodansha', 'Shueisha', 'Shogakukan', 'Kadokawa', 'Hakusensha', 'Square Enix']
+_DOSSIER = os.path.dirname(os.path.abspath(__file__))
+
+
+def _empreinte(texte: str) -> str:
+    return hashlib.sha1(texte.encode('utf-8')).hexdigest()
+
+
+def asin_ebook(asin_papier: str) -> str:
+    """ASIN Kindle associé (stable) à un volume papier."""
+    return 'B0' + _empreinte('kindle:' + asin_papier)[:8].upper()
+
+
+class Catalogue:
+    """
+    Volumes servis par le simulateur, regroupés par série.
+
+    - Séries réelles : manga_collection.json + table volumes de manga_alerts.db
+    - Séries inconnues : volumes synthétiques déterministes générés à la volée
+      depuis le texte de la recherche (même requête → mêmes ASINs)
+    """
+    def __init__(self):
+        self.series = {}     # nom de série -> {asin: volume}
+        self.produits = {}   # asin papier -> volume
+        self.ebooks = {}     # asin Kindle -> asin papier
+
+    def ajouter(self, serie: str, asin: str, tome, date: str = None, editeur: str = None, titre: str = None):
+        if not asin or asin in self.produits:
+            return
+        try:
+            tome = int(float(tome)) if tome not in (None, '', '?', 'N/A') else None
+        except (TypeError, ValueError):
+            tome = None
+        volume = {
+            'serie': serie,
+            'asin': asin,
+            'tome': tome,
+            'date': (date or '2024/1/1').replace('-', '/'),
+            'editeur': editeur or 'Kodansha',
+            'titre': titre or (f"{serie} {tome}" if tome else serie),
+        }
+        self.series.setdefault(serie, {})[asin] = volume
+        self.produits[asin] = volume
+        self.ebooks[asin_ebook(asin)] = asin
+
+    def charger_collection(self, chemin: str) -> int:
+        if not os.path.exists(chemin):
+            return 0
+        with open(chemin, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        avant = len(self.produits)
+        for v in data.get('volumes', []):
+            self.ajouter(strip_type_suffix(v.get('nom', '')), v.get('asin'), v.get('tome'),
+                         v.get('date'), v.get('editeur'))
+        return len(self.produits) - avant
+
+    def charger_db(self, chemin: str) -> int:
+        if not os.path.exists(chemin):
+            return 0
+        conn = sqlite3.connect(chemin)
+        try:
+            rows = conn.execute('SELECT serie_jp, asin, tome, date_sortie_jp, editeur, titre_volume FROM volumes').fetchall()
+        except sqlite3.OperationalError:
+            rows = []  # Table absente ou schéma antérieur aux migrations
+        finally:
+            conn.close()
+        avant = len(self.produits)
+        for serie, asin, tome, date, editeur, titre in rows:
+            self.ajouter(strip_type_suffix(serie or ''), asin, tome, date, editeur, titre)
+        return len(self.produits) - avant
+
+    def _serie_synthetique(self, nom: str) -> Dict[str, Dict]:
+        graine = int(_empreinte(nom)[:8], 16)
+        rng = random.Random(graine)
+        editeur = rng.choice(EDITEURS_SYNTHETIQUES)
+        annee, mois = 2019 + rng.randint(0, 5), rng.randint(1, 12)
+        for tome in range(1, rng.randint(3, 24) + 1):
+            asin = '4' + str(int(_empreinte(f"{nom}:{tome}")[:12], 16))[-9:].zfill(9)
+            self.ajouter(nom, asin, tome, f"{annee}/{mois}/{rng.randint(1, 28)}", editeur)
+            mois += 3
+            if mois > 12:
+                annee, mois = annee + 1, mois - 12
+        return self.series[nom]
+
+    def rechercher(self, requete: str) -> List[Dict]:
+        """Volumes d'une recherche, triés par tome (la série synthétique si rien ne correspond)."""
+        requete = requete.strip().strip('"')
+        cle = normaliser_titre(requete)
+        volumes = []
+        for serie, vols in self.series.items():
+            cle_serie = normaliser_titre(serie)
+            if cle and (cle in cle_serie or cle_serie in cle):
+                volumes.extend(vols.values())
+        if not volumes and cle:
+            volumes = list(self._serie_synthetique(requete).values())
+        return sorted(volumes, key=lambda v: (v['serie'], v['tome'] or 0))
+
+
+class Pannes:
+    """Injection de pannes : chaque requête tire au sort 503, captcha, page courte ou rien."""
+    def __init__(self, taux_503: float = 0.0, taux_captcha: float = 0.0, taux_court: float = 0.0,
+                 latence_ms: float = 0.0, graine: int = None):
+        self.taux_503 = taux_503
+        self.taux_captcha = taux_captcha
+        self.taux_court = taux_court
+        self.latence = latence_ms / 1000.0
+        self._rng = random.Random(graine)
+
+    def tirer(self) -> Optional[str]:
+        x = self._rng.random()
+        if x < self.taux_503:
+            return '503'
+        x -= self.taux_503
+        if x < self.taux_captcha:
+            return 'captcha'
+        x -= self.taux_captcha
+        if x < self.taux_court:
+            return 'court'
+        return None
+
+    async def latence_reseau(self):
+        if self.latence:
+            await asyncio.sleep(self._rng.uniform(0.5, 1.5) * self.latence)
+
+
+# ============================================================================
+# GÉNÉRATION HTML (structure minimale lue par scraper.py / pipeline.py)
+# ============================================================================
+
+_BOURRAGE = '<div class="a-section nav-filler">' + ('<span class="a-size-small">&nbsp;</span>' * 400) + '</div>'
+
+
+def _e(texte) -> str:
+    return html_lib.escape(str(texte))
+
+
+def _page(titre: str, corps: str) -> str:
+    return (f'<!doctype html><html lang="ja-jp"><head><meta charset="utf-8"><title>{_e(titre)}</title></head>'
+            f'<body><div id="a-page">{_BOURRAGE}{corps}</div></body></html>')
+
+
+def page_accueil() -> str:
+    return _page('Amazon.co.jp', '<div id="nav-main"><a href="/s?k=manga">本</a></div>')
+
+
+def page_captcha() -> str:
+    return ('<!doctype html><html><head><title>Amazon.co.jp</title></head><body>'
+            '<h4>Type the characters you see in this image:</h4>'
+            '<form action="/errors/validateCaptcha"><img src="/captcha/Captcha_abcdef.jpg">'
+            '<input id="captchacharacters" name="field-keywords"></form>'
+            '<p>Sorry, we just need to make sure you\'re not a robot.</p></body></html>')
+
+
+def _item_recherche(volume: Dict, position: int, ebook: bool = False, sponsorise: str = None) -> str:
+    """sponsorise : 'click' (redirection /sspa/click) ou 'ref' (lien /dp/ direct, tag ref=..._sspa)."""
+    asin = asin_ebook(volume['asin']) if ebook else volume['asin']
+    titre = volume['titre'] + (' Kindle版' if ebook else '')
+    if sponsorise == 'click':
+        href = f"/sspa/click?ie=UTF8&spc=MTo&url=%2Fdp%2F{asin}"
+    elif sponsorise == 'ref':
+        href = f"/{quote_plus(volume['serie'][:20])}/dp/{asin}/ref=sr_1_{position}_sspa?psc=1&sp_csd=d2lkZ2V0TmFtZT1zcF9hdGY"
+    elif ebook:
+        href = f"/{quote_plus(volume['serie'][:20])}-ebook/dp/{asin}?ref=sr_1_{position}"
+    else:
+        href = f"/{quote_plus(volume['serie'][:20])}/dp/{asin}?ref=sr_1_{position}"
+    format_txt = 'Kindle版' if ebook else 'コミック'
+    return (f'<div data-asin="{asin}" data-index="{position}" data-component-type="s-search-result" '
+            f'class="s-result-item s-asin sg-col-inner">'
+            f'<div class="a-section"><h2 class="a-size-mini a-spacing-none">'
+            f'<a class="a-link-normal s-link-style a-text-normal" href="{_e(href)}">'
+            f'<span class="a-size-medium a-color-base a-text-normal">{_e(titre)}</span></a></h2>'
+            f'<div class="a-row"><span class="a-size-base a-color-secondary">{format_txt} – {_e(volume["date"])}</span></div>'
+            f'</div></div>')
+
+
+def page_recherche(volumes: List[Dict], requete: str, page: int) -> str:
+    """Page de résultats : RESULTATS_PAR_PAGE volumes + un doublon Kindle et deux sponsorisés par page
+    (les deux formes de lien d'Amazon : /sspa/click et /dp/ASIN/ref=..._sspa)."""
+    debut = (page - 1) * RESULTATS_PAR_PAGE
+    tranche = volumes[debut:debut + RESULTATS_PAR_PAGE]
+    items = []
+    for i, volume in enumerate(tranche, start=debut + 1):
+        items.append(_item_recherche(volume, i))
+    if tranche:
+        items.insert(1, _item_recherche(tranche[0], debut + 1, sponsorise='click'))
+        items.insert(3, _item_recherche(tranche[-1], debut + len(tranche), sponsorise='ref'))
+        items.append(_item_recherche(tranche[-1], debut + len(tranche), ebook=True))
+    derniere = debut + RESULTATS_PAR_PAGE >= len(volumes)
+    if derniere:
+        suivant = '<span class="s-pagination-item s-pagination-next s-pagination-disabled">次へ</span>'
+    else:
+        suivant = (f'<a class="s-pagination-item s-pagination-next" '
+                   f'href="/s?k={quote_plus(requete)}&amp;page={page + 1}">次へ</a>')
+    corps = (f'<div class="s-main-slot s-result-list">{"".join(items)}</div>'
+             f'<div class="s-pagination-container">{suivant if tranche else ""}</div>')
+    return _page(f'Amazon.co.jp : {requete}', corps)
+
+
+def _details(volume: Dict, format_txt: str) -> str:
+    return ('<div id="detailBulletsWrapper_feature_div"><div id="detailBullets_feature_div"><ul>'
+            f'<li><span class="a-list-item"><span class="a-text-bold">出版社 &rlm; : &lrm;</span>'
+            f'<span>{_e(volume["editeur"])} ({_e(volume["date"])})</span></span></li>'
+            f'<li><span class="a-list-item"><span class="a-text-bold">発売日 &rlm; : &lrm;</span>'
+            f'<span>{_e(volume["date"])}</span></span></li>'
+            '<li><span class="a-list-item"><span class="a-text-bold">言語 &rlm; : &lrm;</span><span>日本語</span></span></li>'
+            f'<li><span class="a-list-item"><span class="a-text-bold">{format_txt} &rlm; : &lrm;</span><span>192ページ</span></span></li>'
+            '</ul></div></div>')
+
+
+def page_produit(volume: Dict, serie: List[Dict]) -> str:
+    """Page /dp/ d'un volume papier : titre, formats (tmmSwatches), détails, lot de la série (pbnx)."""
+    ebook = asin_ebook(volume['asin'])
+    swatches = ('<div id="tmmSwatches"><ul class="a-unordered-list a-nostyle a-button-list a-horizontal">'
+                '<li class="swatchElement selected"><span class="a-button a-button-selected a-button-toggle">'
+                '<a href="javascript:void(0)" class="a-button-text">コミック</a></span></li>'
+                f'<li class="swatchElement unselected"><span class="a-button a-button-toggle">'
+                f'<a href="/-/dp/{ebook}" class="a-button-text">Kindle版 (電子書籍)</a></span></li>'
+                '</ul></div>')
+    lot = ''.join(
+        f'<div class="pbnx-single-product"><a class="a-link-normal" href="/dp/{v["asin"]}">'
+        f'<span>{v["tome"]}巻</span></a></div>'
+        for v in serie if v['tome'] is not None
+    )
+    bulk = (f'<div class="pbnx-desktop-box a-section"><span class="a-size-base a-text-bold">'
+            f'{_e(volume["serie"])} 新品まとめ買い</span>{lot}</div>') if lot else ''
+    corps = (f'<div id="wayfinding-breadcrumbs_feature_div"><ul><li>本</li><li>コミック・ラノベ・BL</li>'
+             f'<li>コミック</li></ul></div>'
+             f'<div id="centerCol"><h1 id="title"><span id="productTitle" class="a-size-extra-large">'
+             f'{_e(volume["titre"])}</span></h1>'
+             f'<img id="landingImage" src="https://m.media-amazon.com/images/I/{volume["asin"]}.jpg">'
+             f'{swatches}</div>{_details(volume, "コミック")}{bulk}')
+    return _page(volume['titre'], corps)
+
+
+def page_ebook(volume: Dict) -> str:
+    """Page Kindle : le swatch papier pointe vers le volume (extraire_version_papier)."""
+    swatches = ('<div id="tmmSwatches"><ul class="a-unordered-list a-nostyle a-button-list a-horizontal">'
+                '<li class="swatchElement selected"><span class="a-button a-button-selected a-button-toggle">'
+                '<a href="javascript:void(0)" class="a-button-text">Kindle版 (電子書籍)</a></span></li>'
+                f'<li class="swatchElement unselected"><span class="a-button a-button-toggle">'
+                f'<a href="/-/dp/{volume["asin"]}" class="a-button-text">コミック</a></span></li>'
+                '</ul></div>')
+    corps = (f'<div id="centerCol"><span id="productTitle">{_e(volume["titre"])} Kindle版</span>{swatches}</div>'
+             f'{_details(volume, "Kindle版")}')
+    return _page(volume['titre'], corps)
+
+
+# ============================================================================
+# SERVEUR
+# ============================================================================
+
+class SimulateurAmazon:
+    """Application aiohttp : routage des URLs Amazon, pannes et compteurs (/__stats)."""
+    def __init__(self, catalogue: Catalogue, pannes: Pannes):
+        self.catalogue = catalogue
+        self.pannes = pannes
+        self.stats = {'requetes': 0, 'recherche': 0, 'produit': 0, 'accueil': 0, 'introuvable': 0,
+                      '503': 0, 'captcha': 0, 'court': 0}
+        self._debut = time.monotonic()
+        self.app = web.Application()
+        self.app.router.add_get('/__stats', self.route_stats)
+        self.app.router.add_get('/{chemin:.*}', self.route_amazon)
+
+    async def route_stats(self, request: web.Request) -> web.Response:
+        duree = time.monotonic() - self._debut
+        return web.json_response({**self.stats, 'duree_s': round(duree, 1),
+                                  'req_par_s': round(self.stats['requetes'] / duree, 2) if duree else 0})
+
+    async def route_amazon(self, request: web.Request) -> web.Response:
+        self.stats['requetes'] += 1
+        await self.pannes.latence_reseau()
+        panne = self.pannes.tirer()
+        if panne:
+            self.stats[panne] += 1
+            if panne == '503':
+                return web.Response(status=503, text='<html><body>Service Unavailable</body></html>',
+                                    content_type='text/html')
+            if panne == 'captcha':
+                return web.Response(text=page_captcha(), content_type='text/html')
+            return web.Response(text='<html><body></body></html>', content_type='text/html')
+
+        chemin = request.path
+        if chemin == '/':
+            self.stats['accueil'] += 1
+            reponse = web.Response(text=page_accueil(), content_type='text/html')
+            if 'session-id' not in request.cookies:
+                reponse.set_cookie('session-id', f"355-{random.randint(1000000, 9999999)}-{random.randint(1000000, 9999999)}",
+                                   max_age=365 * 86400, domain=request.host.split(':')[0], path='/')
+                reponse.set_cookie('ubid-acbjp', f"358-{random.randint(1000000, 9999999)}",
+                                   max_age=365 * 86400, path='/')
+            return reponse
+        if chemin == '/s' or chemin.startswith('/s/'):
+            self.stats['recherche'] += 1
+            requete = request.query.get('k', '')
+            try:
+                page = max(1, int(request.query.get('page', 1)))
+            except ValueError:
+                page = 1
+            volumes = self.catalogue.rechercher(requete)
+            return web.Response(text=page_recherche(volumes, requete, page), content_type='text/html')
+        if '/dp/' in chemin or '/gp/product/' in chemin:
+            asin = chemin.rstrip('/').split('/')[-1][:10]
+            if asin in self.catalogue.ebooks:
+                self.stats['produit'] += 1
+                volume = self.catalogue.produits[self.catalogue.ebooks[asin]]
+                return web.Response(text=page_ebook(volume), content_type='text/html')
+            volume = self.catalogue.produits.get(asin)
+            if volume:
+                self.stats['produit'] += 1
+                serie = sorted(self.catalogue.series[volume['serie']].values(), key=lambda v: v['tome'] or 0)
+                return web.Response(text=page_produit(volume, serie), content_type='text/html')
+        self.stats['introuvable'] += 1
+        return web.Response(status=404, text='<html><body>Page introuvable</body></html>', content_type='text/html')
+
+
+def exporter_liste(catalogue: Catalogue, chemin: str, facteur: int):
+    """Écrit une liste de séries au format mangas_liste.json : séries réelles + synthétiques (× facteur)."""
+    noms = sorted(catalogue.series)
+    nb_total = max(len(noms), 1) * facteur
+    noms += [f"シミュレーション作品{i:04d}" for i in range(nb_total - len(noms))]
+    data = {
+        'version': '2.0',
+        'description': f'Liste de test de charge (simulateur, ×{facteur})',
+        'last_updated': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'mangas': [{'nom': f"{nom} [MANGA]", 'url_suffix': nom} for nom in noms],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    logger.info(f"📋 {len(noms)} série(s) exportée(s) dans {chemin}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur local d'Amazon JP (tests de charge)")
+    parser.add_argument('--hote', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--db', default=os.path.join(_DOSSIER, 'manga_alerts.db'))
+    parser.add_argument('--collection', default=os.path.join(_DOSSIER, 'manga_collection.json'))
+    parser.add_argument('--taux-503', type=float, default=0.0, help='Probabilité de réponse 503')
+    parser.add_argument('--taux-captcha', type=float, default=0.0, help='Probabilité de page captcha')
+    parser.add_argument('--taux-court', type=float, default=0.0, help='Probabilité de corps vide')
+    parser.add_argument('--latence-ms', type=float, default=0.0, help='Latence simulée moyenne (ms)')
+    parser.add_argument('--graine', type=int, default=None, help='Graine des pannes (run reproductible)')
+    parser.add_argument('--exporter-liste', metavar='FICHIER',
+                        help='Écrire une liste de séries (format mangas_liste.json) puis quitter')
+    parser.add_argument('--facteur', type=int, default=1, help='Multiplicateur du nombre de séries exportées')
+    args = parser.parse_args()
+
+    catalogue = Catalogue()
+    nb_collection = catalogue.charger_collection(args.collection)
+    nb_db = catalogue.charger_db(args.db)
+    logger.info(f"📚 Catalogue: {len(catalogue.series)} série(s), {len(catalogue.produits)} volume(s) "
+                f"({nb_collection} collection, {nb_db} BDD)")
+
+    if args.exporter_liste:
+        exporter_liste(catalogue, args.exporter_liste, max(1, args.facteur))
+        return
+
+    pannes = Pannes(args.taux_503, args.taux_captcha, args.taux_court, args.latence_ms, args.graine)
+    simulateur = SimulateurAmazon(catalogue, pannes)
+    logger.info(f"🧪 Simulateur Amazon sur http://{args.hote}:{args.port} "
+                f"(503 {args.taux_503:.0%}, captcha {args.taux_captcha:.0%}, court {args.taux_court:.0%})")
+    web.run_app(simulateur.app, host=args.hote, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
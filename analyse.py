@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Analyse HTML hors de la boucle asyncio (pool de processus ou de threads)
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+import config
+from pages import ProductPage, SearchResult, page_produit, page_recherche, _PAGES_PRODUIT, _PAGES_RECHERCHE
+from reponses import PageHtml, decoder
+
+logger = config.logger
+
+# Modes acceptés par config.ANALYSE_MODE
+MODES_ANALYSE = ('process', 'thread', 'inline')
+
+
+# ============================================================================
+# CÔTÉ WORKER : fonctions de module (picklables), résultats en dict / tuples
+# ============================================================================
+
+# Dernières pages produit analysées par ce processus : Bulk puis vérification
+# d'une même page tombant sur le même worker ne la reparsent pas
+_PAGES_WORKER = OrderedDict()
+
+
+def _init_worker():
+    # Ctrl-C est géré par le processus principal (qui ferme le pool)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _texte(contenu: Union[bytes, str]) -> str:
+    return decoder(contenu) if isinstance(contenu, bytes) else contenu
+
+
+def _page_worker(contenu: Union[bytes, str], moteur: str) -> ProductPage:
+    html = _texte(contenu)
+    cle = (moteur, html)
+    page = _PAGES_WORKER.get(cle)
+    if page is None:
+        page = _PAGES_PRODUIT[moteur](html)
+        _PAGES_WORKER[cle] = page
+        while len(_PAGES_WORKER) > config.ANALYSE_PAGES_WORKER:
+            _PAGES_WORKER.popitem(last=False)
+    else:
+        _PAGES_WORKER.move_to_end(cle)
+    return page
+
+
+def _infos_produit(contenu, moteur: str, debug: bool) -> Dict:
+    return _page_worker(contenu, moteur).infos(debug)
+
+
+def _version_papier(contenu, moteur: str, format_cible: Optional[str], debug: bool) -> Optional[str]:
+    return _page_worker(contenu, moteur).version_papier(format_cible, debug)
+
+
+def _volumes_lies(contenu, moteur: str, asin: str, nom_manga: str, sources: List[str]) -> Dict:
+    return _page_worker(contenu, moteur).volumes_lies(asin, nom_manga, sources)
+
+
+def _recherche(contenu, moteur: str) -> Tuple[bool, List[Tuple]]:
+    page = _PAGES_RECHERCHE[moteur](_texte(contenu))
+    return page.derniere_page, [r.champs() for r in page.resultats]
+
+
+# ============================================================================
+# CÔTÉ BOUCLE
+# ============================================================================
+
+class ExecuteurAnalyse:
+    """
+    Exécute les extracteurs HTML (pages.py) hors de la boucle asyncio.
+
+    - 'process' : pool de processus (fork), le parsing utilise plusieurs cœurs
+      et se superpose aux attentes réseau ; le HTML part en octets UTF-8,
+      les résultats reviennent en dict / tuples
+    - 'thread'  : pool de threads (la boucle reste réactive, un seul cœur)
+    - 'inline'  : appel direct, comme avant (débogage, tests)
+
+    Sans fork (Windows), 'process' se replie sur 'thread' : un worker lancé en
+    'spawn' réimporterait config et tronquerait le log du run. Le mode diff des
+    moteurs (config.MOTEUR_EXTRACTION = 'diff') s'exécute toujours en ligne
+    pour que ses compteurs restent dans le processus principal.
+
+    En mode process, chaque résultat est aussi mémorisé sur la PageHtml (attribut
+    analyses) : un même extracteur n'est jamais relancé sur la même page.
+    """
+    def __init__(self, mode: str = None, workers: int = None):
+        mode = mode or config.ANALYSE_MODE
+        if mode not in MODES_ANALYSE:
+            raise ValueError(f"Mode d'analyse inconnu: {mode} (attendu: {', '.join(MODES_ANALYSE)})")
+        if mode == 'process' and 'fork' not in multiprocessing.get_all_start_methods():
+            mode = 'thread'
+        self.mode = mode
+        self.workers = workers or config.ANALYSE_WORKERS
+        self._pool = None
+        self.stats = {'produit': 0, 'recherche': 0, 'memo': 0}
+
+    def demarrer(self):
+        """Crée le pool. En mode process, les workers sont forkés tout de suite,
+        avant que les sessions HTTP ne lancent leurs propres threads."""
+        if self._pool is not None or self.mode == 'inline':
+            return
+        if self.mode == 'process':
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('fork'),
+                                             initializer=_init_worker)
+            self._pool.submit(_ping).result()
+        else:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='analyse')
+        logger.info(f"🧮 Analyse HTML: {self.mode} × {self.workers} worker(s)")
+
+    def fermer(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def _lancer(self, html: str, local, cle: Tuple, fonction, *args):
+        """
+        Exécute un extracteur : local() en ligne ou dans un thread (ProductPage
+        mémorisée sur la page), fonction(html, moteur, *args) dans un worker
+        sinon, avec résultat mémorisé sur la PageHtml.
+        """
+        if self.mode == 'inline' or config.MOTEUR_EXTRACTION == 'diff':
+            return local()
+        self.demarrer()
+        boucle = asyncio.get_running_loop()
+        if self.mode == 'thread':
+            return await boucle.run_in_executor(self._pool, local)
+        analyses = getattr(html, 'analyses', None)
+        if analyses is not None and cle in analyses:
+            self.stats['memo'] += 1
+            return analyses[cle]
+        resultat = await boucle.run_in_executor(
+            self._pool, fonction, html.encode('utf-8'), config.MOTEUR_EXTRACTION, *args)
+        if isinstance(html, PageHtml):
+            if html.analyses is None:
+                html.analyses = {}
+            html.analyses[cle] = resultat
+        return resultat
+
+    async def infos_produit(self, html: str, debug: bool = False) -> Dict:
+        self.stats['produit'] += 1
+        infos = await self._lancer(html, lambda: page_produit(html).infos(debug),
+                                   ('infos', debug), _infos_produit, debug)
+        return dict(infos)  # les appelants complètent le dict
+
+    async def version_papier(self, html: str, format_cible: str = None, debug: bool = False) -> Optional[str]:
+        self.stats['produit'] += 1
+        return await self._lancer(html, lambda: page_produit(html).version_papier(format_cible, debug),
+                                  ('papier', format_cible), _version_papier, format_cible, debug)
+
+    async def volumes_lies(self, html: str, asin: str, nom_manga: str, sources: List[str]) -> Dict:
+        self.stats['produit'] += 1
+        result = await self._lancer(html, lambda: page_produit(html).volumes_lies(asin, nom_manga, sources),
+                                    ('volumes', asin, nom_manga, tuple(sources)),
+                                    _volumes_lies, asin, nom_manga, list(sources))
+        return {k: (dict(v) if isinstance(v, dict) else list(v)) for k, v in result.items()}
+
+    async def recherche(self, html: str) -> Tuple[bool, List[SearchResult]]:
+        """(dernière page ?, résultats) d'une page de recherche."""
+        self.stats['recherche'] += 1
+
+        def local():
+            page = page_recherche(html)
+            return page.derniere_page, page.resultats
+
+        resultat = await self._lancer(html, local, ('recherche',), _recherche)
+        if self.mode != 'process' or config.MOTEUR_EXTRACTION == 'diff':
+            return resultat
+        derniere_page, champs = resultat
+        return derniere_page, [SearchResult.depuis_champs(c) for c in champs]
+
+    def log_resume(self):
+        s = self.stats
+        if s['produit'] or s['recherche']:
+            logger.info(f"🧮 Analyse HTML ({self.mode}): {s['produit']} extraction(s) produit, "
+                        f"{s['recherche']} page(s) de recherche, {s['memo']} resservie(s) depuis la page")
+
+
+EXECUTEUR = ExecuteurAnalyse()
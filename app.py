@@ -8,22 +8,50 @@ import asyncio
 import json
 import os
 import re
-import random
+import shutil
 import sys
+import tempfile
 import traceback as tb
 from datetime import datetime
 from typing import Dict
 
 import config
+import database
 from database import DatabaseManager
 import utils
 import sync
 import notifications
 import pipeline
-from scraper import SessionWrapper
+from pages import DIFF_MOTEURS
+from planificateur import PlanificateurSeries
+from etages import METRIQUES_ETAGES
+from fraicheur import POLITIQUE_FRAICHEUR
+from scraper import SessionWrapper, pause
 
 logger = config.logger
 
+COLLECTION_FILE = 'manga_collection.json'
+
+
+def _isoler_run(args, mode: str):
+    """
+    --replay ou simulateur (MANGAVEGA_AMAZON_URL) : BDD et manga_collection.json
+    dans un dossier de travail, pour ne rien modifier de l'état de production.
+    La BDD de production y est copiée (même état de départ qu'un vrai run), sauf
+    si MANGAVEGA_DB en désigne une. Ni Gist, ni push, ni email.
+    """
+    args.isole = True
+    args.no_push = True
+    args.no_email = True
+    dossier = tempfile.mkdtemp(prefix=f'mangavega_{mode}_')
+    args.db = os.environ.get('MANGAVEGA_DB')
+    if not args.db:
+        args.db = os.path.join(dossier, os.path.basename(database._DEFAULT_DB_PATH))
+        if os.path.exists(database._DEFAULT_DB_PATH):
+            shutil.copy2(database._DEFAULT_DB_PATH, args.db)
+    args.collection = os.path.join(dossier, COLLECTION_FILE)
+    logger.info(f"🎞️  Run isolé ({mode}): BDD {args.db}, collection {args.collection}")
+
 
 async def main():
     import argparse
@@ -36,20 +64,41 @@ async def main():
     parser.add_argument('--no-push', action='store_true', help='Ne pas faire git push à la fin')
     parser.add_argument('--no-email', action='store_true', help='Ne pas envoyer les emails')
     parser.add_argument('--reverifier-traductions', action='store_true', help='Re-vérifier les traductions non-officielles')
+    parser.add_argument('--cache-mode', choices=['off', 'read-write', 'read-only'], default=config.CACHE_HTTP_MODE,
+                        help='Cache disque des pages Amazon (défaut: %(default)s)')
+    parser.add_argument('--moteur', choices=config.MOTEURS_EXTRACTION, default=config.MOTEUR_EXTRACTION,
+                        help="Moteur d'extraction HTML ; 'diff' compare bs4 et lxml sur chaque page (défaut: %(default)s)")
+    parser.add_argument('--series-concurrentes', type=int, default=config.SERIES_CONCURRENTES, metavar='N',
+                        help='Séries scannées en même temps, cadence réseau inchangée (défaut: %(default)s)')
+    parser.add_argument('--precommandes', action='store_true',
+                        help='Re-vérifier uniquement les précommandes dues (liste de suivi), sans scanner les séries')
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', metavar='DIR',
+                         help='Archiver chaque réponse HTTP (URL, statut, corps, durée) dans DIR')
+    archive.add_argument('--replay', metavar='DIR',
+                         help='Rejouer une archive --record : aucun accès réseau, aucune pause (implique --no-push --no-email)')
     args = parser.parse_args()
+    args.db = None
+    args.collection = COLLECTION_FILE
+    args.isole = False
+    if args.replay:
+        _isoler_run(args, 'rejeu')
+    elif config.AMAZON_SIMULE:
+        _isoler_run(args, 'simulateur')
+    config.MOTEUR_EXTRACTION = args.moteur
     
     # Mode re-vérification traductions
     if args.reverifier_traductions:
         logger.info("\n" + "="*80)
         logger.info(f"🔄 MODE RE-VÉRIFICATION TRADUCTIONS")
         logger.info("="*80)
-        db = DatabaseManager()
+        db = DatabaseManager(args.db)
         await pipeline.reverifier_toutes_traductions(db)
         return
     
     # Mode liste BDD
     if args.list:
-        db = DatabaseManager()
+        db = DatabaseManager(args.db)
         db.init_table_volumes()
         db.init_table_editeurs()
         conn = db._get_conn()
@@ -121,7 +170,7 @@ async def _main_inner(args):
     logger.info("="*80)
     
     debut = datetime.now()
-    db = DatabaseManager()
+    db = DatabaseManager(args.db)
     
     # INITIALISATION : Créer/vérifier les tables volumes et editeurs
     logger.info("\n📦 Initialisation de la base de données...")
@@ -168,8 +217,10 @@ async def _main_inner(args):
     except Exception as e:
         logger.warning(f"   ⚠️  Migration featured_history: {e}")
     
-    # Charger la configuration depuis le Gist GitHub (viewer sync)
-    sync.charger_gist_config()
+    # Charger la configuration depuis le Gist GitHub (viewer sync) ; pas en run isolé
+    # (rejeu, simulateur) : les modifications du Gist ne doivent pas être consommées
+    if not args.isole:
+        sync.charger_gist_config()
     
     # Charger les corrections manuelles (depuis Gist + BDD + fichier JSON)
     sync.charger_corrections(db)
@@ -277,19 +328,28 @@ async def _main_inner(args):
     logger.info(f"   🥉 {p3} série(s) sans cache ni référence (à la fin)")
     logger.info("")
     
-    # NOTE: Le délai initial de 5 minutes a été testé mais n'aide pas
-    # Le rate limit Amazon semble basé sur l'IP, pas sur le timing
-    # On garde juste un petit délai de 10s pour "chauffer" la connexion
-    import os
-    if os.environ.get('GITHUB_ACTIONS'):
-        logger.info(f"⏳ GitHub Actions détecté - Petit délai de 10s avant le scan...")
-        await asyncio.sleep(10)
-    
-    # SÉQUENTIEL (un par un) avec délais anti-rate-limit
-    async with SessionWrapper() as session:
+    # Séries en parallèle (planificateur borné), cadence fixée par le pacer partagé
+    async with SessionWrapper(cache_mode=args.cache_mode, record=args.record, replay=args.replay) as session:
+        # NOTE: Le délai initial de 5 minutes a été testé mais n'aide pas
+        # Le rate limit Amazon semble basé sur l'IP, pas sur le timing
+        # On garde juste un petit délai de 10s pour "chauffer" la connexion,
+        # inutile si la session du run précédent a été restaurée
+        import os
+        if os.environ.get('GITHUB_ACTIONS') and not session.cookies_restaures:
+            logger.info(f"⏳ GitHub Actions détecté - Petit délai de 10s avant le scan...")
+            await pause(session, 10)
+        
         # Warm-up : visiter amazon.co.jp pour obtenir les cookies de session
+        # (ignoré si le jar restauré est encore valide)
         await session.warm_up()
         
+        # Précommandes alertées dues (liste de suivi) : re-vérifiées avant le scan,
+        # la Phase B des séries relit ensuite leurs dates dans le cache de vérification
+        toutes_nouveautes.extend(await pipeline.verifier_precommandes(session, db))
+        if args.precommandes:
+            logger.info("📌 Mode --precommandes : scan des séries ignoré")
+            mangas_tries = []
+        
         series_echouees = []  # Séries avec 0 résultat (probable 503)
         
         async def scanner_serie(manga, index, total, est_retry=False):
@@ -312,8 +372,8 @@ async def _main_inner(args):
                 urls_supplementaires=urls_supplementaires if urls_supplementaires else None
             )
             
-            # Nettoyage URLs supplémentaires du Gist
-            if urls_supplementaires:
+            # Nettoyage URLs supplémentaires du Gist (pas en run isolé : rien n'a été scanné sur Amazon)
+            if urls_supplementaires and not args.isole:
                 serie_nom = manga['nom']
                 if config.GIST_SERIES_CONFIG.get('urls_supplementaires', {}).get(serie_nom):
                     del config.GIST_SERIES_CONFIG['urls_supplementaires'][serie_nom]
@@ -339,43 +399,40 @@ async def _main_inner(args):
             return nouveautes, papiers
         
         # === BOUCLE PRINCIPALE ===
-        for i, manga in enumerate(mangas_tries, 1):
-          try:
-            nouveautes, papiers = await scanner_serie(manga, i, len(mangas_tries))
+        # Jusqu'à config.SERIES_CONCURRENTES séries en vol, dans l'ordre de priorité ;
+        # résultats fusionnés dans cet ordre (même manga_collection.json qu'en séquentiel)
+        async def scanner_serie_planifiee(manga, i, total):
+            try:
+                nouveautes, papiers = await scanner_serie(manga, i, total)
+            except Exception as e:
+                logger.error(f"❌ ERREUR pour {manga.get('nom', '?')}: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
+                return None
+            
+            # La cadence entre requêtes est gérée par session.pacer (budget req/min) :
+            # plus de pauses fixes entre séries, sauf récupération après blocage
+            # (la place de la série dans le planificateur reste prise pendant la pause)
+            if i < total:
+                serie_bloquee = (len(papiers) == 0 and len(nouveautes) == 0)
+                if serie_bloquee:
+                    logger.info(f"   ⏸️  Pause de 15s (récupération après blocage)...")
+                    await pause(session, 15)
+            return nouveautes, papiers
+        
+        planificateur = PlanificateurSeries(args.series_concurrentes)
+        resultats_series = await planificateur.executer(mangas_tries, scanner_serie_planifiee)
+        for manga, resultat in zip(mangas_tries, resultats_series):
+            if resultat is None:
+                series_echouees.append(manga)
+                continue
+            nouveautes, papiers = resultat
             toutes_nouveautes.extend(nouveautes)
             tous_papiers.extend(papiers)
             
             # Détecter les séries bloquées (0 résultat)
             if len(papiers) == 0:
                 series_echouees.append(manga)
-            
-            # Pause à mi-parcours pour éviter les 503
-            if i == 28:  # À la moitié des 55 mangas
-                logger.info("\n" + "="*80)
-                logger.info("⏸️  PAUSE LONGUE DE 60 SECONDES À MI-PARCOURS")
-                logger.info("    (Pour éviter le rate limiting Amazon)")
-                logger.info("="*80 + "\n")
-                await asyncio.sleep(60)
-            
-            # Délai adaptatif entre mangas
-            if i < len(mangas_tries):
-                serie_bloquee = (len(papiers) == 0 and len(nouveautes) == 0)
-                
-                if i % 15 == 0:  # Pause tous les 15 mangas
-                    logger.info(f"\n⏸️  Pause de 8s après {i} mangas pour éviter le rate limiting...")
-                    await asyncio.sleep(8)
-                elif serie_bloquee:
-                    logger.info(f"   ⏸️  Pause de 15s (récupération après blocage)...")
-                    await asyncio.sleep(15)
-                else:
-                    await asyncio.sleep(random.uniform(1.5, 3))
-          
-          except Exception as e:
-            logger.error(f"❌ ERREUR pour {manga.get('nom', '?')}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
-            series_echouees.append(manga)
-            continue
         
         # === RETRY DES SÉRIES ÉCHOUÉES ===
         # À ce stade les cookies sont établis, les retries ont de bonnes chances de passer
@@ -384,7 +441,7 @@ async def _main_inner(args):
             logger.info(f"🔄 RETRY: {len(series_echouees)} série(s) sans résultat lors du premier passage")
             logger.info("   (Les cookies sont maintenant établis, retry après 30s de pause)")
             logger.info("="*80)
-            await asyncio.sleep(30)
+            await pause(session, 30)
             
             nb_recuperees = 0
             for j, manga in enumerate(series_echouees, 1):
@@ -399,10 +456,6 @@ async def _main_inner(args):
                     logger.info(f"   ✅ Récupérée: {len(papiers)} volume(s)")
                 else:
                     logger.warning(f"   ❌ Toujours aucun résultat")
-                
-                # Délai entre retries
-                if j < len(series_echouees):
-                    await asyncio.sleep(random.uniform(3, 6))
               
               except Exception as e:
                 logger.error(f"❌ ERREUR retry {manga.get('nom', '?')}: {e}")
@@ -413,7 +466,17 @@ async def _main_inner(args):
         # === CORRECTION DES TOMES MANQUANTS ===
         # Recherche les numéros de tome pour les volumes validés manuellement 
         # qui ont un tome = ? ou N/A (souvent des URLs ajoutées manuellement)
-        tomes_corriges = await pipeline.corriger_tomes_manquants(session, db, logger)
+        if not args.precommandes:
+            tomes_corriges = await pipeline.corriger_tomes_manquants(session, db, logger)
+        
+        planificateur.log_resume()
+        METRIQUES_ETAGES.log_resume()
+        POLITIQUE_FRAICHEUR.log_resume()
+        session.pacer.log_resume()
+        session.throttle.log_resume()
+        session.log_sante()
+        DIFF_MOTEURS.log_resume()
+        utils.log_regles_tome()
 
         # === SUIVI ÉDITORIAL ===
         today_str = datetime.now().strftime('%Y-%m-%d')
@@ -540,15 +603,18 @@ async def _main_inner(args):
             },
             "volumes": volumes_avec_statut
         }
-        with open('manga_collection.json', 'w', encoding='utf-8') as f:
+        with open(args.collection, 'w', encoding='utf-8') as f:
             json.dump(json_data, f, ensure_ascii=False, indent=2)
-        logger.info("📋 JSON collection: manga_collection.json")
+        logger.info(f"📋 JSON collection: {args.collection}")
     
     # === SAUVEGARDE DU GIST (nettoyage URLs traitées) ===
-    try:
-        sync.sauvegarder_gist_config()
-    except Exception as e:
-        logger.warning(f"⚠️  Erreur sauvegarde Gist (non-bloquant): {e}")
+    if args.isole:
+        logger.info("☁️  Gist non sauvegardé (run isolé)")
+    else:
+        try:
+            sync.sauvegarder_gist_config()
+        except Exception as e:
+            logger.warning(f"⚠️  Erreur sauvegarde Gist (non-bloquant): {e}")
     
     if args.no_email:
         logger.info("📧 Emails désactivés (--no-email)")
@@ -559,8 +625,8 @@ async def _main_inner(args):
         except Exception as e:
             logger.warning(f"⚠️  Erreur envoi email nouveautés (non-bloquant): {e}")
     
-    # Toujours envoyer un rapport de synthèse (sauf --no-email)
-    if not args.no_email:
+    # Toujours envoyer un rapport de synthèse (sauf --no-email et --precommandes)
+    if not args.no_email and not args.precommandes:
         try:
             notifications.envoyer_email_rapport(config.EMAIL_DESTINATAIRE, len(config.MANGAS_A_SUIVRE), len(tous_papiers), len(toutes_nouveautes), nb_non_traites, duree)
         except Exception as e:
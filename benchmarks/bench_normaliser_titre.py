@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Benchmark de utils.normaliser_titre
+
+Corpus de titres réels :
+- noms de séries suivies (mangas_liste.json) et de la collection (manga_collection.json)
+- titres de volumes, de résultats Featured et du cache de vérification (BDD, si présente)
+- titres des pages de recherche d'une archive --record (--archive DIR)
++ déclinaisons "série N (label)" pour approcher la forme des titres Amazon.
+
+Compare l'implémentation d'origine (remplacements chaînés, recopiée ici comme
+référence) à la version table de traduction + substitution unique, avec et sans
+le cache LRU, et vérifie que les résultats sont identiques.
+
+Usage : python benchmarks/bench_normaliser_titre.py [--db manga_alerts.db] [--archive DIR] [--repetitions 5]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import unicodedata
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import utils  # noqa: E402
+
+LABELS = ['(花とゆめコミックス)', '(ジャンプコミックス)', '（角川スニーカー文庫）', '(MFC)', '（完）', '']
+
+
+def normaliser_titre_reference(texte: str) -> str:
+    """Implémentation d'origine de utils.normaliser_titre (remplacements chaînés)."""
+    texte = unicodedata.normalize('NFKC', texte)
+    greek_to_latin = {
+        'Α': 'A', 'Β': 'B', 'Ε': 'E', 'Ζ': 'Z', 'Η': 'H', 'Ι': 'I',
+        'Κ': 'K', 'Μ': 'M', 'Ν': 'N', 'Ο': 'O', 'Ρ': 'P', 'Τ': 'T',
+        'Υ': 'Y', 'Χ': 'X',
+        'α': 'a', 'β': 'b', 'ε': 'e', 'ζ': 'z', 'η': 'h', 'ι': 'i',
+        'κ': 'k', 'μ': 'm', 'ν': 'n', 'ο': 'o', 'ρ': 'p', 'τ': 't',
+        'υ': 'y', 'χ': 'x',
+    }
+    for greek, latin in greek_to_latin.items():
+        texte = texte.replace(greek, latin)
+    for ch in ['―', '─', '—', '–', '−', '〜', '～']:
+        texte = texte.replace(ch, '-')
+    texte = texte.replace('！', '!').replace('？', '?')
+    texte = texte.replace('（', '(').replace('）', ')')
+    texte = texte.replace('：', ':').replace('；', ';')
+    texte = texte.replace('，', ',').replace('。', '.')
+    equivalences = [
+        ('わたし', '私'), ('わたしの', '私の'), ('ぼく', '僕'),
+        ('おれ', '俺'), ('かれ', '彼'), ('かのじょ', '彼女'),
+    ]
+    for hiragana, kanji in equivalences:
+        texte = texte.replace(hiragana, kanji)
+    texte = ' '.join(texte.split())
+    return texte.strip()
+
+
+def _titres_json() -> list:
+    titres = []
+    chemin = os.path.join(RACINE, 'mangas_liste.json')
+    if os.path.exists(chemin):
+        with open(chemin, 'r', encoding='utf-8') as f:
+            for manga in json.load(f).get('mangas', []):
+                titres += [manga.get('nom', ''), manga.get('url_suffix', '')]
+    chemin = os.path.join(RACINE, 'manga_collection.json')
+    if os.path.exists(chemin):
+        with open(chemin, 'r', encoding='utf-8') as f:
+            for volume in json.load(f).get('volumes', []):
+                titres += [volume.get('nom', ''), volume.get('serie_recherchee', '')]
+    return [t for t in titres if t]
+
+
+def _titres_bdd(chemin: str) -> list:
+    if not chemin or not os.path.exists(chemin):
+        return []
+    titres = []
+    conn = sqlite3.connect(f"file:{chemin}?mode=ro", uri=True)
+    for requete in ('SELECT titre_volume FROM volumes', 'SELECT titre FROM featured_history',
+                    'SELECT titre FROM verifications_cache'):
+        try:
+            titres += [row[0] for row in conn.execute(requete) if row[0]]
+        except sqlite3.Error:
+            pass
+    conn.close()
+    return titres
+
+
+def _titres_archive(dossier: str) -> list:
+    if not dossier:
+        return []
+    from pages import PageRecherche, _pages_a_comparer
+    titres = []
+    for source, html in _pages_a_comparer([dossier]):
+        if '/s?' in source:
+            titres += [r.titre for r in PageRecherche(html).resultats if r.titre]
+    return titres
+
+
+def construire_corpus(db: str, archive: str) -> list:
+    series = sorted(set(_titres_json()))
+    reels = _titres_bdd(db) + _titres_archive(archive)
+    declinaisons = [f"{utils.strip_type_suffix(nom)} {n} {label}".strip()
+                    for nom in series for n, label in zip(range(1, 13), LABELS * 2)]
+    print(f"Corpus: {len(series)} nom(s) de série, {len(reels)} titre(s) BDD/archive, "
+          f"{len(declinaisons)} déclinaison(s) 'série N (label)'")
+    return series + reels + declinaisons
+
+
+def chronometrer(fonction, titres: list, repetitions: int) -> float:
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        for titre in titres:
+            fonction(titre)
+    return time.perf_counter() - debut
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de utils.normaliser_titre")
+    parser.add_argument('--db', default=os.environ.get('MANGAVEGA_DB') or os.path.join(RACINE, 'manga_alerts.db'))
+    parser.add_argument('--archive', help="Archive --record (titres des pages de recherche)")
+    parser.add_argument('--repetitions', type=int, default=5,
+                        help="Passes sur le corpus (un scan renormalise les mêmes titres)")
+    args = parser.parse_args()
+
+    corpus = construire_corpus(args.db, args.archive)
+    ecarts = [t for t in corpus if normaliser_titre_reference(t) != utils.normaliser_titre(t)]
+    if ecarts:
+        print(f"❌ {len(ecarts)} titre(s) normalisé(s) différemment, ex: {ecarts[0]!r}")
+        return 1
+
+    n = len(corpus) * args.repetitions
+    temps_ref = chronometrer(normaliser_titre_reference, corpus, args.repetitions)
+    temps_sans_cache = chronometrer(utils.normaliser_titre.__wrapped__, corpus, args.repetitions)
+    utils.normaliser_titre.cache_clear()
+    temps_cache = chronometrer(utils.normaliser_titre, corpus, args.repetitions)
+
+    print(f"{'implémentation':<28}{'titres/s':>14}{'µs/titre':>10}{'gain':>8}")
+    for nom, temps in (('référence (replace chaînés)', temps_ref),
+                       ('translate + regex', temps_sans_cache),
+                       ('translate + regex + LRU', temps_cache)):
+        print(f"{nom:<28}{n / temps:>14,.0f}{temps * 1e6 / n:>10.2f}{temps_ref / temps:>7.1f}x")
+    print(f"Cache LRU: {utils.normaliser_titre.cache_info()}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Benchmark des extracteurs HTML et des fonctions de titre
+
+Corpus : archive au format --record. Par défaut benchmarks/corpus_synthetique/,
+généré par le simulateur (construire_corpus.py) : des pages d'environ 1 Ko qui
+exercent les extracteurs mais ne mesurent pas le parsing des vraies pages /dp/
+(300 à 800 Ko). Ces chiffres ne servent qu'à comparer deux versions du code
+entre elles ; pour des performances de parsing, --corpus DIR sur une archive
+--record de pages réelles.
+
+Mesures (pages.py en ligne, sans pool : c'est le travail fait par les workers
+d'analyse.py derrière les extracteurs async de scraper.py) :
+- extraire_infos_produit       : parsing + infos() des pages produit, Kindle et captcha
+- extraire_volumes_depuis_page : parsing + volumes_lies() (lot 新品まとめ買い, From the Publisher)
+- extraire_version_papier      : parsing + version_papier() des pages Kindle et captcha
+- extraire_item_amazon/featured: parsing de la grille + SearchResult et infos_resultat par résultat
+- extraire_numero_tome, normaliser_titre : titres du corpus et de bench_normaliser_titre, caches vidés
+
+Chaque mesure donne le débit (meilleure de N passes) et le pic mémoire
+(tracemalloc, sur une passe séparée pour ne pas fausser le chrono ; seules les
+allocations Python sont vues, pas celles de libxml2 avec le moteur lxml).
+
+Usage :
+    python benchmarks/bench_parseurs.py --enregistrer benchmarks/baseline.json   # avant la refonte
+    python benchmarks/bench_parseurs.py --comparer benchmarks/baseline.json      # après : écarts en %
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import config  # noqa: E402
+import utils  # noqa: E402
+from http_archive import archive_synthetique  # noqa: E402
+from pages import (  # noqa: E402
+    SearchResult, _PAGES_PRODUIT, _PAGES_RECHERCHE, _pages_a_comparer, date_format_item, infos_resultat,
+)
+from bench_normaliser_titre import construire_corpus as corpus_titres  # noqa: E402
+
+CORPUS_DEFAUT = os.path.join(RACINE, 'benchmarks', 'corpus_synthetique')
+SOURCES_VOLUMES = ['bulk', 'publisher']
+
+
+# ============================================================================
+# CORPUS
+# ============================================================================
+
+def charger_corpus(chemin: str) -> dict:
+    """Pages du corpus rangées par type (les captchas vont avec le type de l'URL demandée)."""
+    corpus = {'produit': [], 'kindle': [], 'recherche': [], 'captcha': 0, 'empreinte': hashlib.sha1()}
+    for url, html in _pages_a_comparer([chemin]):
+        corpus['empreinte'].update(html.encode('utf-8'))
+        if 'captcha' in html.lower() and len(html) < 5000:
+            corpus['captcha'] += 1
+        if '/s?' in url:
+            corpus['recherche'].append(html)
+        elif '/dp/' in url:
+            asin = utils.extraire_asin(url)
+            corpus['kindle' if asin.startswith('B') else 'produit'].append((asin, html))
+    corpus['empreinte'] = corpus['empreinte'].hexdigest()[:12]
+    return corpus
+
+
+def titres_corpus(corpus: dict, moteur: str, db: str) -> list:
+    titres = []
+    for html in corpus['recherche']:
+        titres += [r.titre for r in _PAGES_RECHERCHE[moteur](html).resultats if r.titre]
+    for _, html in corpus['produit'] + corpus['kindle']:
+        titre = _PAGES_PRODUIT[moteur](html).titre
+        if titre:
+            titres.append(titre)
+    return titres + corpus_titres(db, None)
+
+
+# ============================================================================
+# MESURES
+# ============================================================================
+
+def _bench_infos_produit(corpus, moteur):
+    classe = _PAGES_PRODUIT[moteur]
+    pages = [html for _, html in corpus['produit'] + corpus['kindle']]
+
+    def passe():
+        for html in pages:
+            classe(html).infos()
+    return passe, len(pages), 'pages'
+
+
+def _bench_volumes(corpus, moteur):
+    classe = _PAGES_PRODUIT[moteur]
+    pages = corpus['produit']
+
+    def passe():
+        for asin, html in pages:
+            classe(html).volumes_lies(asin, 'benchmark', SOURCES_VOLUMES)
+    return passe, len(pages), 'pages'
+
+
+def _bench_version_papier(corpus, moteur):
+    classe = _PAGES_PRODUIT[moteur]
+    pages = [html for _, html in corpus['kindle']]
+
+    def passe():
+        for html in pages:
+            classe(html).version_papier(None)
+    return passe, len(pages), 'pages'
+
+
+def _bench_recherche(corpus, moteur):
+    classe = _PAGES_RECHERCHE[moteur]
+    pages = corpus['recherche']
+
+    def passe():
+        for html in pages:
+            page = classe(html)
+            for item in page.items:
+                resultat = SearchResult.depuis_item(item)
+                if resultat.titre:
+                    infos_resultat(resultat.titre, *date_format_item(item))
+    return passe, len(pages), 'pages'
+
+
+def _bench_titres(fonction, cache):
+    def fabrique(corpus, moteur):
+        titres = corpus['titres']
+
+        def passe():
+            cache.cache_clear()
+            for titre in titres:
+                fonction(titre)
+        return passe, len(titres), 'titres'
+    return fabrique
+
+
+BENCHMARKS = {
+    'extraire_infos_produit': _bench_infos_produit,
+    'extraire_volumes_depuis_page': _bench_volumes,
+    'extraire_version_papier': _bench_version_papier,
+    'extraire_item_amazon+featured': _bench_recherche,
+    'extraire_numero_tome': _bench_titres(utils.extraire_numero_tome, utils._appliquer_regles_tome),
+    'normaliser_titre': _bench_titres(utils.normaliser_titre, utils.normaliser_titre),
+}
+
+
+def mesurer(fabrique, corpus: dict, moteur: str, repetitions: int) -> dict:
+    passe, n, unite = fabrique(corpus, moteur)
+    passe()  # échauffement (imports paresseux, XPath compilés)
+    meilleur = float('inf')
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        passe()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    tracemalloc.start()
+    passe()
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'n': n, 'unite': unite, 'debit': round(n / meilleur, 1) if meilleur else 0.0,
+            'ms': round(meilleur * 1000, 3), 'pic_kio': round(pic / 1024, 1)}
+
+
+# ============================================================================
+# RAPPORT / BASELINE
+# ============================================================================
+
+def afficher(resultats: dict, reference: dict = None, tolerance: float = 0.0) -> int:
+    """Tableau des mesures ; avec une baseline, écart de débit et régressions au-delà de la tolérance."""
+    regressions = 0
+    entete = f"{'mesure':<32}{'débit':>14} {'':<7}{'ms/passe':>10}{'pic Kio':>10}"
+    print(entete + (f"{'baseline':>14}{'écart':>9}" if reference else ''))
+    for nom, r in resultats.items():
+        ligne = f"{nom:<32}{r['debit']:>14,.1f} {r['unite'] + '/s':<7}{r['ms']:>10.2f}{r['pic_kio']:>10.1f}"
+        ref = (reference or {}).get(nom)
+        if ref and ref.get('debit'):
+            ecart = r['debit'] / ref['debit'] - 1
+            marque = ''
+            if ecart < -tolerance:
+                regressions += 1
+                marque = ' ❌'
+            elif ecart > tolerance:
+                marque = ' ✅'
+            ligne += f"{ref['debit']:>14,.1f}{ecart:>+9.1%}{marque}"
+        print(ligne)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des extracteurs HTML (pages.py) et des fonctions de titre")
+    parser.add_argument('--corpus', default=CORPUS_DEFAUT, help="Archive --record (index.jsonl + corps/)")
+    parser.add_argument('--moteur', choices=sorted(_PAGES_PRODUIT), default=config.MOTEUR_EXTRACTION,
+                        help="Moteur d'extraction mesuré")
+    parser.add_argument('--db', default=os.environ.get('MANGAVEGA_DB') or os.path.join(RACINE, 'manga_alerts.db'),
+                        help="BDD (lecture seule) pour compléter le corpus de titres")
+    parser.add_argument('--repetitions', type=int, default=5)
+    parser.add_argument('--seulement', nargs='+', choices=sorted(BENCHMARKS), help="Limiter aux mesures citées")
+    parser.add_argument('--enregistrer', metavar='FICHIER', help="Sauver les mesures comme baseline JSON")
+    parser.add_argument('--comparer', metavar='FICHIER', help="Comparer à une baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Baisse de débit tolérée avant de signaler une régression (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.corpus, 'index.jsonl')):
+        print(f"❌ Corpus introuvable: {args.corpus} (python benchmarks/construire_corpus.py)")
+        return 2
+    corpus = charger_corpus(args.corpus)
+    corpus['titres'] = titres_corpus(corpus, args.moteur, args.db)
+    synthetique = archive_synthetique(args.corpus)
+    print(f"Corpus {'synthétique ' if synthetique else ''}{corpus['empreinte']}: {len(corpus['produit'])} page(s) produit, "
+          f"{len(corpus['kindle'])} Kindle, {len(corpus['recherche'])} recherche, "
+          f"{corpus['captcha']} captcha, {len(corpus['titres'])} titre(s) — moteur {args.moteur}")
+    if synthetique:
+        print("⚠️ Pages générées par le simulateur (~1 Ko) : débits comparables entre versions du code "
+              "uniquement, pas des performances de parsing des pages Amazon (--corpus <archive --record>)")
+
+    resultats = {nom: mesurer(fabrique, corpus, args.moteur, args.repetitions)
+                 for nom, fabrique in BENCHMARKS.items() if not args.seulement or nom in args.seulement}
+
+    reference = None
+    if args.comparer:
+        with open(args.comparer, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        meta = baseline.get('meta', {})
+        if bool(meta.get('synthetique')) != synthetique:
+            print("❌ Baseline et mesures prises l'une sur un corpus synthétique, l'autre sur des pages réelles")
+            return 2
+        if meta.get('corpus') != corpus['empreinte'] or meta.get('moteur') != args.moteur:
+            print(f"⚠️ Baseline prise sur un autre corpus ou moteur "
+                  f"({meta.get('corpus')}/{meta.get('moteur')}) : écarts indicatifs")
+        reference = baseline.get('resultats', {})
+    regressions = afficher(resultats, reference, args.tolerance)
+
+    if args.enregistrer:
+        baseline = {
+            'meta': {
+                'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'corpus': corpus['empreinte'],
+                'synthetique': synthetique,
+                'moteur': args.moteur,
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'repetitions': args.repetitions,
+            },
+            'resultats': resultats,
+        }
+        with open(args.enregistrer, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"💾 Baseline enregistrée: {args.enregistrer}")
+
+    if regressions:
+        print(f"❌ {regressions} mesure(s) en baisse de plus de {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Construction du corpus synthétique de bench_parseurs.py
+
+Le corpus est une archive au format --record (index.jsonl + corps/*.html.gz),
+ce qui permet de le remplacer tel quel par une archive de pages réelles :
+
+    python app.py --record /tmp/archive --no-push --no-email
+    python benchmarks/bench_parseurs.py --corpus /tmp/archive
+
+Le corpus versionné (benchmarks/corpus_synthetique/) n'est PAS fait de pages
+Amazon : il est généré par le simulateur (amazon_simulateur.py) depuis les
+séries suivies et la collection. Pages de recherche (résultats sponsorisés,
+doublons Kindle, pagination), pages produit (tmmSwatches, détails, lot
+新品まとめ買い), pages Kindle et corps de captcha, d'environ 1 Ko compressé
+chacune, contre 300 à 800 Ko pour une vraie page /dp/ : il couvre les chemins
+de code des extracteurs, mais ses chronos ne disent rien des performances du
+parsing sur les pages réelles. Les titres des volumes sont déclinés en
+"série N (label)" comme sur Amazon. Son origine.json le marque comme synthétique
+(http_archive.archive_synthetique) : bench_parseurs.py le signale.
+
+Usage : python benchmarks/construire_corpus.py [--sortie benchmarks/corpus_synthetique] [--series 8]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from urllib.parse import quote_plus
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import amazon_simulateur as simulateur  # noqa: E402
+from http_archive import HttpRecorder, INDEX_ARCHIVE  # noqa: E402
+from utils import strip_type_suffix  # noqa: E402
+
+BASE = 'https://www.amazon.co.jp'
+LABELS = ['', '(花とゆめコミックス)', '(ジャンプコミックス)', '（角川スニーカー文庫）', '(MFC)', '(完)']
+SERIES_SYNTHETIQUES = ['テスト漫画', '異世界ベンチマーク物語']
+
+
+def _series(nb: int) -> list:
+    noms = []
+    with open(os.path.join(RACINE, 'mangas_liste.json'), 'r', encoding='utf-8') as f:
+        for manga in json.load(f).get('mangas', []):
+            noms.append(manga.get('url_suffix') or strip_type_suffix(manga.get('nom', '')))
+    return [n for n in noms if n][:nb] + SERIES_SYNTHETIQUES
+
+
+def construire(sortie: str, nb_series: int, produits_par_serie: int) -> dict:
+    catalogue = simulateur.Catalogue()
+    catalogue.charger_collection(os.path.join(RACINE, 'manga_collection.json'))
+    if os.path.isdir(sortie):
+        shutil.rmtree(sortie)
+    archive = HttpRecorder(sortie, origine='amazon_simulateur', synthetique=True)
+    nb = {'recherche': 0, 'produit': 0, 'kindle': 0, 'captcha': 0}
+
+    for nom in _series(nb_series):
+        volumes = catalogue.rechercher(nom)
+        for i, volume in enumerate(volumes):
+            if volume['tome'] is not None:
+                volume['titre'] = f"{volume['serie']} {volume['tome']} {LABELS[i % len(LABELS)]}".strip()
+        nb_pages = max(1, -(-len(volumes) // simulateur.RESULTATS_PAR_PAGE))
+        for page in range(1, min(nb_pages, 2) + 1):
+            html = simulateur.page_recherche(volumes, nom, page)
+            archive.enregistrer(f"{BASE}/s?k={quote_plus(nom)}&page={page}", 200, html.encode('utf-8'), 0.0)
+            nb['recherche'] += 1
+        serie = sorted(volumes, key=lambda v: v['tome'] or 0)
+        for volume in volumes[:produits_par_serie]:
+            html = simulateur.page_produit(volume, [v for v in serie if v['serie'] == volume['serie']])
+            archive.enregistrer(f"{BASE}/dp/{volume['asin']}", 200, html.encode('utf-8'), 0.0)
+            nb['produit'] += 1
+        for volume in volumes[:2]:
+            html = simulateur.page_ebook(volume)
+            archive.enregistrer(f"{BASE}/dp/{simulateur.asin_ebook(volume['asin'])}", 200, html.encode('utf-8'), 0.0)
+            nb['kindle'] += 1
+
+    # Captcha servi à la place d'une page produit et d'une page de recherche
+    for url in (f"{BASE}/dp/4000000000", f"{BASE}/s?k=captcha"):
+        archive.enregistrer(url, 200, simulateur.page_captcha().encode('utf-8'), 0.0)
+        nb['captcha'] += 1
+    archive.fermer()
+    return nb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construit le corpus synthétique (simulateur) des benchmarks de parsing")
+    parser.add_argument('--sortie', default=os.path.join(RACINE, 'benchmarks', 'corpus_synthetique'))
+    parser.add_argument('--series', type=int, default=8, help="Séries de mangas_liste.json (+ séries synthétiques)")
+    parser.add_argument('--produits', type=int, default=4, help="Pages produit par série")
+    args = parser.parse_args()
+
+    nb = construire(args.sortie, args.series, args.produits)
+    print(f"Corpus {os.path.join(args.sortie, INDEX_ARCHIVE)}: "
+          + ', '.join(f"{n} page(s) {k}" for k, n in nb.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Extraction d'un corpus par les extracteurs d'une révision de référence
+
+Lancé par golden_extraction.py --reference REV dans une copie de la révision
+(git archive) : seuls les modules de cette copie sont importés, jamais ceux
+du code testé. Les champs sont ceux de golden_extraction.py, obtenus avec les
+fonctions historiques de scraper.py (extraire_infos_produit,
+extraire_version_papier, extraire_volumes_depuis_page, extraire_item_amazon,
+extraire_infos_featured) et la lecture de la grille de recherche du pipeline.
+
+Usage : python extracteurs_reference.py RACINE_REFERENCE TACHES.jsonl SORTIE.jsonl
+    TACHES : 1re ligne {"champs": {...}}, puis {"cle", "source", "type", "html"}
+    SORTIE : {"cle", "champs"} par page
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+
+
+def _extraire_produit(scraper, html: str, source: str, champs_produit: list) -> dict:
+    infos = asyncio.run(scraper.extraire_infos_produit(html, debug=False))
+    asin = source.rstrip('/').split('/dp/')[-1][:10] if '/dp/' in source else '?'
+
+    async def page_archivee(*args, **kwargs):
+        return html
+    # extraire_volumes_depuis_page re-télécharge la page : on lui sert celle du corpus
+    scraper.get_html = page_archivee
+    volumes = asyncio.run(scraper.extraire_volumes_depuis_page(None, asin, infos.get('titre') or '',
+                                                                sources=['bulk', 'publisher']))
+    champs = {nom: infos.get(nom) for nom in champs_produit if nom in infos}
+    champs['version_papier'] = asyncio.run(scraper.extraire_version_papier(html, None))
+    champs['bulk'] = volumes.get('bulk', [])
+    champs['bulk_tomes'] = dict(volumes.get('bulk_tomes', {}))
+    champs['publisher'] = volumes.get('publisher', [])
+    return champs
+
+
+def _extraire_recherche(scraper, html: str) -> dict:
+    from bs4 import BeautifulSoup
+    # Lecture de la grille telle que faite par la Phase A du pipeline
+    soup = BeautifulSoup(html, 'lxml')
+    btn_next = soup.select_one('.s-pagination-next')
+    champs = {'derniere_page': (btn_next is None) or ('s-pagination-disabled' in btn_next.get('class', [])),
+              'asins': [], 'titres': [], 'dates': [], 'formats': [], 'sponsorises': []}
+    for item in soup.select('.s-result-item'):
+        titre, url, asin = scraper.extraire_item_amazon(item)
+        infos = scraper.extraire_infos_featured(item, titre) if titre else {}
+        champs['asins'].append(asin if titre else None)
+        champs['titres'].append(titre or None)
+        champs['dates'].append(infos.get('date'))
+        champs['formats'].append(infos.get('format'))
+        champs['sponsorises'].append(bool(titre) and ('/sspa/click' in url or 'sspa' in url))
+    return champs
+
+
+def main():
+    racine, chemin_taches, chemin_sortie = sys.argv[1:4]
+    sys.path.insert(0, racine)
+    os.chdir(racine)
+    import scraper  # révision de référence
+    logging.getLogger().setLevel(logging.WARNING)
+    scraper.logger.setLevel(logging.WARNING)
+
+    with open(chemin_taches, 'r', encoding='utf-8') as taches, open(chemin_sortie, 'w', encoding='utf-8') as sortie:
+        champs_produit = json.loads(taches.readline())['champs']['produit']
+        for ligne in taches:
+            tache = json.loads(ligne)
+            if tache['type'] == 'recherche':
+                champs = _extraire_recherche(scraper, tache['html'])
+            else:
+                champs = _extraire_produit(scraper, tache['html'], tache['source'], champs_produit)
+            sortie.write(json.dumps({'cle': tache['cle'], 'champs': champs}, ensure_ascii=False) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Non-régression de l'extraction sur un corpus de pages archivées
+
+Chaque page du corpus (archive --record, dossier de .html ou fichiers) passe par
+tous les extracteurs de pages.py ; les champs obtenus sont comparés à un fichier
+golden JSON indexé par l'empreinte du HTML (sha1, préfixée du type de page : un
+même captcha peut répondre à une recherche et à une page produit), ce qui rend
+le golden indépendant de l'ordre et de l'URL des pages.
+
+- pages produit : titre, tome, date, editeur, format, couverture, lot, page
+  invalide, version papier, ASINs bulk / publisher et tomes du lot
+- pages de recherche : dernière page, ASINs, titres, dates, formats, sponsorisés
+
+Rapport : écarts champ par champ (golden → actuel) et taux de couverture de
+chaque champ (pages où il est renseigné), actuel et golden : une dérive du
+balisage Amazon apparaît comme une chute de couverture avant même un écart.
+
+Une seule analyse par page (ProductPage partagée par tous les extracteurs),
+pages réparties sur un pool de processus (fork).
+
+Le golden n'est jamais produit par le code testé : --mettre-a-jour exige une
+révision de référence (--reference), extraite par git archive et dont les
+extracteurs historiques tournent à part (extracteurs_reference.py). Pour
+suivre le balisage d'Amazon, le corpus doit être une archive --record de
+pages réelles ; le golden versionné ne couvre que le corpus synthétique du
+simulateur (benchmarks/corpus_synthetique/), qui ne peut pas révéler une
+dérive du vrai balisage.
+
+Usage :
+    python benchmarks/golden_extraction.py                      # compare au golden du corpus synthétique
+    python app.py --record /tmp/archive --no-push --no-email    # pages réelles
+    python benchmarks/golden_extraction.py --corpus /tmp/archive --golden /tmp/golden.json \
+        --mettre-a-jour --reference <révision de référence>
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import config  # noqa: E402
+from http_archive import archive_synthetique  # noqa: E402
+from pages import _PAGES_PRODUIT, _PAGES_RECHERCHE, _pages_a_comparer  # noqa: E402
+from reponses import decoder  # noqa: E402
+
+CORPUS_DEFAUT = os.path.join(RACINE, 'benchmarks', 'corpus_synthetique')
+GOLDEN_DEFAUT = os.path.join(RACINE, 'benchmarks', 'golden_synthetique.json')
+EXTRACTEURS_REFERENCE = os.path.join(RACINE, 'benchmarks', 'extracteurs_reference.py')
+SOURCES_VOLUMES = ['bulk', 'publisher']
+
+# Champs rapportés par type de page (ordre du rapport de couverture)
+CHAMPS = {
+    'produit': ['titre', 'tome', 'date', 'editeur', 'format', 'couverture_url', 'est_lot',
+                '_page_invalide', 'version_papier', 'bulk', 'bulk_tomes', 'publisher'],
+    'recherche': ['derniere_page', 'asins', 'titres', 'dates', 'formats', 'sponsorises'],
+}
+EXEMPLES_MAX = 3
+
+
+def empreinte(genre: str, html: str) -> str:
+    return f"{genre}:{hashlib.sha1(html.encode('utf-8')).hexdigest()[:16]}"
+
+
+def type_page(source: str, html: str) -> str:
+    if '/s?' in source or 's-result-item' in html:
+        return 'recherche'
+    if '/dp/' in source or 'productTitle' in html or 'captcha' in html.lower():
+        return 'produit'
+    return None
+
+
+# ============================================================================
+# EXTRACTION (côté worker)
+# ============================================================================
+
+def _extraire_produit(page, source: str) -> dict:
+    infos = page.infos()
+    asin = source.rstrip('/').split('/dp/')[-1][:10] if '/dp/' in source else '?'
+    # Nom de série inconnu hors pipeline : le titre de la page (la clé du lot n'en garde que le début)
+    volumes = page.volumes_lies(asin, infos.get('titre') or '', SOURCES_VOLUMES)
+    champs = {nom: infos.get(nom) for nom in CHAMPS['produit'] if nom in infos}
+    champs['version_papier'] = page.version_papier(None)
+    champs['bulk'] = volumes.get('bulk', [])
+    champs['bulk_tomes'] = {a: t for a, t in volumes.get('bulk_tomes', {}).items()}
+    champs['publisher'] = volumes.get('publisher', [])
+    return champs
+
+
+def _extraire_recherche(page) -> dict:
+    resultats = page.resultats
+    return {
+        'derniere_page': page.derniere_page,
+        'asins': [r.asin for r in resultats],
+        'titres': [r.titre for r in resultats],
+        'dates': [r.date for r in resultats],
+        'formats': [r.format for r in resultats],
+        'sponsorises': [r.sponsorise for r in resultats],
+    }
+
+
+def extraire_page(tache):
+    """(source, octets, moteur) → (empreinte, source, type, champs) ; None pour une page non gérée."""
+    source, contenu, moteur = tache
+    html = decoder(contenu)
+    genre = type_page(source, html)
+    if genre is None:
+        return None
+    if genre == 'recherche':
+        champs = _extraire_recherche(_PAGES_RECHERCHE[moteur](html))
+    else:
+        champs = _extraire_produit(_PAGES_PRODUIT[moteur](html), source)
+    # Aller-retour JSON : mêmes types que le golden relu (tuples → listes, clés → str)
+    return empreinte(genre, html), source, genre, json.loads(json.dumps(champs, ensure_ascii=False))
+
+
+def _init_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+    config.logger.setLevel(logging.WARNING)
+
+
+def extraire_corpus(chemins, moteur: str, workers: int) -> list:
+    taches = ((source, html.encode('utf-8'), moteur) for source, html in _pages_a_comparer(chemins))
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        _init_worker()
+        resultats = map(extraire_page, taches)
+    else:
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'),
+                                 initializer=_init_worker) as pool:
+            resultats = list(pool.map(extraire_page, taches, chunksize=4))
+    # Une page archivée plusieurs fois n'est comptée qu'une fois
+    uniques = {}
+    for r in resultats:
+        if r and r[0] not in uniques:
+            uniques[r[0]] = r
+    return list(uniques.values())
+
+
+# ============================================================================
+# GOLDEN DE RÉFÉRENCE (extracteurs d'une autre révision)
+# ============================================================================
+
+def extraire_reference(chemins, revision: str) -> tuple:
+    """
+    (sha de la révision, [(empreinte, source, type, champs)]) : le corpus passé
+    par les extracteurs de `revision`, dans une copie git archive de l'arbre.
+    """
+    sha = subprocess.run(['git', '-C', RACINE, 'rev-parse', '--verify', f"{revision}^{{commit}}"],
+                         capture_output=True, text=True, check=True).stdout.strip()
+    pages = {}
+    for source, html in _pages_a_comparer(chemins):
+        genre = type_page(source, html)
+        if genre is not None:
+            pages.setdefault(empreinte(genre, html), (source, genre, html))
+    with tempfile.TemporaryDirectory(prefix='golden_reference_') as dossier:
+        racine_ref = os.path.join(dossier, 'arbre')
+        archive = subprocess.run(['git', '-C', RACINE, 'archive', '--format=tar', sha],
+                                 capture_output=True, check=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(racine_ref)
+        taches, sortie = os.path.join(dossier, 'taches.jsonl'), os.path.join(dossier, 'sortie.jsonl')
+        with open(taches, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'champs': CHAMPS}) + '\n')
+            for cle, (source, genre, html) in pages.items():
+                f.write(json.dumps({'cle': cle, 'source': source, 'type': genre, 'html': html},
+                                   ensure_ascii=False) + '\n')
+        subprocess.run([sys.executable, EXTRACTEURS_REFERENCE, racine_ref, taches, sortie],
+                       cwd=racine_ref, check=True, stdout=subprocess.DEVNULL)
+        with open(sortie, 'r', encoding='utf-8') as f:
+            resultats = []
+            for ligne in f:
+                r = json.loads(ligne)
+                source, genre, _ = pages[r['cle']]
+                resultats.append((r['cle'], source, genre, r['champs']))
+    return sha, resultats
+
+
+# ============================================================================
+# COMPARAISON / RAPPORT
+# ============================================================================
+
+def _renseigne(valeur) -> bool:
+    return valeur not in (None, '', [], {}, False)
+
+
+def couverture(entrees) -> dict:
+    """{type: {champ: (pages où le champ est renseigné, pages du type)}}"""
+    totaux, renseignes = Counter(), defaultdict(Counter)
+    for genre, champs in entrees:
+        totaux[genre] += 1
+        for nom in CHAMPS[genre]:
+            if _renseigne(champs.get(nom)):
+                renseignes[genre][nom] += 1
+    return {genre: {nom: (renseignes[genre][nom], totaux[genre]) for nom in CHAMPS[genre]} for genre in totaux}
+
+
+def comparer(resultats: list, golden: dict) -> dict:
+    """Écarts champ par champ : {(type, champ): [(empreinte, source, golden, actuel)]}"""
+    ecarts = defaultdict(list)
+    for cle, source, genre, champs in resultats:
+        attendu = golden.get(cle)
+        if attendu is None:
+            continue
+        for nom in CHAMPS[genre]:
+            if attendu['champs'].get(nom) != champs.get(nom):
+                ecarts[(genre, nom)].append((cle, source, attendu['champs'].get(nom), champs.get(nom)))
+    return ecarts
+
+
+def _court(valeur, taille: int = 60) -> str:
+    texte = json.dumps(valeur, ensure_ascii=False)
+    return texte if len(texte) <= taille else texte[:taille - 1] + '…'
+
+
+def afficher_rapport(resultats: list, golden: dict, ecarts: dict):
+    actuelle = couverture((genre, champs) for _, _, genre, champs in resultats)
+    cles = {cle for cle, _, _, _ in resultats}
+    reference = couverture((e['type'], e['champs']) for cle, e in golden.items() if cle in cles)
+    for genre, champs in actuelle.items():
+        print(f"\n{genre}: {'champ':<16}{'couverture':>12}{'golden':>10}{'écarts':>8}")
+        for nom, (n, total) in champs.items():
+            n_ref, total_ref = reference.get(genre, {}).get(nom, (0, 0))
+            golden_txt = f"{n_ref / total_ref:.0%}" if total_ref else '-'
+            marque = ' ⚠️' if total_ref and n / total < n_ref / total_ref else ''
+            print(f"  {'':<{len(genre)}}{nom:<16}{n / total:>12.0%}{golden_txt:>10}"
+                  f"{len(ecarts.get((genre, nom), [])):>8}{marque}")
+    for (genre, nom), liste in sorted(ecarts.items()):
+        print(f"\n❌ {genre}.{nom}: {len(liste)} page(s)")
+        for cle, source, attendu, obtenu in liste[:EXEMPLES_MAX]:
+            print(f"   {cle} {source[-50:]}\n      golden: {_court(attendu)}\n      actuel: {_court(obtenu)}")
+
+
+def charger_golden(chemin: str) -> dict:
+    if not os.path.exists(chemin):
+        return {}
+    with open(chemin, 'r', encoding='utf-8') as f:
+        return json.load(f).get('pages', {})
+
+
+def sauver_golden(chemin: str, golden: dict, reference: str):
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump({'reference': reference, 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'pages': dict(sorted(golden.items()))}, f, ensure_ascii=False, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare l'extraction d'un corpus de pages à un golden JSON")
+    parser.add_argument('--corpus', nargs='+', default=[CORPUS_DEFAUT],
+                        help="Archive --record (dossier avec index.jsonl), dossier de .html ou fichiers .html")
+    parser.add_argument('--golden', default=GOLDEN_DEFAUT)
+    parser.add_argument('--moteur', choices=sorted(_PAGES_PRODUIT), default=config.MOTEUR_EXTRACTION)
+    parser.add_argument('--workers', type=int, default=config.ANALYSE_WORKERS)
+    parser.add_argument('--mettre-a-jour', action='store_true', help="Ajouter au golden les pages qui n'y sont pas")
+    parser.add_argument('--tout', action='store_true', help="Avec --mettre-a-jour : réécrire aussi les pages existantes")
+    parser.add_argument('--reference', metavar='REV',
+                        help="Révision git dont les extracteurs produisent le golden (requis avec --mettre-a-jour)")
+    args = parser.parse_args()
+    if args.mettre_a_jour and not args.reference:
+        parser.error("--mettre-a-jour exige --reference : le golden ne doit pas venir du code testé")
+    if any(archive_synthetique(c) for c in args.corpus if os.path.isdir(c)):
+        print("⚠️ Corpus synthétique (simulateur) : couvre les extracteurs, mais ne révèle pas "
+              "une dérive du balisage réel d'Amazon (--corpus <archive --record>)")
+
+    debut = time.perf_counter()
+    resultats = extraire_corpus(args.corpus, args.moteur, args.workers)
+    duree = time.perf_counter() - debut
+    golden = charger_golden(args.golden)
+    nouvelles = [r for r in resultats if r[0] not in golden]
+    print(f"{len(resultats)} page(s) extraite(s) en {duree:.2f}s ({args.moteur}, {args.workers} worker(s)), "
+          f"{len(resultats) - len(nouvelles)} dans le golden, {len(nouvelles)} nouvelle(s)")
+
+    ecarts = comparer(resultats, golden)
+    afficher_rapport(resultats, golden, ecarts)
+
+    if args.mettre_a_jour:
+        sha, reference = extraire_reference(args.corpus, args.reference)
+        for cle, source, genre, champs in reference:
+            if args.tout or cle not in golden:
+                golden[cle] = {'source': source, 'type': genre, 'champs': champs}
+        sauver_golden(args.golden, golden, sha)
+        print(f"\n💾 Golden mis à jour depuis {args.reference} ({sha[:10]}): {args.golden} ({len(golden)} page(s))")
+        return 0
+    nb = sum(len(v) for v in ecarts.values())
+    if nb:
+        print(f"\n❌ {nb} écart(s) sur {len(ecarts)} champ(s)")
+        return 1
+    print("\n✅ Aucun écart avec le golden")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
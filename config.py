@@ -128,6 +128,16 @@ except ImportError:
 # avec la version de Chrome impersonnée (Sec-Ch-Ua, Sec-Fetch-*, etc.)
 # Passer des headers custom avec impersonate crée des conflits/doublons.
 # Ref: https://curl-cffi.readthedocs.io/en/latest/quick_start.html
+# Racine des URLs Amazon effectivement requêtées. Les URLs stockées (BDD, cache)
+# restent en https://www.amazon.co.jp ; seule la requête réseau est redirigée
+# (ex: simulateur local amazon_simulateur.py pour les tests de charge)
+AMAZON_BASE_URL = os.environ.get('MANGAVEGA_AMAZON_URL', 'https://www.amazon.co.jp').rstrip('/')
+# Hors amazon.co.jp (simulateur), cache HTTP et cookies de session sont séparés
+# de ceux de production : ni les pages ni les cookies du simulateur ne doivent
+# servir à un vrai run, et inversement
+AMAZON_SIMULE = AMAZON_BASE_URL != 'https://www.amazon.co.jp'
+_SUFFIXE_SIMULE = '_simulateur' if AMAZON_SIMULE else ''
+
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
@@ -135,6 +145,132 @@ HEADERS = {
     'Accept-Encoding': 'gzip, deflate, br',
 }
 
+# ============================================================================
+# CADENCE HTTP (token buckets, voir throttle.py)
+# Remplace les pauses aléatoires dispersées : toutes les requêtes passent par
+# le pacer de SessionWrapper, le scan tourne à un budget req/min fixe.
+# ============================================================================
+PACER_RPM_GLOBAL = float(os.environ.get('MANGAVEGA_RPM', 40))
+PACER_CLASSES = {
+    'recherche': {'rpm': 18, 'rafale': 1},   # /s?k= (≈ 3.3s entre deux recherches)
+    'produit':   {'rpm': 45, 'rafale': 2},   # /dp/ASIN
+    'warmup':    {'rpm': 4,  'rafale': 1},   # page d'accueil amazon.co.jp
+    'autre':     {'rpm': 60, 'rafale': 2},
+}
+PACER_JITTER = 0.25  # Jitter aléatoire ajouté à l'attente (fraction de l'intervalle de la classe)
+
+# Contrôle adaptatif AIMD (throttle.AdaptiveThrottle) : le débit monte par pas
+# tant que les réponses sont propres, et est divisé sur 503 / captcha / page courte
+AIMD_FACTEUR_INITIAL = 1.0   # Multiplicateur appliqué aux débits PACER_* au démarrage
+AIMD_FACTEUR_MIN = 0.2
+AIMD_FACTEUR_MAX = 3.0
+AIMD_FENETRE_OK = 10         # Réponses propres consécutives avant une hausse
+AIMD_PAS = 0.1               # Hausse additive du facteur
+AIMD_REDUCTION = 0.5         # Baisse multiplicative du facteur
+AIMD_REFRACTAIRE = 15        # Secondes sans nouvelle baisse après une réduction
+
+# Séries scannées en même temps (planificateur.PlanificateurSeries) : la cadence
+# reste fixée par le pacer, la concurrence superpose les attentes réseau
+SERIES_CONCURRENTES = int(os.environ.get('MANGAVEGA_SERIES', 3))
+# Phase B en étages (etages.py) : pages produit en avance sur le classement,
+# requêtes simultanées de l'étage de récupération, écritures BDD par transaction
+VERIFICATION_FENETRE = int(os.environ.get('MANGAVEGA_FENETRE_VERIFICATION', 4))
+VERIFICATION_FETCHERS = int(os.environ.get('MANGAVEGA_FETCHERS', 2))
+ECRITURES_LOT = int(os.environ.get('MANGAVEGA_ECRITURES_LOT', 50))
+
+# ============================================================================
+# CACHE DISQUE DES RÉPONSES HTTP (http_cache.py)
+# Pages compressées, adressées par contenu, clé = URL normalisée (utils.normaliser_url)
+# Mode : 'off', 'read-write' ou 'read-only' (surchargé par --cache-mode)
+# ============================================================================
+CACHE_HTTP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_http' + _SUFFIXE_SIMULE)
+CACHE_HTTP_MODE = os.environ.get('MANGAVEGA_CACHE_MODE', 'read-write')
+CACHE_HTTP_TTL = {            # Durée de validité par classe d'URL (secondes)
+    'produit': 12 * 3600,     # /dp/ASIN
+    'recherche': 20 * 60,     # /s?k= (doit rester court : détection des nouveautés)
+    'negatif': 6 * 3600,      # 404
+    'autre': 3600,
+}
+
+# Lecture progressive des pages produit (get_html avec sentinelles) : la lecture
+# s'arrête dès que ces sections ont été vues (+ marge), ou au plafond d'octets.
+# Pages tronquées : en cache disque sous leur propre clé (URL#sentinelles), servies
+# aux seules lectures avec ces sentinelles ; une page complète en cache leur est préférée.
+SENTINELLES_PRODUIT = (
+    b'id="productTitle"',
+    b'id="tmmSwatches"',
+    b'id="detailBulletsWrapper_feature_div"',
+    b'id="landingImage"',                  # Couverture (ProductPage.couverture)
+)
+STREAMING_MARGE = 32 * 1024          # Octets lus après la dernière sentinelle
+STREAMING_OCTETS_MAX = 1024 * 1024   # Plafond de lecture d'une page
+
+# Mémo en mémoire du run (http_cache.SingleFlight) : pages déjà obtenues pendant ce run
+MEMO_HTTP_TTL = 600           # Secondes
+MEMO_HTTP_MAX = 64            # Pages gardées en mémoire (≈ 500 Ko chacune)
+
+# ============================================================================
+# POOL DE SESSIONS HTTP (scraper.SessionWrapper / SessionHttp)
+# Chaque session a son jar de cookies et son profil d'impersonation curl_cffi ;
+# les requêtes partent sur la session la plus saine
+# ============================================================================
+HTTP_POOL_TAILLE = int(os.environ.get('MANGAVEGA_POOL', 2))
+HTTP_POOL_PROFILS = ('chrome', 'safari17_0', 'chrome120', 'edge101')
+
+# Score de santé (0..1) alimenté par les réponses de chaque session
+SANTE_GAIN_OK = 0.1            # + par réponse valide (plafonné à 1)
+SANTE_PENALITE = 0.5           # × par 503 / captcha / réponse courte
+SANTE_SEUIL_QUARANTAINE = 0.3  # En dessous : session écartée et réchauffée en tâche de fond
+SANTE_QUARANTAINE = 60         # Secondes avant le réchauffage (cookies neufs)
+SANTE_REPRISE = 0.6            # Santé à la remise en service
+
+# ============================================================================
+# COOKIES DE SESSION PERSISTÉS (scraper.SessionHttp)
+# Sauvegardés en fin de run, rechargés au démarrage : le warm-up n'est refait
+# que si le jar est trop ancien, incomplet, ou rejeté par Amazon
+# ============================================================================
+COOKIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session_cookies' + _SUFFIXE_SIMULE + '_{session}.json')
+COOKIES_AGE_MAX = 12 * 3600             # Au-delà, warm-up complet (secondes)
+COOKIES_REQUIS = ('session-id', 'i18n-prefs')  # Absents du jar → warm-up complet
+
+# ============================================================================
+# MOTEUR D'EXTRACTION HTML (pages.py)
+# 'bs4'  : BeautifulSoup (référence)
+# 'lxml' : XPath précompilées sur lxml.html (pages produit et résultats de recherche)
+# 'diff' : les deux moteurs sur chaque page, désaccords journalisés (résultat bs4 utilisé)
+# ============================================================================
+MOTEUR_EXTRACTION = os.environ.get('MANGAVEGA_MOTEUR', 'bs4')
+MOTEURS_EXTRACTION = ('bs4', 'lxml', 'diff')
+
+# Exécution des extracteurs hors de la boucle asyncio (analyse.py)
+# 'process' : pool de processus (repli sur 'thread' sans fork) | 'thread' | 'inline'
+ANALYSE_MODE = os.environ.get('MANGAVEGA_ANALYSE', 'process')
+ANALYSE_WORKERS = int(os.environ.get('MANGAVEGA_ANALYSE_WORKERS', min(4, os.cpu_count() or 1)))
+ANALYSE_PAGES_WORKER = 4      # Pages produit gardées parsées par worker
+
+# ============================================================================
+# FRAÎCHEUR DU CACHE DE VÉRIFICATION (fraicheur.py)
+# Durée de validité d'une ligne de verifications_cache selon la date de sortie
+# ============================================================================
+FRAICHEUR_FUTUR_PART = 0.1        # Sortie annoncée : TTL = part du temps restant avant la sortie...
+FRAICHEUR_FUTUR_MIN_H = 12        # ... au moins (heures)
+FRAICHEUR_FUTUR_MAX_J = 7         # ... au plus (jours)
+FRAICHEUR_RECENT_JOURS = 30       # Sortie "récente" : parue depuis moins de N jours
+FRAICHEUR_RECENT_TTL_J = 3
+FRAICHEUR_ANCIEN_TTL_J = 90       # Sortie ancienne : plus rien ne bouge
+FRAICHEUR_INCOMPLET_H = 6         # Date ou tome manquant : nouvel essai après N heures,
+FRAICHEUR_INCOMPLET_MAX_J = 7     # doublé à chaque essai resté incomplet, plafonné
+
+# Liste de suivi des précommandes (pipeline.verifier_precommandes) : écart entre
+# deux vérifications selon les jours restants avant la sortie annoncée
+PRECOMMANDE_PALIERS = (           # (jours restants ≤ N, vérifier tous les M jours)
+    (3, 1),
+    (14, 2),
+    (45, 7),
+    (120, 14),
+)
+PRECOMMANDE_ECART_MAX_J = 30      # Au-delà du dernier palier
+
 # ============================================================================
 # GLOBALS MUTABLES (modifiés par sync.py et pipeline.py)
 # ============================================================================
@@ -5,27 +5,63 @@
 
 import os
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime, date
 from typing import Optional, List, Dict, Set
 
 import config
-from utils import normaliser_editeur
+from utils import extraire_asin, normaliser_editeur
+from fraicheur import POLITIQUE_FRAICHEUR, est_incomplet, prochaine_verification_precommande
 
 logger = config.logger
 
-_DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manga_alerts.db')
+_DEFAULT_DB_PATH = os.environ.get('MANGAVEGA_DB') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'manga_alerts.db')
+
+
+class _ConnexionLot:
+    """Connexion partagée par les écritures d'un lot : commit et close reportés à la fin du lot."""
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __getattr__(self, nom):
+        return getattr(self._conn, nom)
 
 
 class Database:
-    def __init__(self, db_path: str = _DEFAULT_DB_PATH):
-        self.db_path = db_path
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or _DEFAULT_DB_PATH
+        self._conn_lot = None
         self.init_db()
         self.init_table_volumes()
         self.init_table_editeurs()
 
     def _get_conn(self) -> sqlite3.Connection:
+        if self._conn_lot is not None:
+            return self._conn_lot
         return sqlite3.connect(self.db_path, timeout=30)
 
+    @contextmanager
+    def lot_ecritures(self):
+        """
+        Les appels faits dans le bloc partagent une connexion et une seule
+        transaction, validée en sortie (etages.EcrivainBdd). Bloc synchrone
+        uniquement : une coroutine qui s'intercalerait écrirait dans le lot.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        self._conn_lot = _ConnexionLot(conn)
+        try:
+            yield
+            conn.commit()
+        finally:
+            self._conn_lot = None
+            conn.close()
+
     # ------------------------------------------------------------------
     # init_db
     # ------------------------------------------------------------------
@@ -61,7 +97,21 @@ class Database:
                     date_sortie TEXT,
                     tome TEXT,
                     titre TEXT,
-                    editeur TEXT
+                    editeur TEXT,
+                    nb_incomplets INTEGER DEFAULT 0
+                )
+            """)
+
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS precommandes_suivi (
+                    asin TEXT PRIMARY KEY,
+                    nom TEXT NOT NULL,
+                    serie TEXT,
+                    url TEXT NOT NULL,
+                    date_annoncee TEXT,
+                    prochaine_verification TEXT,
+                    derniere_verification TEXT,
+                    nb_verifications INTEGER DEFAULT 0
                 )
             """)
 
@@ -137,6 +187,13 @@ class Database:
                 except sqlite3.OperationalError:
                     pass  # Column already exists
 
+            # Migration verifications_cache : essais restés incomplets (backoff, fraicheur.py)
+            try:
+                c.execute('ALTER TABLE verifications_cache ADD COLUMN nb_incomplets INTEGER DEFAULT 0')
+                conn.commit()
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+
             # Migration: insérer droits_nwk/fait pour les workflows existants qui ont déjà mail_nwk
             try:
                 c.execute("""
@@ -228,6 +285,89 @@ class Database:
         finally:
             conn.close()
 
+    # ------------------------------------------------------------------
+    # Précommandes suivies (pipeline.verifier_precommandes)
+    # ------------------------------------------------------------------
+
+    def suivre_precommande(self, asin: str, nom: str, serie: str, url: str, date_annoncee: str, prochaine: datetime):
+        """Ajoute (ou replanifie) une précommande alertée ; nom = clé de la table alertes."""
+        conn = self._get_conn()
+        try:
+            c = conn.cursor()
+            c.execute(
+                """INSERT INTO precommandes_suivi (asin, nom, serie, url, date_annoncee, prochaine_verification)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(asin) DO UPDATE SET date_annoncee = excluded.date_annoncee,
+                    prochaine_verification = excluded.prochaine_verification""",
+                (asin, nom, serie, url, date_annoncee, prochaine.strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def replanifier_precommande(self, asin: str, date_annoncee: str, prochaine: Optional[datetime]):
+        """Enregistre une vérification ; prochaine=None : date passée, la précommande quitte la liste."""
+        conn = self._get_conn()
+        try:
+            c = conn.cursor()
+            if prochaine is None:
+                c.execute('DELETE FROM precommandes_suivi WHERE asin = ?', (asin,))
+            else:
+                c.execute(
+                    """UPDATE precommandes_suivi SET date_annoncee = ?, prochaine_verification = ?,
+                    derniere_verification = ?, nb_verifications = nb_verifications + 1 WHERE asin = ?""",
+                    (date_annoncee, prochaine.strftime('%Y-%m-%d %H:%M:%S'),
+                     datetime.now().strftime('%Y-%m-%d %H:%M:%S'), asin)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_precommandes(self, nom: str = None) -> Dict[str, Dict]:
+        """{asin: précommande} suivies, toutes ou celles d'une clé d'alerte."""
+        conn = self._get_conn()
+        try:
+            c = conn.cursor()
+            requete = 'SELECT asin, nom, serie, url, date_annoncee, prochaine_verification FROM precommandes_suivi'
+            if nom is None:
+                c.execute(requete)
+            else:
+                c.execute(requete + ' WHERE nom = ?', (nom,))
+            return {row[0]: {'asin': row[0], 'nom': row[1], 'serie': row[2], 'url': row[3],
+                             'date_annoncee': row[4], 'prochaine_verification': row[5]}
+                    for row in c.fetchall()}
+        finally:
+            conn.close()
+
+    def get_precommandes_dues(self, maintenant: datetime = None) -> List[Dict]:
+        """Précommandes à re-vérifier, de la sortie la plus proche à la plus lointaine."""
+        echeance = (maintenant or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        dues = [p for p in self.get_precommandes().values()
+                if (p['prochaine_verification'] or '') <= echeance]
+        return sorted(dues, key=lambda p: p['date_annoncee'] or '')
+
+    def importer_precommandes_alertes(self) -> int:
+        """Ajoute à la liste les alertes à date future qui n'y sont pas encore (bases antérieures à la liste)."""
+        conn = self._get_conn()
+        try:
+            c = conn.cursor()
+            c.execute('SELECT nom, url, date FROM alertes')
+            alertes = c.fetchall()
+            c.execute('SELECT asin FROM precommandes_suivi')
+            suivies = {row[0] for row in c.fetchall()}
+        finally:
+            conn.close()
+        nb = 0
+        for nom, url, date_str in alertes:
+            asin = extraire_asin(url or '')
+            if asin == '?' or asin in suivies or prochaine_verification_precommande(date_str) is None:
+                continue
+            # Jamais vérifiée depuis la liste : due tout de suite
+            self.suivre_precommande(asin, nom, nom, url, date_str, datetime.now())
+            suivies.add(asin)
+            nb += 1
+        return nb
+
     # ------------------------------------------------------------------
     # Traductions
     # ------------------------------------------------------------------
@@ -368,24 +508,29 @@ class Database:
     # ------------------------------------------------------------------
 
     def est_verifie_aujourdhui(self, asin: str) -> Optional[Dict]:
+        """Ligne du cache de vérification si elle est encore fraîche (fraicheur.PolitiqueFraicheur), sinon None."""
         conn = self._get_conn()
         try:
             c = conn.cursor()
             c.execute(
-                'SELECT date_sortie, tome, titre, editeur FROM verifications_cache WHERE asin = ?',
+                '''SELECT date_sortie, tome, titre, editeur, date_verification, nb_incomplets
+                FROM verifications_cache WHERE asin = ?''',
                 (asin,)
             )
             row = c.fetchone()
             if not row:
                 return None
-            if row[1] == 'N/A':
-                return None
-            return {
+            ligne = {
                 'date': row[0],
                 'tome': row[1],
                 'titre': row[2],
                 'editeur': row[3],
+                'date_verification': row[4],
+                'nb_incomplets': row[5],
             }
+            if not POLITIQUE_FRAICHEUR.est_frais(ligne):
+                return None
+            return ligne
         finally:
             conn.close()
 
@@ -414,11 +559,16 @@ class Database:
         try:
             c = conn.cursor()
             now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            nb_incomplets = 0
+            if est_incomplet(date_sortie, tome):
+                c.execute('SELECT nb_incomplets FROM verifications_cache WHERE asin = ?', (asin,))
+                row = c.fetchone()
+                nb_incomplets = (row[0] or 0) + 1 if row else 1
             c.execute(
                 """INSERT OR REPLACE INTO verifications_cache
-                (asin, date_verification, date_sortie, tome, titre, editeur)
-                VALUES (?, ?, ?, ?, ?, ?)""",
-                (asin, now, date_sortie, tome, titre, editeur)
+                (asin, date_verification, date_sortie, tome, titre, editeur, nb_incomplets)
+                VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (asin, now, date_sortie, tome, titre, editeur, nb_incomplets)
             )
             conn.commit()
         finally:
@@ -510,6 +660,16 @@ class Database:
         finally:
             conn.close()
 
+    def update_date_volume(self, asin: str, date_sortie_jp: str):
+        conn = self._get_conn()
+        try:
+            c = conn.cursor()
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            c.execute('UPDATE volumes SET date_sortie_jp = ?, date_maj = ? WHERE asin = ?', (date_sortie_jp, now, asin))
+            conn.commit()
+        finally:
+            conn.close()
+
     def update_tome_volume(self, asin: str, tome):
         conn = self._get_conn()
         try:
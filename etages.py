@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Chaîne d'étages asynchrones reliés par des files bornées
+
+Découverte → étages (récupération, analyse...) → consommateur dans l'ordre → écrivain BDD.
+
+- chaque étage a sa file d'entrée bornée et son nombre de workers ; un étage
+  plein bloque le précédent (contre-pression) jusqu'à la découverte
+- la découverte n'a jamais plus de `fenetre` éléments en avance sur le
+  consommateur, qui les lit dans l'ordre d'émission
+- les écritures en BDD passent par un seul écrivain, appliquées par lots
+  (une transaction par lot)
+- métriques par étage : éléments traités, temps occupé, temps bloqué sur
+  l'étage suivant (pour le consommateur : attente des résultats), profondeur
+  de file (max et moyenne) ; cumulées sur le run dans METRIQUES_ETAGES
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+
+import config
+
+logger = config.logger
+
+# Fin de flux : passée d'étage en étage quand tous les workers d'un étage ont fini
+_FIN = object()
+
+
+def _stats_vides() -> Dict:
+    return {'traites': 0, 'erreurs': 0, 'occupe': 0.0, 'bloque': 0.0,
+            'profondeur_max': 0, 'profondeur_somme': 0, 'mesures': 0}
+
+
+def _mesurer_file(stats: Dict, file: asyncio.Queue):
+    profondeur = file.qsize()
+    stats['profondeur_max'] = max(stats['profondeur_max'], profondeur)
+    stats['profondeur_somme'] += profondeur
+    stats['mesures'] += 1
+
+
+class Etage:
+    """
+    `workers` tâches lisent la file d'entrée (bornée à `capacite`), appliquent
+    traiter(valeur) et passent (clé, résultat) à la file suivante. Une exception
+    de traiter est journalisée et transmise comme résultat None.
+    """
+    def __init__(self, nom: str, traiter: Callable[[Any], Awaitable], workers: int = 1, capacite: int = None):
+        self.nom = nom
+        self.traiter = traiter
+        self.workers = max(1, workers)
+        self.entree = asyncio.Queue(maxsize=max(1, capacite or self.workers))
+        self.stats = _stats_vides()
+        self._actifs = self.workers
+
+    async def executer(self, cle, valeur):
+        """traiter(valeur) mesuré ; None (journalisé) en cas d'exception."""
+        debut = time.perf_counter()
+        try:
+            resultat = await self.traiter(valeur)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"  ⚠️  Étage {self.nom} [{cle}]: {type(e).__name__}: {e}")
+            self.stats['erreurs'] += 1
+            resultat = None
+        self.stats['occupe'] += time.perf_counter() - debut
+        self.stats['traites'] += 1
+        return resultat
+
+    async def _travailler(self, sortie: asyncio.Queue, fins_suivant: int):
+        while True:
+            element = await self.entree.get()
+            if element is _FIN:
+                self._actifs -= 1
+                if not self._actifs:
+                    for _ in range(fins_suivant):
+                        await sortie.put(_FIN)
+                return
+            cle, valeur = element
+            resultat = await self.executer(cle, valeur)
+            debut = time.perf_counter()
+            await sortie.put((cle, resultat))
+            self.stats['bloque'] += time.perf_counter() - debut
+            _mesurer_file(self.stats, sortie)
+
+
+class ChaineEtages:
+    """
+    Étages exécutés en chaîne sur les éléments (clé, valeur) de la découverte ;
+    obtenir(clé) rend le résultat du dernier étage (None si la clé n'a pas été
+    émise ou si un étage a échoué).
+
+    La découverte attend qu'une place se libère dans la fenêtre avant d'émettre.
+    restreindre() arrête toute lecture en avance (disjoncteur captcha) : les
+    éléments suivants passent les étages un par un, à la demande du consommateur.
+    """
+    def __init__(self, nom: str, etages: list, fenetre: int = None):
+        self.nom = nom
+        self.etages = etages
+        self.fenetre = max(1, fenetre or config.VERIFICATION_FENETRE)
+        self.sortie = asyncio.Queue(maxsize=self.fenetre)
+        self.stats = {'decouverte': _stats_vides(), 'consommateur': _stats_vides()}
+        self._places = asyncio.Semaphore(self.fenetre)
+        self._emises = set()
+        self._valeurs = {}
+        self._recus = {}
+        self._termine = False
+        self._rendu = None
+        self._taches = []
+        self._ferme = False
+        self._restreinte = False
+
+    def demarrer(self, elements: Iterable[Tuple[Any, Any]]):
+        """Lance la découverte (itérable de (clé, valeur)) et les workers de chaque étage."""
+        elements = list(elements)
+        self._emises = {cle for cle, _ in elements}
+        self._valeurs = dict(elements)
+        suivants = [e.entree for e in self.etages[1:]] + [self.sortie]
+        fins = [e.workers for e in self.etages[1:]] + [1]
+        for etage, sortie, fins_suivant in zip(self.etages, suivants, fins):
+            for _ in range(etage.workers):
+                self._taches.append(asyncio.ensure_future(etage._travailler(sortie, fins_suivant)))
+        self._taches.append(asyncio.ensure_future(self._decouvrir(elements)))
+        return self
+
+    async def _decouvrir(self, elements):
+        stats = self.stats['decouverte']
+        premier = self.etages[0]
+        for cle, valeur in elements:
+            debut = time.perf_counter()
+            await self._places.acquire()
+            await premier.entree.put((cle, valeur))
+            stats['bloque'] += time.perf_counter() - debut
+            stats['traites'] += 1
+            _mesurer_file(stats, premier.entree)
+        for _ in range(premier.workers):
+            await premier.entree.put(_FIN)
+
+    async def obtenir(self, cle):
+        """Résultat pour `cle` ; à appeler dans l'ordre d'émission (chaque résultat rendu libère sa place)."""
+        if cle not in self._emises:
+            return None
+        stats = self.stats['consommateur']
+        debut = time.perf_counter()
+        if self._rendu is not None:
+            # Temps occupé du consommateur : classement du résultat précédent
+            stats['occupe'] += debut - self._rendu
+        _mesurer_file(stats, self.sortie)
+        if self._restreinte and cle not in self._recus:
+            valeur = self._valeurs[cle]
+            for etage in self.etages:
+                valeur = await etage.executer(cle, valeur)
+            self._recus[cle] = valeur
+        while cle not in self._recus and not self._termine:
+            element = await self.sortie.get()
+            if element is _FIN:
+                self._termine = True
+            else:
+                self._recus[element[0]] = element[1]
+        self._rendu = time.perf_counter()
+        stats['bloque'] += self._rendu - debut
+        if cle not in self._recus:
+            return None
+        stats['traites'] += 1
+        self._places.release()
+        return self._recus.pop(cle)
+
+    def restreindre(self) -> Dict:
+        """
+        Plus aucune lecture en avance : découverte et workers sont annulés, requêtes
+        en vol comprises, et obtenir() fait passer chaque élément suivant par les
+        étages à sa demande. Les résultats prêts mais pas encore lus sont jetés
+        (recalculés à la demande) et rendus {clé: résultat} à l'appelant.
+        """
+        if self._restreinte:
+            return {}
+        self._restreinte = True
+        for tache in self._taches:
+            tache.cancel()
+        self._taches.clear()
+        jetes, self._recus = self._recus, {}
+        while not self.sortie.empty():
+            element = self.sortie.get_nowait()
+            if element is not _FIN:
+                jetes[element[0]] = element[1]
+        return jetes
+
+    def fermer(self):
+        """
+        Annule découverte et workers (sortie anticipée du consommateur) et cumule
+        les métriques. Sans effet au second appel (fermeture dans un finally).
+        """
+        if self._ferme:
+            return
+        self._ferme = True
+        for tache in self._taches:
+            tache.cancel()
+        self._taches.clear()
+        METRIQUES_ETAGES.cumuler(self)
+        self.log_metriques()
+
+    def log_metriques(self):
+        if not self.stats['decouverte']['traites']:
+            return
+        logger.debug(f"🧵 {self.nom}: " + " → ".join(
+            f"{nom} {s['traites']} (occupé {s['occupe']:.1f}s, bloqué {s['bloque']:.1f}s, file max {s['profondeur_max']})"
+            for nom, s in self._toutes_stats()))
+
+    def _toutes_stats(self):
+        yield 'découverte', self.stats['decouverte']
+        for etage in self.etages:
+            yield etage.nom, etage.stats
+        yield 'consommateur', self.stats['consommateur']
+
+
+class EcrivainBdd:
+    """
+    Écrivain unique d'une chaîne : ecrire(méthode, *args) met l'écriture en file
+    (bornée) et rend la main ; la tâche de l'écrivain applique les écritures dans
+    l'ordre, par lots de `taille_lot` au plus, chacun dans une transaction
+    (Database.lot_ecritures). vider() attend que tout soit écrit : à appeler
+    avant de relire en BDD ce qui a été écrit.
+    """
+    def __init__(self, db, taille_lot: int = None):
+        self.db = db
+        self.taille_lot = max(1, taille_lot or config.ECRITURES_LOT)
+        self.file = asyncio.Queue(maxsize=self.taille_lot * 2)
+        self.stats = {'ecritures': 0, 'lots': 0, 'erreurs': 0, 'occupe': 0.0, 'bloque': 0.0,
+                      'profondeur_max': 0, 'profondeur_somme': 0, 'mesures': 0}
+        self._ferme = False
+        self._tache = asyncio.ensure_future(self._ecrire())
+
+    async def ecrire(self, methode: Callable, *args, **kwargs):
+        debut = time.perf_counter()
+        await self.file.put((methode, args, kwargs))
+        self.stats['bloque'] += time.perf_counter() - debut
+        _mesurer_file(self.stats, self.file)
+
+    async def _ecrire(self):
+        while True:
+            lot = [await self.file.get()]
+            while len(lot) < self.taille_lot and not self.file.empty():
+                lot.append(self.file.get_nowait())
+            debut = time.perf_counter()
+            try:
+                # Appels synchrones : aucune autre coroutine ne s'intercale dans la transaction
+                with self.db.lot_ecritures():
+                    for methode, args, kwargs in lot:
+                        try:
+                            methode(*args, **kwargs)
+                        except Exception as e:
+                            logger.error(f"❌ Écriture BDD {methode.__name__}: {type(e).__name__}: {e}")
+                            self.stats['erreurs'] += 1
+            except Exception as e:
+                logger.error(f"❌ Lot de {len(lot)} écriture(s) BDD perdu: {type(e).__name__}: {e}")
+                self.stats['erreurs'] += len(lot)
+            finally:
+                self.stats['occupe'] += time.perf_counter() - debut
+                self.stats['ecritures'] += len(lot)
+                self.stats['lots'] += 1
+                for _ in lot:
+                    self.file.task_done()
+
+    async def vider(self):
+        await self.file.join()
+
+    async def fermer(self):
+        """Écrit ce qui reste en file puis arrête l'écrivain (sans effet au second appel)."""
+        if self._ferme:
+            return
+        self._ferme = True
+        try:
+            await self.vider()
+        finally:
+            self._tache.cancel()
+            METRIQUES_ETAGES.cumuler_ecrivain(self)
+
+
+class MetriquesEtages:
+    """Métriques des chaînes d'étages cumulées sur le run (résumé de fin de run)."""
+    def __init__(self):
+        self.chaines = {}
+        self.ecrivain = {'ecritures': 0, 'lots': 0, 'erreurs': 0, 'occupe': 0.0, 'bloque': 0.0, 'profondeur_max': 0}
+
+    def cumuler(self, chaine: ChaineEtages):
+        cumul = self.chaines.setdefault(chaine.nom, {})
+        for nom, stats in chaine._toutes_stats():
+            total = cumul.setdefault(nom, _stats_vides())
+            for cle, valeur in stats.items():
+                total[cle] = max(total[cle], valeur) if cle == 'profondeur_max' else total[cle] + valeur
+
+    def cumuler_ecrivain(self, ecrivain: EcrivainBdd):
+        for cle in self.ecrivain:
+            valeur = ecrivain.stats[cle]
+            self.ecrivain[cle] = max(self.ecrivain[cle], valeur) if cle == 'profondeur_max' else self.ecrivain[cle] + valeur
+
+    def log_resume(self):
+        for nom_chaine, etages in self.chaines.items():
+            if not etages.get('découverte', {}).get('traites'):
+                continue
+            logger.info(f"🧵 Étages {nom_chaine}:")
+            for nom, s in etages.items():
+                moyenne = s['profondeur_somme'] / s['mesures'] if s['mesures'] else 0.0
+                erreurs = f" | {s['erreurs']} erreur(s)" if s['erreurs'] else ''
+                logger.info(f"   {nom:<12} {s['traites']:>4} | occupé {s['occupe']:.1f}s | bloqué {s['bloque']:.1f}s "
+                            f"| file max {s['profondeur_max']}, moy {moyenne:.1f}{erreurs}")
+        e = self.ecrivain
+        if e['ecritures']:
+            logger.info(f"   {'écrivain':<12} {e['ecritures']:>4} écriture(s) en {e['lots']} lot(s) "
+                        f"| occupé {e['occupe']:.1f}s | bloqué {e['bloque']:.1f}s | file max {e['profondeur_max']}"
+                        + (f" | {e['erreurs']} erreur(s)" if e['erreurs'] else ''))
+
+
+METRIQUES_ETAGES = MetriquesEtages()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Politique de fraîcheur du cache de vérification
+
+Une ligne de verifications_cache reste valable pendant une durée (TTL) choisie
+d'après son état :
+- sortie annoncée (date future) : TTL court, proportionnel au temps restant
+  avant la sortie (une date proche bouge encore, une date lointaine aussi mais
+  sans urgence)
+- sortie récente (moins de FRAICHEUR_RECENT_JOURS) : TTL moyen
+- sortie ancienne : TTL très long
+- date ou tome manquant : nouvel essai rapide, puis espacé (backoff) tant que
+  la page reste incomplète (nb_incomplets)
+
+Les précommandes déjà alertées ont en plus leur propre calendrier
+(prochaine_verification_precommande, table precommandes_suivi).
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import config
+
+logger = config.logger
+
+PALIERS = ('futur', 'recent', 'ancien', 'incomplet')
+_FORMAT_VERIFICATION = '%Y-%m-%d %H:%M:%S'
+
+
+def parser_date_sortie(date_sortie: str) -> Optional[datetime]:
+    """YYYY/MM/DD (ou 'Month DD, YYYY' d'Amazon en anglais) ; None si inconnue."""
+    if not date_sortie or date_sortie == 'Date inconnue':
+        return None
+    clean = date_sortie.replace('\u200e', '').strip()
+    for fmt in ('%Y/%m/%d', '%B %d, %Y'):
+        try:
+            return datetime.strptime(clean, fmt)
+        except ValueError:
+            pass
+    return None
+
+
+def est_incomplet(date_sortie: str, tome) -> bool:
+    """Date de sortie illisible ou tome absent : la page mérite un nouvel essai."""
+    return parser_date_sortie(date_sortie) is None or str(tome) in ('', 'None', 'N/A')
+
+
+def prochaine_verification_precommande(date_sortie: str, maintenant: datetime = None) -> Optional[datetime]:
+    """
+    Prochaine vérification d'une précommande (début de journée) : rapprochée à
+    l'approche de la sortie, espacée des mois avant (PRECOMMANDE_PALIERS), au
+    plus tard le lendemain de la sortie. None une fois la date passée : ce
+    n'est plus une précommande.
+    """
+    maintenant = maintenant or datetime.now()
+    date = parser_date_sortie(date_sortie)
+    if date is None or date.date() < maintenant.date():
+        return None
+    jours = (date.date() - maintenant.date()).days
+    ecart = next((m for n, m in config.PRECOMMANDE_PALIERS if jours <= n), config.PRECOMMANDE_ECART_MAX_J)
+    prochaine = (maintenant + timedelta(days=ecart)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return min(prochaine, date + timedelta(days=1))
+
+
+class PolitiqueFraicheur:
+    """
+    Choisit le TTL d'une ligne du cache et compte, sur le run, les
+    vérifications servies par le cache (fetch évités) et celles périmées.
+    """
+    def __init__(self):
+        self.stats = {palier: {'frais': 0, 'perimes': 0} for palier in PALIERS}
+
+    def palier(self, date_sortie: str, tome, maintenant: datetime = None) -> str:
+        maintenant = maintenant or datetime.now()
+        if est_incomplet(date_sortie, tome):
+            return 'incomplet'
+        date = parser_date_sortie(date_sortie)
+        if date > maintenant:
+            return 'futur'
+        if maintenant - date <= timedelta(days=config.FRAICHEUR_RECENT_JOURS):
+            return 'recent'
+        return 'ancien'
+
+    def ttl(self, date_sortie: str, tome, nb_incomplets: int = 0, maintenant: datetime = None) -> timedelta:
+        maintenant = maintenant or datetime.now()
+        palier = self.palier(date_sortie, tome, maintenant)
+        if palier == 'futur':
+            restant = parser_date_sortie(date_sortie) - maintenant
+            return min(max(restant * config.FRAICHEUR_FUTUR_PART, timedelta(hours=config.FRAICHEUR_FUTUR_MIN_H)),
+                       timedelta(days=config.FRAICHEUR_FUTUR_MAX_J))
+        if palier == 'recent':
+            return timedelta(days=config.FRAICHEUR_RECENT_TTL_J)
+        if palier == 'ancien':
+            return timedelta(days=config.FRAICHEUR_ANCIEN_TTL_J)
+        essais = min(max(nb_incomplets or 1, 1), 16)
+        return min(timedelta(hours=config.FRAICHEUR_INCOMPLET_H * 2 ** (essais - 1)),
+                   timedelta(days=config.FRAICHEUR_INCOMPLET_MAX_J))
+
+    def est_frais(self, ligne: Dict, maintenant: datetime = None) -> bool:
+        """ligne : date_verification, date, tome, nb_incomplets (verifications_cache)."""
+        maintenant = maintenant or datetime.now()
+        palier = self.palier(ligne.get('date'), ligne.get('tome'), maintenant)
+        try:
+            verifie = datetime.strptime(ligne.get('date_verification') or '', _FORMAT_VERIFICATION)
+        except ValueError:
+            verifie = None
+        frais = verifie is not None and maintenant - verifie < self.ttl(
+            ligne.get('date'), ligne.get('tome'), ligne.get('nb_incomplets') or 0, maintenant)
+        self.stats[palier]['frais' if frais else 'perimes'] += 1
+        return frais
+
+    def log_resume(self):
+        evites = sum(s['frais'] for s in self.stats.values())
+        perimes = sum(s['perimes'] for s in self.stats.values())
+        if not evites and not perimes:
+            return
+        detail = " | ".join(f"{s['frais']} {palier}" for palier, s in self.stats.items() if s['frais'])
+        logger.info(f"🗓️  Fraîcheur du cache: {evites} fetch(s) évité(s)" + (f" [{detail}]" if detail else '')
+                    + f", {perimes} ligne(s) périmée(s) re-vérifiée(s)")
+
+
+POLITIQUE_FRAICHEUR = PolitiqueFraicheur()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Enregistrement et rejeu des échanges HTTP (--record / --replay)
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import time
+from collections import defaultdict, deque
+from typing import Optional, Tuple
+
+import config
+from utils import normaliser_url
+
+logger = config.logger
+
+INDEX_ARCHIVE = 'index.jsonl'
+# Provenance de l'archive : Amazon, ou pages générées (simulateur, corpus de benchmark)
+ORIGINE_ARCHIVE = 'origine.json'
+
+
+def archive_synthetique(dossier: str) -> bool:
+    """Archive de pages générées et non enregistrées sur Amazon (les archives sans origine.json sont réelles)."""
+    chemin = os.path.join(dossier, ORIGINE_ARCHIVE)
+    if not os.path.exists(chemin):
+        return False
+    with open(chemin, 'r', encoding='utf-8') as f:
+        return bool(json.load(f).get('synthetique'))
+
+
+class HorlogeVirtuelle:
+    """
+    Horloge du mode rejeu : dormir() avance le temps au lieu d'attendre.
+    Injectée dans le pacer, le contrôleur adaptatif et le mémo HTTP, elle rend
+    le run déterministe et sans aucune pause réelle.
+    """
+    def __init__(self):
+        self.instant = 0.0
+        self.total_dormi = 0.0
+
+    def maintenant(self) -> float:
+        return self.instant
+
+    def avancer(self, secondes: float):
+        if secondes > 0:
+            self.instant += secondes
+
+    async def dormir(self, secondes: float):
+        if secondes > 0:
+            self.instant += secondes
+            self.total_dormi += secondes
+        await asyncio.sleep(0)  # rend la main à la boucle comme un vrai sleep
+
+
+class HttpRecorder:
+    """
+    Archive de chaque réponse réseau obtenue par get_html.
+
+    - index.jsonl : une ligne par réponse (seq, url, statut, durée, instant relatif, corps)
+    - corps/<seq>.html.gz : corps compressé (absent pour les réponses vides)
+    - origine.json : serveur enregistré ; synthetique si ce n'est pas Amazon
+      (MANGAVEGA_AMAZON_URL vers le simulateur)
+    """
+    def __init__(self, dossier: str, origine: str = None, synthetique: bool = None):
+        self.dossier = dossier
+        os.makedirs(os.path.join(dossier, 'corps'), exist_ok=True)
+        with open(os.path.join(dossier, ORIGINE_ARCHIVE), 'w', encoding='utf-8') as f:
+            json.dump({'origine': origine or config.AMAZON_BASE_URL,
+                       'synthetique': config.AMAZON_SIMULE if synthetique is None else synthetique}, f)
+        self._index = open(os.path.join(dossier, INDEX_ARCHIVE), 'w', encoding='utf-8')
+        self._debut = time.monotonic()
+        self.nb = 0
+
+    def enregistrer(self, url: str, statut: int, corps: Optional[bytes], duree: float):
+        """Archive une réponse telle que reçue (octets bruts, avant décodage)."""
+        chemin_corps = None
+        if corps:
+            chemin_corps = f"corps/{self.nb:06d}.html.gz"
+            with gzip.open(os.path.join(self.dossier, chemin_corps), 'wb', compresslevel=6) as f:
+                f.write(corps)
+        self._index.write(json.dumps({
+            'seq': self.nb,
+            'url': url,
+            'statut': statut,
+            'duree': round(duree, 3),
+            't': round(time.monotonic() - self._debut, 3),
+            'corps': chemin_corps,
+        }, ensure_ascii=False) + '\n')
+        self._index.flush()
+        self.nb += 1
+
+    def fermer(self):
+        self._index.close()
+        logger.info(f"🎞️  Enregistrement HTTP: {self.nb} réponse(s) archivée(s) dans {self.dossier}")
+
+
+class HttpReplayer:
+    """
+    Rejoue une archive de HttpRecorder, sans aucun accès réseau.
+
+    Les réponses d'une même URL (normalisée) sont servies dans l'ordre
+    d'enregistrement ; la dernière est resservie si l'URL est demandée plus
+    souvent qu'au run enregistré. Chaque réponse avance l'horloge virtuelle
+    de sa durée d'origine.
+    """
+    def __init__(self, dossier: str, horloge: HorlogeVirtuelle):
+        self.dossier = dossier
+        self.horloge = horloge
+        self._reponses = defaultdict(deque)
+        self.stats = {'servies': 0, 'absentes': 0}
+        chemin = os.path.join(dossier, INDEX_ARCHIVE)
+        if not os.path.exists(chemin):
+            raise FileNotFoundError(f"Archive de rejeu introuvable: {chemin}")
+        with open(chemin, 'r', encoding='utf-8') as f:
+            for ligne in f:
+                if ligne.strip():
+                    entree = json.loads(ligne)
+                    self._reponses[normaliser_url(entree['url'])].append(entree)
+        self.nb = sum(len(file) for file in self._reponses.values())
+
+    def _lire_corps(self, entree: dict) -> bytes:
+        if not entree.get('corps'):
+            return b''
+        with gzip.open(os.path.join(self.dossier, entree['corps']), 'rb') as f:
+            return f.read()
+
+    def servir(self, url: str) -> Optional[Tuple[int, bytes]]:
+        """Retourne (statut, corps brut) enregistré pour cette URL, None si elle est absente de l'archive."""
+        file = self._reponses.get(normaliser_url(url))
+        if not file:
+            self.stats['absentes'] += 1
+            return None
+        entree = file.popleft() if len(file) > 1 else file[0]
+        self.horloge.avancer(entree.get('duree', 0))
+        self.stats['servies'] += 1
+        return entree['statut'], self._lire_corps(entree)
+
+    def log_resume(self):
+        s = self.stats
+        logger.info(f"🎞️  Rejeu HTTP: {s['servies']} réponse(s) servie(s), {s['absentes']} URL(s) absente(s) "
+                    f"de l'archive | temps virtuel {self.horloge.instant:.0f}s "
+                    f"(dont {self.horloge.total_dormi:.0f}s de pauses évitées)")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Cache des réponses HTTP Amazon (disque + mémoire du run)
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+import config
+from throttle import classe_requete
+from utils import normaliser_url
+
+logger = config.logger
+
+# Modes acceptés par --cache-mode
+MODES_CACHE = ('off', 'read-write', 'read-only')
+
+
+class ResponseCache:
+    """
+    Stockage compressé et adressé par contenu des pages Amazon.
+
+    - Index SQLite : clé (URL normalisée) → empreinte SHA-256 du corps, statut, date
+    - Objets : corps gzip dans objets/<2 premiers hex>/<empreinte>.html.gz
+      (deux URLs servant le même HTML partagent le même objet)
+    - TTL par classe d'URL (config.CACHE_HTTP_TTL) : produit, recherche, autre,
+      et 'negatif' pour les 404
+    - Pages partielles (lecture à sentinelles) : clé URL#variante, servies aux
+      seules lectures de même variante ; une page complète fraîche leur est préférée
+    """
+    def __init__(self, mode: str = 'read-write', dossier: str = None, ttl: dict = None):
+        if mode not in MODES_CACHE:
+            raise ValueError(f"Mode de cache inconnu: {mode} (attendu: {', '.join(MODES_CACHE)})")
+        self.mode = mode
+        self.dossier = dossier or config.CACHE_HTTP_DIR
+        self.ttl = ttl or config.CACHE_HTTP_TTL
+        self.stats = {'hits': 0, 'partiels': 0, 'negatifs': 0, 'misses': 0, 'ecritures': 0}
+        self._dossier_objets = os.path.join(self.dossier, 'objets')
+        os.makedirs(self._dossier_objets, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.dossier, 'index.db'), timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS reponses (
+                cle TEXT PRIMARY KEY,
+                classe TEXT NOT NULL,
+                statut INTEGER NOT NULL,
+                empreinte TEXT,
+                date_stockage REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        if self.ecriture_autorisee:
+            self.purger()
+
+    @property
+    def ecriture_autorisee(self) -> bool:
+        return self.mode == 'read-write'
+
+    @staticmethod
+    def cle(url: str, variante: str = None) -> str:
+        """Clé d'index : URL produit canonique (/dp/ASIN), URL complète sinon ;
+        suivie de #variante pour une page partielle."""
+        cle = normaliser_url(url)
+        return f"{cle}#{variante}" if variante else cle
+
+    def _chemin_objet(self, empreinte: str) -> str:
+        return os.path.join(self._dossier_objets, empreinte[:2], f"{empreinte}.html.gz")
+
+    def _ligne_fraiche(self, cle: str) -> Optional[Tuple]:
+        row = self._conn.execute(
+            'SELECT classe, statut, empreinte, date_stockage FROM reponses WHERE cle = ?', (cle,)
+        ).fetchone()
+        if row and time.time() - row[3] <= self.ttl.get(row[0], 0):
+            return row
+        return None
+
+    def lire(self, url: str, variante: str = None) -> Optional[Tuple[int, Optional[str], bool]]:
+        """
+        Retourne (statut, html, partielle) si une entrée fraîche existe, None sinon.
+        Une entrée négative (404) retourne (404, None, False). Avec `variante`,
+        la page complète est cherchée d'abord, puis la page partielle de cette
+        variante (partielle=True).
+        """
+        cles = [self.cle(url)] + ([self.cle(url, variante)] if variante else [])
+        for cle in cles:
+            row = self._ligne_fraiche(cle)
+            if row is None:
+                continue
+            classe, statut, empreinte, date_stockage = row
+            if statut == 404:
+                self.stats['negatifs'] += 1
+                return (404, None, False)
+            try:
+                with gzip.open(self._chemin_objet(empreinte), 'rt', encoding='utf-8') as f:
+                    html = f.read()
+            except OSError:
+                continue
+            partielle = cle != cles[0]
+            self.stats['partiels' if partielle else 'hits'] += 1
+            return (statut, html, partielle)
+        self.stats['misses'] += 1
+        return None
+
+    def ecrire(self, url: str, statut: int, html: Optional[str], variante: str = None):
+        """
+        Stocke une réponse 200 (corps compressé) ou une entrée négative 404.
+        variante : page partielle (lecture arrêtée), stockée sous sa propre clé.
+        """
+        if not self.ecriture_autorisee:
+            return
+        if statut == 404:
+            classe, empreinte, variante = 'negatif', None, None
+        elif statut == 200 and html:
+            classe = classe_requete(url)
+            corps = html.encode('utf-8')
+            empreinte = hashlib.sha256(corps).hexdigest()
+            chemin = self._chemin_objet(empreinte)
+            if not os.path.exists(chemin):
+                os.makedirs(os.path.dirname(chemin), exist_ok=True)
+                tmp = chemin + '.tmp'
+                with gzip.open(tmp, 'wb', compresslevel=6) as f:
+                    f.write(corps)
+                os.replace(tmp, chemin)
+        else:
+            return
+        self._conn.execute(
+            'INSERT OR REPLACE INTO reponses (cle, classe, statut, empreinte, date_stockage) VALUES (?, ?, ?, ?, ?)',
+            (self.cle(url, variante), classe, statut, empreinte, time.time())
+        )
+        self._conn.commit()
+        self.stats['ecritures'] += 1
+
+    def invalider(self, url: str):
+        """Supprime les entrées d'une URL, page complète et partielles (ex: page servie en 200 mais invalide)."""
+        if not self.ecriture_autorisee:
+            return
+        cle = self.cle(url)
+        self._conn.execute('DELETE FROM reponses WHERE cle = ? OR substr(cle, 1, ?) = ?',
+                           (cle, len(cle) + 1, cle + '#'))
+        self._conn.commit()
+
+    def purger(self):
+        """Supprime les entrées expirées et les objets qui ne sont plus référencés."""
+        maintenant = time.time()
+        for classe, ttl in self.ttl.items():
+            self._conn.execute(
+                'DELETE FROM reponses WHERE classe = ? AND date_stockage < ?',
+                (classe, maintenant - ttl)
+            )
+        self._conn.commit()
+        referencees = {row[0] for row in self._conn.execute(
+            'SELECT DISTINCT empreinte FROM reponses WHERE empreinte IS NOT NULL')}
+        for sous_dossier in os.listdir(self._dossier_objets):
+            chemin_sd = os.path.join(self._dossier_objets, sous_dossier)
+            if not os.path.isdir(chemin_sd):
+                continue
+            for nom in os.listdir(chemin_sd):
+                if nom.split('.')[0] not in referencees:
+                    try:
+                        os.remove(os.path.join(chemin_sd, nom))
+                    except OSError:
+                        pass
+
+    def fermer(self):
+        self._conn.close()
+
+    def log_resume(self):
+        s = self.stats
+        logger.info(f"🗄️  Cache HTTP ({self.mode}): {s['hits']} hit(s), {s['partiels']} partiel(s), {s['negatifs']} négatif(s), "
+                    f"{s['misses']} miss, {s['ecritures']} écriture(s)")
+
+
+class SingleFlight:
+    """
+    Déduplication des fetchs d'une même URL pendant un run.
+
+    - En vol : si une requête identique est déjà en cours, on attend son résultat
+      au lieu de refaire l'aller-retour réseau (un seul corps décodé partagé)
+    - Mémo : les pages obtenues restent servies depuis la mémoire pendant
+      MEMO_HTTP_TTL secondes (LRU borné à MEMO_HTTP_MAX pages)
+    """
+    def __init__(self, ttl: float = None, taille_max: int = None, horloge=time.monotonic):
+        self._horloge = horloge
+        self.ttl = config.MEMO_HTTP_TTL if ttl is None else ttl
+        self.taille_max = config.MEMO_HTTP_MAX if taille_max is None else taille_max
+        self._en_vol = {}
+        self._memo = OrderedDict()  # cle -> (instant, html)
+        self.stats = {'memo': 0, 'partages': 0, 'fetchs': 0}
+
+    def _lire_memo(self, cle: str) -> Optional[str]:
+        entree = self._memo.get(cle)
+        if entree is None:
+            return None
+        instant, html = entree
+        if self._horloge() - instant > self.ttl:
+            del self._memo[cle]
+            return None
+        self._memo.move_to_end(cle)
+        return html
+
+    def _ecrire_memo(self, cle: str, html: str):
+        self._memo[cle] = (self._horloge(), html)
+        self._memo.move_to_end(cle)
+        while len(self._memo) > self.taille_max:
+            self._memo.popitem(last=False)
+
+    def consulter(self, cle: str) -> Optional[str]:
+        """Page déjà en mémo pour cette clé, sans lancer de fetch."""
+        html = self._lire_memo(cle)
+        if html is not None:
+            self.stats['memo'] += 1
+        return html
+
+    def oublier(self, cle: str):
+        """Oublie la page et ses variantes partielles (clé#sentinelles)."""
+        for k in [k for k in self._memo if k == cle or k.startswith(cle + '#')]:
+            del self._memo[k]
+
+    async def executer(self, cle: str, fetch: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Retourne la page pour cette clé : mémo, requête en vol partagée, ou nouveau fetch."""
+        html = self._lire_memo(cle)
+        if html is not None:
+            self.stats['memo'] += 1
+            return html
+        if cle in self._en_vol:
+            self.stats['partages'] += 1
+            return await asyncio.shield(self._en_vol[cle])
+        futur = asyncio.get_running_loop().create_future()
+        self._en_vol[cle] = futur
+        self.stats['fetchs'] += 1
+        try:
+            html = await fetch()
+        except asyncio.CancelledError:
+            futur.cancel()
+            raise
+        except Exception as e:
+            # Les requêtes partagées reçoivent la vraie erreur (et non un CancelledError) ;
+            # exception() la marque comme lue si personne n'attendait
+            futur.set_exception(e)
+            futur.exception()
+            raise
+        finally:
+            del self._en_vol[cle]
+        futur.set_result(html)
+        if html:
+            self._ecrire_memo(cle, html)
+        return html
+
+    def log_resume(self):
+        s = self.stats
+        if s['memo'] or s['partages']:
+            logger.info(f"♻️  Dédup HTTP: {s['fetchs']} fetch(s), {s['memo']} servi(s) depuis le mémo, "
+                        f"{s['partages']} requête(s) en vol partagée(s)")
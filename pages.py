@@ -0,0 +1,943 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Analyse des pages Amazon (produit et recherche)
+
+- ProductPage : page produit (/dp/) analysée une seule fois, champs lus à la
+  demande (titre, détails, format, couverture, lot, volumes liés, version papier)
+- PageRecherche / SearchResult : grille de résultats d'une page de recherche
+  (/s?), un SearchResult par item, classé par classer_resultat
+- moteur lxml (ProductPageLxml, PageRechercheLxml) : mêmes champs par XPath
+  précompilées ; page_produit / page_recherche choisissent le moteur selon
+  config.MOTEUR_EXTRACTION ('bs4', 'lxml' ou 'diff')
+- mode diff : les deux moteurs sur chaque page, résultat bs4 conservé,
+  désaccords comptés et journalisés dans DIFF_MOTEURS
+- CLI : python pages.py ARCHIVE|DOSSIER|FICHIER... compare bs4 et lxml sur des
+  pages enregistrées (code retour 1 en cas de désaccord)
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import lxml.html
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import etree
+
+import config
+from reponses import PageHtml, decoder, detecter_blocage
+from utils import (
+    extraire_asin, extraire_editeur, extraire_numero_tome, convertir_editeur_romaji,
+    normaliser_titre, strip_type_suffix, est_asin_hors_sujet_manuel, est_asin_papier, est_ebook,
+    est_lot_titre, est_produit_derive
+)
+
+logger = config.logger
+
+# Caractères Unicode invisibles présents dans les détails produit (U+200E, U+200F, etc.)
+_INVISIBLES = re.compile(r'[\u200e\u200f\u200b\u202a\u202b\u202c\xa0]')
+_ASIN_DP = re.compile(r'/dp/([A-Z0-9]{10})')
+_LABEL_TOME = re.compile(r'(?:Vol\.?\s*|第?\s*)(\d+(?:[.,]\d+)?)\s*巻?|(\d+(?:[.,]\d+)?)\s*巻')
+
+# Liens vers un ASIN selon les formats d'URL Amazon
+_ASIN_PATTERNS = [
+    re.compile(r'/dp/([A-Z0-9]{10})'),           # /dp/ASIN (classique)
+    re.compile(r'/gp/product/([A-Z0-9]{10})'),   # /gp/product/ASIN (ancien format)
+    re.compile(r'/product/([A-Z0-9]{10})'),      # /product/ASIN
+]
+_ASIN_NU = re.compile(r'^[A-Z0-9]{10}$')
+
+# Mots-clés des swatches de format (extraire_version_papier)
+_PAPIER_KEYWORDS = {
+    'ln': ['文庫', 'Bunko'],
+    'all': ['コミック', 'Comic', '文庫', 'Bunko', '単行本', 'Tankobon', 'ペーパーバック', 'Paperback'],
+    None: ['コミック', 'Comic'],
+}
+_KINDLE_KEYWORDS = ['kindle', 'Kindle', 'デジタル', '電子']
+
+
+def _asin_depuis_href(href: str) -> Optional[str]:
+    """Extrait un ASIN depuis un href avec plusieurs patterns"""
+    for pattern in _ASIN_PATTERNS:
+        match = pattern.search(href)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _asin_depuis_element(element) -> Optional[str]:
+    """Extrait un ASIN depuis un élément HTML (href, data-asin, data-value), puis son parent"""
+    asin = _asin_depuis_href(element.get('href', ''))
+    if asin:
+        return asin
+    for noeud in (element, element.parent):
+        if noeud is None:
+            continue
+        for attr in ['data-asin', 'data-value', 'data-dp-url']:
+            val = noeud.get(attr, '')
+            if val:
+                asin = _asin_depuis_href(val)
+                if asin:
+                    return asin
+                # data-asin peut contenir directement l'ASIN sans URL
+                if _ASIN_NU.match(val):
+                    return val
+    return None
+
+
+def _tome_depuis_label(label: str):
+    """Numéro de tome d'un label Bulk ("1巻", "Vol. 1"), None si absent."""
+    tome_match = _LABEL_TOME.search(label)
+    if not tome_match:
+        return None
+    raw = tome_match.group(1) or tome_match.group(2)
+    v = float(raw.replace(',', '.'))
+    return int(v) if v == int(v) else v
+
+
+class ProductPage:
+    """
+    Page produit /dp/ parsée une seule fois, quel que soit le nombre d'extracteurs.
+
+    Le soup n'est construit qu'au premier accès, et chaque élément extrait
+    (titre, détails, format, couverture, lot, volumes liés, version papier)
+    est mémorisé sur l'objet. Une page obtenue par get_html (PageHtml) porte
+    sa ProductPage : Bulk puis vérification du même ASIN partagent le parsing.
+
+    Les accès au DOM passent par les méthodes _lire_* (BeautifulSoup ici,
+    XPath dans ProductPageLxml) ; l'interprétation des textes est commune.
+    """
+    moteur = 'bs4'
+
+    def __init__(self, html: str):
+        self.html = html
+        self._volumes = {}   # (asin, nom_manga, sources) -> résultat
+        self._papier = {}    # format_cible -> URL papier
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return BeautifulSoup(self.html, 'lxml')
+
+    # ------------------------------------------------------------------
+    # Accès au DOM (BeautifulSoup)
+    # ------------------------------------------------------------------
+
+    def _lire_titre(self) -> Optional[str]:
+        """Texte de productTitle, None si l'élément est absent."""
+        element = self.soup.find("span", {"id": "productTitle"})
+        return element.get_text(strip=True) if element else None
+
+    def _lire_details(self) -> List[str]:
+        """Textes des <li> de detailBulletsWrapper_feature_div."""
+        wrapper = self.soup.find("div", {"id": "detailBulletsWrapper_feature_div"})
+        return [li.get_text() for li in wrapper.find_all("li")] if wrapper else []
+
+    def _lire_couverture(self) -> Optional[str]:
+        image = self.soup.find("img", {"id": "landingImage"})
+        return image.get('src') if image else None
+
+    def _lire_format_selectionne(self) -> Optional[str]:
+        """Texte du format sélectionné dans tmmSwatches."""
+        format_section = self.soup.find("div", {"id": "tmmSwatches"})
+        if not format_section:
+            return None
+        selected = format_section.find("span", class_="a-button-selected") or format_section.find("li", class_="selected")
+        return selected.get_text(strip=True) if selected else None
+
+    def _lire_detail_bullets(self) -> List[str]:
+        """Textes des <li> de detailBullets_feature_div."""
+        detail_bullets = self.soup.find("div", {"id": "detailBullets_feature_div"})
+        return [li.get_text() for li in detail_bullets.find_all("li")] if detail_bullets else []
+
+    def _lire_breadcrumb(self) -> Optional[str]:
+        breadcrumb = self.soup.find("div", {"id": "wayfinding-breadcrumbs_feature_div"})
+        return breadcrumb.get_text() if breadcrumb else None
+
+    # ------------------------------------------------------------------
+    # Éléments de la page
+    # ------------------------------------------------------------------
+
+    @cached_property
+    def _titre_brut(self) -> Optional[str]:
+        return self._lire_titre()
+
+    @property
+    def a_titre(self) -> bool:
+        """Élément productTitle présent (même vide)."""
+        return self._titre_brut is not None
+
+    @property
+    def titre(self) -> str:
+        return self._titre_brut or ""
+
+    @cached_property
+    def invalidite(self) -> Optional[str]:
+        """Motif d'invalidité si la page n'a pas de titre (captcha, rate_limit, page_courte...)."""
+        if self.titre:
+            return None
+        # Marqueur déjà cherché sur les octets par get_html si la page est une PageHtml
+        blocage = self.html.blocage if isinstance(self.html, PageHtml) else detecter_blocage(self.html)
+        if blocage:
+            return blocage
+        if len(self.html) < 5000:  # Page trop courte = probablement erreur
+            return 'page_courte'
+        return 'titre_non_trouve'
+
+    @cached_property
+    def lot(self) -> Dict:
+        """Lot/set détecté depuis le titre : est_lot, et lot_debut/lot_fin ou lot_total."""
+        titre = self.titre
+        if not est_lot_titre(titre):
+            return {'est_lot': False}
+        lot = {'est_lot': True}
+        # Essayer d'extraire la plage (ex: "1-3巻" ou "全5巻")
+        match_plage = re.search(r'(\d+)-(\d+)巻', titre)
+        if match_plage:
+            lot['lot_debut'] = int(match_plage.group(1))
+            lot['lot_fin'] = int(match_plage.group(2))
+        elif '全' in titre:
+            match_total = re.search(r'全(\d+)巻', titre)
+            if match_total:
+                lot['lot_total'] = int(match_total.group(1))
+        return lot
+
+    @cached_property
+    def details(self) -> Dict[str, str]:
+        """
+        Date et éditeur (brut) des détails produit.
+        Amazon peut servir la page en japonais (発売日/出版社) ou en anglais
+        (Publication date/Publisher) selon les cookies de session : on cherche les deux.
+        """
+        details = {}
+        for text in self._lire_details():
+            if "発売日" in text or "Publication date" in text:
+                details['date'] = _INVISIBLES.sub('', text.split(":")[-1].strip()).strip()
+            elif "出版社" in text or "Publisher" in text:
+                editeur_texte = _INVISIBLES.sub('', text.split(":")[-1].strip()).strip()
+                # Enlever la date entre parenthèses
+                details['editeur'] = re.split(r'\s*\(', editeur_texte)[0].strip()
+        return details
+
+    @cached_property
+    def tome(self):
+        """Tome depuis le titre (fonction unique de parsing, utils.py) ; None pour un lot."""
+        if self.lot['est_lot'] or not self.a_titre:
+            return None
+        return extraire_numero_tome(self.titre)
+
+    @cached_property
+    def couverture(self) -> Optional[str]:
+        return self._lire_couverture() or None
+
+    @cached_property
+    def format(self) -> Tuple[Optional[str], Optional[str]]:
+        """(format du livre, méthode de détection) : 単行本, 文庫, ペーパーバック, Kindle版..."""
+        # Méthode 1: sélecteur de format (tmmSwatches)
+        format_text = self._lire_format_selectionne()
+        if format_text:
+            return format_text, 'tmmSwatches'
+        # Méthode 2: détails du produit
+        for text in self._lire_detail_bullets():
+            if any(f in text for f in ['単行本', '文庫', 'ペーパーバック', 'コミック', 'Paperback', 'Tankobon']):
+                return text.strip()[:50], 'détails'
+        # Méthode 3: titre lui-même, ex: (角川スニーカー文庫), (コミックス)
+        if '文庫' in self.titre:
+            return '文庫', 'titre'
+        if 'コミック' in self.titre:
+            return 'コミック', 'titre'
+        # Méthode 4: breadcrumb / catégorie
+        bc_text = self._lire_breadcrumb()
+        if bc_text:
+            if '文庫' in bc_text:
+                return '文庫', 'breadcrumb'
+            if 'コミック' in bc_text or 'マンガ' in bc_text:
+                return 'コミック', 'breadcrumb'
+            if '単行本' in bc_text:
+                return '単行本', 'breadcrumb'
+        return None, None
+
+    # ------------------------------------------------------------------
+    # Extracteurs (résultats mémorisés)
+    # ------------------------------------------------------------------
+
+    def infos(self, debug: bool = False) -> Dict:
+        """Infos produit (nouveau dict à chaque appel : les appelants le complètent)."""
+        infos = {}
+        if self.invalidite:
+            infos['_page_invalide'] = self.invalidite
+        titre_texte = self.titre
+        infos['titre'] = titre_texte  # Sauvegarder le titre pour debug
+        if debug and titre_texte:
+            logger.info(f"      [DEBUG] Titre brut: '{titre_texte}'")
+
+        infos.update(self.lot)
+
+        details = self.details
+        if 'date' in details:
+            infos['date'] = details['date']
+        if 'editeur' in details:
+            infos['editeur'] = convertir_editeur_romaji(details['editeur'])
+            if debug:
+                logger.info(f"      [DEBUG] Éditeur trouvé: {details['editeur']} → {infos['editeur']}")
+
+        if not infos['est_lot'] and self.a_titre:
+            if self.tome is not None:
+                infos['tome'] = self.tome
+                if debug:
+                    logger.info(f"      [DEBUG] Tome trouvé: {self.tome}")
+            elif debug:
+                logger.warning(f"      [DEBUG] ⚠️  AUCUN TOME trouvé dans: '{titre_texte}'")
+
+        if self.couverture:
+            infos['couverture_url'] = self.couverture
+
+        format_livre, methode = self.format
+        if format_livre:
+            infos['format'] = format_livre
+            if debug:
+                logger.info(f"      [DEBUG] Format trouvé ({methode}): {format_livre}")
+        return infos
+
+    def version_papier(self, format_cible: str = None, debug: bool = False) -> Optional[str]:
+        """Lien vers la version papier depuis une page Kindle (voir scraper.extraire_version_papier)."""
+        if format_cible not in self._papier:
+            self._papier[format_cible] = self._chercher_version_papier(format_cible, debug)
+        return self._papier[format_cible]
+
+    def _chercher_version_papier(self, format_cible: str, debug: bool) -> Optional[str]:
+        papier_keywords = _PAPIER_KEYWORDS.get(format_cible, _PAPIER_KEYWORDS[None])
+        soup = self.soup
+
+        # Section des formats (tmmSwatches ou MediaMatrix)
+        formats_section = soup.find("div", {"id": "tmmSwatches"}) or soup.find("div", {"id": "MediaMatrix"})
+        if debug:
+            logger.info(f"      [DEBUG] formats_section trouvée: {formats_section is not None}")
+
+        if formats_section:
+            for link in formats_section.find_all("a"):
+                text = link.get_text().strip()
+                is_papier = any(kw in text for kw in papier_keywords)
+                is_kindle = any(kw in text for kw in _KINDLE_KEYWORDS)
+                if debug:
+                    logger.info(f"      [DEBUG] Link: '{text[:30]}' papier={is_papier} kindle={is_kindle} "
+                                f"href={link.get('href', '')[:50]}")
+                if is_papier and not is_kindle:
+                    asin_papier = _asin_depuis_element(link)
+                    if asin_papier:
+                        if debug:
+                            logger.info(f"      [DEBUG] ASIN extrait: {asin_papier}")
+                        return f"https://www.amazon.co.jp/dp/{asin_papier}"
+
+        # Alternative: swatches individuels
+        swatches = soup.find_all("li", class_=lambda x: x and 'swatchElement' in x)
+        if debug:
+            logger.info(f"      [DEBUG] Swatches trouvés: {len(swatches)}")
+
+        for swatch in swatches:
+            text = swatch.get_text().strip()
+            link = swatch.find("a", href=True)
+            if link:
+                is_papier = any(kw in text for kw in papier_keywords)
+                is_kindle = any(kw in text for kw in _KINDLE_KEYWORDS)
+                if is_papier and not is_kindle:
+                    # Aussi chercher dans le swatch (li) directement
+                    asin_papier = _asin_depuis_element(link) or _asin_depuis_element(swatch)
+                    if asin_papier:
+                        return f"https://www.amazon.co.jp/dp/{asin_papier}"
+        return None
+
+    def volumes_lies(self, asin: str, nom_manga: str, sources: List[str]) -> Dict:
+        """
+        ASINs des sections Bulk / From the Publisher / Frequently bought together
+        (voir scraper.extraire_volumes_depuis_page pour la sémantique des sources).
+        """
+        cle = (asin, nom_manga, tuple(sources))
+        if cle not in self._volumes:
+            self._volumes[cle] = self._chercher_volumes(asin, nom_manga, sources)
+        # Copie : l'appelant peut compléter le résultat
+        return {k: (dict(v) if isinstance(v, dict) else list(v)) for k, v in self._volumes[cle].items()}
+
+    @staticmethod
+    def _liens_asins(conteneur, asins_trouves: set) -> List[str]:
+        """Liens /dp/ bruts d'un conteneur, hors ASINs déjà vus."""
+        asins = []
+        for link in conteneur.find_all("a", href=True):
+            match = _ASIN_DP.search(link.get('href', ''))
+            if match and match.group(1) not in asins_trouves:
+                asins.append(match.group(1))
+                asins_trouves.add(match.group(1))
+        return asins
+
+    @staticmethod
+    def _items_bulk(conteneur, asins_trouves: set, bulk_asins: List[str], bulk_tomes: Dict):
+        """Items d'un bloc Bulk avec leur label de tome, liens bruts en fallback."""
+        items = conteneur.find_all("div", class_="pbnx-single-product")
+        if not items:
+            items = conteneur.find_all("li")
+        for item in items:
+            link = item.find("a", href=True)
+            if not link:
+                continue
+            match = _ASIN_DP.search(link.get('href', ''))
+            if match and match.group(1) not in asins_trouves:
+                vol_asin = match.group(1)
+                bulk_asins.append(vol_asin)
+                asins_trouves.add(vol_asin)
+                tome = _tome_depuis_label(item.get_text())
+                if tome is not None:
+                    bulk_tomes[vol_asin] = tome
+        # Fallback : si items non trouvés, extraire les liens bruts
+        if not bulk_asins:
+            bulk_asins.extend(ProductPage._liens_asins(conteneur, asins_trouves))
+
+    def _chercher_volumes(self, asin: str, nom_manga: str, sources: List[str]) -> Dict:
+        soup = self.soup
+        result = {"bulk": [], "publisher": []}
+        asins_trouves = {asin}  # L'ASIN source n'est pas un volume lié
+
+        # SECTION 1: Bulk purchases (新品まとめ買い) — contient uniquement les volumes de la série
+        if "bulk" in sources:
+            bulk_asins = []
+            bulk_tomes = {}  # {asin: tome_num} — mapping tome depuis le label Bulk
+
+            # Méthode 1: pbnx-desktop-box avec titre du manga
+            nom_clean = strip_type_suffix(nom_manga)
+            titre_cle = normaliser_titre(nom_clean[:8] if len(nom_clean) >= 8 else nom_clean)
+            for box in soup.find_all("div", class_="pbnx-desktop-box"):
+                titre_span = box.find("span", class_="a-size-base")
+                if titre_span and titre_cle in normaliser_titre(titre_span.get_text(strip=True)):
+                    self._items_bulk(box, asins_trouves, bulk_asins, bulk_tomes)
+                    break
+
+            # Méthode 2: Header "Bulk purchases" ou "新品まとめ買い"
+            if not bulk_asins:
+                bulk_header = soup.find(lambda tag: tag.name in ['h2', 'h3', 'div', 'span'] and
+                                        ('Bulk purchases' in tag.get_text() or '新品まとめ買い' in tag.get_text()))
+                if bulk_header:
+                    parent = bulk_header.find_parent('div', class_=lambda x: x and 'a-section' in x) or bulk_header.find_parent('div')
+                    # Header et items dans des branches DOM séparées : remonter d'un cran
+                    if parent and not any(_ASIN_DP.search(a.get('href', '')) for a in parent.find_all("a", href=True)):
+                        parent = parent.find_parent('div') or parent
+                    if parent:
+                        self._items_bulk(parent, asins_trouves, bulk_asins, bulk_tomes)
+
+            if bulk_asins:
+                if bulk_tomes:
+                    logger.info(f"      📦 Bulk: {len(bulk_asins)} volume(s) trouvé(s) ({len(bulk_tomes)} tome(s) identifié(s))")
+                else:
+                    logger.info(f"      📦 Bulk: {len(bulk_asins)} volume(s) trouvé(s)")
+            result["bulk"] = bulk_asins
+            result["bulk_tomes"] = bulk_tomes
+
+        # Bulk trouvé → pas besoin de Publisher (moins précis), sauf si FBT est demandé
+        if result["bulk"] and "frequently_bought" not in sources:
+            return result
+
+        # SECTION 2: From the Publisher / 出版社より — fallback si Bulk absent
+        if "publisher" in sources and not result["bulk"]:
+            publisher_asins = []
+            publisher_header = soup.find(lambda tag: tag.name in ['h2', 'h3', 'div', 'span'] and
+                                         ('From the Publisher' in tag.get_text() or
+                                          '出版社より' in tag.get_text() or
+                                          'Products related' in tag.get_text()))
+            if publisher_header:
+                parent = publisher_header.find_parent('div', class_='a-section') or publisher_header.find_parent('div')
+                if parent:
+                    publisher_asins = self._liens_asins(parent, asins_trouves)
+            if publisher_asins:
+                logger.info(f"      🏢 From Publisher: {len(publisher_asins)} volume(s) trouvé(s)")
+            result["publisher"] = publisher_asins
+
+        # SECTION 3: Frequently bought together / よく一緒に購入されている商品
+        # (hors-sujets fréquents : seulement pour les nouvelles séries ajoutées manuellement)
+        if "frequently_bought" in sources:
+            frequently_asins = []
+            fbt_header = soup.find(lambda tag: tag.name in ['h2', 'h3', 'div', 'span'] and
+                                   ('Frequently bought together' in tag.get_text() or
+                                    'よく一緒に購入されている商品' in tag.get_text()))
+            if fbt_header:
+                parent = fbt_header.find_parent('div', id='sims-fbt') or \
+                         fbt_header.find_parent('div', class_='a-section') or \
+                         fbt_header.find_parent('div')
+                if parent:
+                    frequently_asins = self._liens_asins(parent, asins_trouves)
+            # Alternative: chercher par ID "sims-fbt"
+            if not frequently_asins:
+                fbt_section = soup.find('div', id='sims-fbt')
+                if fbt_section:
+                    frequently_asins = self._liens_asins(fbt_section, asins_trouves)
+            if frequently_asins:
+                logger.info(f"      🛒 Frequently bought: {len(frequently_asins)} volume(s) trouvé(s)")
+            result["frequently_bought"] = frequently_asins
+
+        return result
+
+
+# ============================================================================
+# MOTEUR LXML : XPath précompilées sur lxml.html
+# ============================================================================
+
+def _xp_classe(nom: str) -> str:
+    """Prédicat XPath équivalent au sélecteur CSS .nom"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {nom} ')"
+
+
+# Textes visibles d'un élément : comme bs4 get_text(), sans script/style/template
+_XP_TEXTES = etree.XPath('.//text()[not(ancestor::script or ancestor::style or ancestor::template)]')
+
+_XP_TITRE = etree.XPath("//span[@id='productTitle']")
+_XP_DETAILS = etree.XPath("(//div[@id='detailBulletsWrapper_feature_div'])[1]//li")
+_XP_COUVERTURE = etree.XPath("//img[@id='landingImage']")
+_XP_SWATCHES = etree.XPath("//div[@id='tmmSwatches']")
+_XP_SWATCH_SELECTIONNE = etree.XPath(f".//span[{_xp_classe('a-button-selected')}]")
+_XP_SWATCH_SELECTIONNE_LI = etree.XPath(f".//li[{_xp_classe('selected')}]")
+_XP_DETAIL_BULLETS = etree.XPath("(//div[@id='detailBullets_feature_div'])[1]//li")
+_XP_BREADCRUMB = etree.XPath("//div[@id='wayfinding-breadcrumbs_feature_div']")
+
+_XP_RESULTATS = etree.XPath(f"//*[{_xp_classe('s-result-item')}]")
+_XP_PAGE_SUIVANTE = etree.XPath(f"//*[{_xp_classe('s-pagination-next')}]")
+_XP_ITEM_TITRE = etree.XPath(f".//*[{_xp_classe('a-text-normal')}]")
+_XP_ITEM_TITRE_H2 = etree.XPath(".//h2//a//span")
+_XP_ITEM_LIEN = etree.XPath(f".//*[{_xp_classe('a-link-normal')}]")
+_XP_ITEM_LIEN_H2 = etree.XPath(".//h2//a")
+_XP_ITEM_SPANS = etree.XPath(
+    f".//span[{_xp_classe('a-text-normal')} or {_xp_classe('a-size-base')} or {_xp_classe('a-color-secondary')}]")
+_XP_ITEM_LIGNES = etree.XPath(f".//*[{_xp_classe('a-row')}]")
+
+
+def _texte(element, strip: bool = False) -> str:
+    """Équivalent de bs4 get_text() / get_text(strip=True) pour un élément lxml."""
+    textes = _XP_TEXTES(element)
+    if strip:
+        return ''.join(t.strip() for t in textes)
+    return ''.join(textes)
+
+
+def _premier(xpath, contexte):
+    resultats = xpath(contexte)
+    return resultats[0] if resultats else None
+
+
+def arbre_lxml(html: str):
+    """Arbre lxml.html d'une page (document vide si le HTML est vide)."""
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Chaîne avec déclaration d'encodage XML : parser les octets
+        return lxml.html.document_fromstring(html.encode('utf-8'),
+                                             parser=lxml.html.HTMLParser(encoding='utf-8'))
+    except etree.ParserError:
+        return lxml.html.document_fromstring('<html></html>')
+
+
+class ProductPageLxml(ProductPage):
+    """
+    ProductPage dont les champs lus par extraire_infos_produit passent par des
+    XPath précompilées. Les sections Bulk / Publisher / version papier restent
+    sur BeautifulSoup (soup construit seulement si ces sections sont demandées).
+    """
+    moteur = 'lxml'
+
+    @cached_property
+    def arbre(self):
+        return arbre_lxml(self.html)
+
+    def _lire_titre(self) -> Optional[str]:
+        element = _premier(_XP_TITRE, self.arbre)
+        return _texte(element, strip=True) if element is not None else None
+
+    def _lire_details(self) -> List[str]:
+        return [_texte(li) for li in _XP_DETAILS(self.arbre)]
+
+    def _lire_couverture(self) -> Optional[str]:
+        image = _premier(_XP_COUVERTURE, self.arbre)
+        return image.get('src') if image is not None else None
+
+    def _lire_format_selectionne(self) -> Optional[str]:
+        format_section = _premier(_XP_SWATCHES, self.arbre)
+        if format_section is None:
+            return None
+        selected = _premier(_XP_SWATCH_SELECTIONNE, format_section)
+        if selected is None:
+            selected = _premier(_XP_SWATCH_SELECTIONNE_LI, format_section)
+        return _texte(selected, strip=True) if selected is not None else None
+
+    def _lire_detail_bullets(self) -> List[str]:
+        return [_texte(li) for li in _XP_DETAIL_BULLETS(self.arbre)]
+
+    def _lire_breadcrumb(self) -> Optional[str]:
+        breadcrumb = _premier(_XP_BREADCRUMB, self.arbre)
+        return _texte(breadcrumb) if breadcrumb is not None else None
+
+
+# ============================================================================
+# PAGES DE RÉSULTATS DE RECHERCHE (/s?k=)
+# ============================================================================
+
+# Début de la grille : premier élément portant la classe s-result-item (attribut
+# class d'une vraie balise, pas une règle CSS du <head>) ; fin : pied de page.
+_DEBUT_GRILLE = re.compile(r'<[a-zA-Z][^<>]*\sclass="[^"]*\bs-result-item\b')
+_ANCRES_FIN_GRILLE = ('id="navFooter"', '<footer')
+_CLASSES_RECHERCHE = {'s-result-item', 's-pagination-next'}
+# Seuls les résultats et le bouton de pagination (avec leurs descendants) sont construits
+_FILTRE_RECHERCHE = SoupStrainer(class_=lambda c: c is not None and not _CLASSES_RECHERCHE.isdisjoint(c.split()))
+
+
+def region_resultats(html: str) -> str:
+    """
+    HTML réduit à la grille de résultats et à la pagination : en-tête, scripts
+    et pied de page ne sont pas parsés. Chaîne vide si la page n'a aucun résultat.
+    """
+    debut = _DEBUT_GRILLE.search(html)
+    if not debut:
+        return ''
+    fins = [i for i in (html.find(ancre, debut.start()) for ancre in _ANCRES_FIN_GRILLE) if i != -1]
+    return html[debut.start():min(fins) if fins else len(html)]
+
+
+class SearchResult:
+    """Résultat de recherche réduit aux champs lus par le pipeline (titre None : item inexploitable)."""
+    __slots__ = ('asin', 'titre', 'href', 'url', 'sponsorise', 'date', 'format')
+
+    def __init__(self, asin: Optional[str], titre: Optional[str], href: Optional[str],
+                 sponsorise: bool = False, date: Optional[str] = None, format: Optional[str] = None):
+        self.asin = asin
+        self.titre = titre
+        self.href = href
+        self.url = f"https://www.amazon.co.jp{href}" if href else None
+        self.sponsorise = sponsorise
+        self.date = date
+        self.format = format
+
+    @classmethod
+    def depuis_item(cls, item) -> 'SearchResult':
+        """SearchResult d'un élément .s-result-item (Tag bs4 ou élément lxml)."""
+        titre, href, data_asin = champs_item(item)
+        if titre is None or not href:
+            return cls(None, None, None)
+        url = f"https://www.amazon.co.jp{href}"
+        asin = extraire_asin(url)
+        # Aussi essayer data-asin du parent
+        if (not asin or asin == '?') and data_asin:
+            asin = data_asin
+        date, format_livre = date_format_item(item)
+        return cls(asin, titre, href, 'sspa' in url, date, format_livre)
+
+    def infos_featured(self) -> Dict:
+        """Métadonnées utilisables sans fetcher la page /dp/ (voir scraper.extraire_infos_featured)."""
+        return infos_resultat(self.titre, self.date, self.format)
+
+    def champs(self) -> Tuple:
+        return tuple(getattr(self, nom) for nom in self.__slots__)
+
+    @classmethod
+    def depuis_champs(cls, champs: Tuple) -> 'SearchResult':
+        """Reconstruit un SearchResult depuis champs() (résultat d'un worker d'analyse)."""
+        resultat = cls.__new__(cls)
+        for nom, valeur in zip(cls.__slots__, champs):
+            setattr(resultat, nom, valeur)
+        return resultat
+
+    def __repr__(self):
+        return f"SearchResult({self.asin!r}, {self.titre!r})"
+
+
+def classer_resultat(resultat: SearchResult, titre_cle: str) -> Optional[str]:
+    """
+    Statut d'un résultat de recherche pour la série de clé titre_cle (normaliser_titre),
+    filtres dans l'ordre de la Phase A : None (item inexploitable), 'manuel' (rejeté
+    depuis le viewer), 'hors_sujet_titre', 'derive', 'sponsorise', 'ebook', 'lot',
+    'non_papier' ou 'papier'. Les statuts sont ceux de featured_history.
+    """
+    titre = resultat.titre
+    if not titre:
+        return None
+    if est_asin_hors_sujet_manuel(resultat.asin):
+        return 'manuel'
+    if titre_cle not in normaliser_titre(titre):
+        return 'hors_sujet_titre'
+    if est_produit_derive(titre):
+        return 'derive'
+    if resultat.sponsorise:
+        return 'sponsorise'
+    if est_ebook(resultat.url, titre):
+        return 'ebook'
+    if est_lot_titre(titre):
+        return 'lot'
+    if not est_asin_papier(resultat.asin):
+        return 'non_papier'
+    return 'papier'
+
+
+def classer_resultats(resultats: List[SearchResult], titre_cle: str) -> List[Tuple[SearchResult, Optional[str]]]:
+    """(résultat, statut) pour toute une page de recherche (Phases A et C du pipeline)."""
+    return [(resultat, classer_resultat(resultat, titre_cle)) for resultat in resultats]
+
+
+class PageRecherche:
+    """Résultats (.s-result-item) et pagination d'une page de recherche, via BeautifulSoup."""
+    moteur = 'bs4'
+
+    def __init__(self, html: str):
+        self.html = html
+
+    @cached_property
+    def soup(self) -> BeautifulSoup:
+        return BeautifulSoup(region_resultats(self.html), 'lxml', parse_only=_FILTRE_RECHERCHE)
+
+    @cached_property
+    def items(self) -> list:
+        return self.soup.select('.s-result-item')
+
+    @cached_property
+    def resultats(self) -> List[SearchResult]:
+        return [SearchResult.depuis_item(item) for item in self.items]
+
+    @cached_property
+    def derniere_page(self) -> bool:
+        """Bouton "次へ" (s-pagination-next) absent ou désactivé → dernière page."""
+        btn_next = self.soup.select_one('.s-pagination-next')
+        return (btn_next is None) or ('s-pagination-disabled' in btn_next.get('class', []))
+
+
+class PageRechercheLxml(PageRecherche):
+    """PageRecherche via XPath précompilées (éléments lxml au lieu de Tags bs4)."""
+    moteur = 'lxml'
+
+    @cached_property
+    def arbre(self):
+        return arbre_lxml(region_resultats(self.html))
+
+    @cached_property
+    def items(self) -> list:
+        return _XP_RESULTATS(self.arbre)
+
+    @cached_property
+    def derniere_page(self) -> bool:
+        btn_next = _premier(_XP_PAGE_SUIVANTE, self.arbre)
+        return (btn_next is None) or ('s-pagination-disabled' in btn_next.get('class', '').split())
+
+
+def champs_item(item) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    (titre, href, data-asin) d'un résultat de recherche, Tag bs4 ou élément lxml.
+    titre / href à None si l'élément correspondant manque.
+    """
+    if isinstance(item, etree._Element):
+        titre_elem = _premier(_XP_ITEM_TITRE, item)
+        if titre_elem is None:
+            titre_elem = _premier(_XP_ITEM_TITRE_H2, item)
+        lien_elem = _premier(_XP_ITEM_LIEN, item)
+        if lien_elem is None:
+            lien_elem = _premier(_XP_ITEM_LIEN_H2, item)
+        titre = _texte(titre_elem) if titre_elem is not None else None
+        href = lien_elem.get('href') if lien_elem is not None else None
+    else:
+        titre_elem = item.select_one('.a-text-normal') or item.select_one('h2 a span')
+        lien_elem = item.select_one('.a-link-normal') or item.select_one('h2 a')
+        titre = titre_elem.get_text() if titre_elem else None
+        href = lien_elem.get('href') if lien_elem else None
+    return titre, href or None, item.get('data-asin')
+
+
+def textes_item(item, lignes: bool = False) -> Iterator[str]:
+    """
+    Textes (strip) des spans de métadonnées d'un résultat (date, format),
+    ou de ses lignes .a-row si lignes=True. Tag bs4 ou élément lxml.
+    """
+    if isinstance(item, etree._Element):
+        for element in (_XP_ITEM_LIGNES if lignes else _XP_ITEM_SPANS)(item):
+            yield _texte(element, strip=True)
+    else:
+        selecteur = '.a-row' if lignes else 'span.a-text-normal, span.a-size-base, span.a-color-secondary'
+        for element in item.select(selecteur):
+            yield element.get_text(strip=True)
+
+
+_DATE_RESULTAT = re.compile(r'(\d{4}/\d{1,2}/\d{1,2})')
+_FORMAT_RESULTAT = re.compile(r'(コミック|文庫|単行本|新書|大型本|ムック)')
+
+
+def date_format_item(item) -> Tuple[Optional[str], Optional[str]]:
+    """Date de publication (YYYY/MM/DD) et format affichés sous le titre d'un résultat."""
+    date = format_livre = None
+    # Pattern Amazon JP : "コミック – 2026/1/23" ou "文庫 – 2024/8/30"
+    for text in textes_item(item):
+        date_match = _DATE_RESULTAT.search(text)
+        if date_match:
+            date = date_match.group(1)
+            # Le format est souvent juste avant la date
+            format_match = _FORMAT_RESULTAT.search(text)
+            if format_match:
+                format_livre = format_match.group(1)
+            break
+    # Aussi chercher la date dans les sous-divs (parfois dans une structure différente)
+    if date is None:
+        for div_text in textes_item(item, lignes=True):
+            date_match = _DATE_RESULTAT.search(div_text)
+            if date_match:
+                date = date_match.group(1)
+                break
+    # Normaliser la date au format YYYY/MM/DD
+    if date is not None:
+        parts = date.split('/')
+        date = f"{parts[0]}/{int(parts[1]):02d}/{int(parts[2]):02d}"
+    return date, format_livre
+
+
+def infos_resultat(titre: str, date: Optional[str], format_livre: Optional[str]) -> Dict:
+    """Infos d'un résultat de recherche : titre, tome et éditeur (depuis le titre), date, format."""
+    infos = {'titre': titre}
+    tome = extraire_numero_tome(titre)
+    if tome is not None:
+        infos['tome'] = tome
+    # Éditeur entre parenthèses japonaises ou normales dans le titre
+    editeur_titre = extraire_editeur(titre)
+    if editeur_titre:
+        infos['editeur'] = convertir_editeur_romaji(editeur_titre)
+    if date is not None:
+        infos['date'] = date
+    if format_livre is not None:
+        infos['format'] = format_livre
+    return infos
+
+
+# ============================================================================
+# MODE DIFFÉRENTIEL : les deux moteurs sur la même page
+# ============================================================================
+
+class DiffMoteurs:
+    """Compte les comparaisons bs4 / lxml et journalise les désaccords (les premiers en détail)."""
+    DETAILS_MAX = 20
+
+    def __init__(self):
+        self.stats = {'pages': 0, 'desaccords': 0}
+        self.desaccords = []  # (type, clé, valeur bs4, valeur lxml)
+
+    def comparer(self, type_page: str, cle: str, valeur_bs4, valeur_lxml) -> bool:
+        self.stats['pages'] += 1
+        if valeur_bs4 == valeur_lxml:
+            return True
+        self.stats['desaccords'] += 1
+        if len(self.desaccords) < self.DETAILS_MAX:
+            self.desaccords.append((type_page, cle, valeur_bs4, valeur_lxml))
+            logger.warning(f"⚖️  Moteurs en désaccord ({type_page} {cle}):\n"
+                           f"      bs4 : {valeur_bs4}\n      lxml: {valeur_lxml}")
+        return False
+
+    def log_resume(self):
+        s = self.stats
+        if s['pages']:
+            logger.info(f"⚖️  Diff moteurs bs4/lxml: {s['pages']} comparaison(s), {s['desaccords']} désaccord(s)")
+
+
+DIFF_MOTEURS = DiffMoteurs()
+
+
+def resume_recherche(page: PageRecherche) -> Tuple:
+    """Tout ce que le pipeline lit d'une page de recherche, pour comparer les moteurs."""
+    return page.derniere_page, [r.champs() for r in page.resultats]
+
+
+class ProductPageDiff(ProductPage):
+    """ProductPage bs4 (résultat utilisé) dont les infos sont recalculées par lxml et comparées."""
+    moteur = 'diff'
+
+    def infos(self, debug: bool = False) -> Dict:
+        infos = super().infos(debug)
+        DIFF_MOTEURS.comparer('produit', self.titre[:40], infos, ProductPageLxml(self.html).infos())
+        return infos
+
+
+class PageRechercheDiff(PageRecherche):
+    """PageRecherche bs4 (résultat utilisé) comparée champ par champ à la version lxml."""
+    moteur = 'diff'
+
+    @cached_property
+    def resultats(self) -> List[SearchResult]:
+        resultats = super().resultats
+        DIFF_MOTEURS.comparer('recherche', f"{len(resultats)} résultat(s)",
+                              (self.derniere_page, [r.champs() for r in resultats]),
+                              resume_recherche(PageRechercheLxml(self.html)))
+        return resultats
+
+
+_PAGES_PRODUIT = {'bs4': ProductPage, 'lxml': ProductPageLxml, 'diff': ProductPageDiff}
+_PAGES_RECHERCHE = {'bs4': PageRecherche, 'lxml': PageRechercheLxml, 'diff': PageRechercheDiff}
+
+
+def _moteur() -> str:
+    if config.MOTEUR_EXTRACTION not in config.MOTEURS_EXTRACTION:
+        raise ValueError(f"Moteur d'extraction inconnu: {config.MOTEUR_EXTRACTION} "
+                         f"(attendu: {', '.join(config.MOTEURS_EXTRACTION)})")
+    return config.MOTEUR_EXTRACTION
+
+
+def page_produit(html: str) -> ProductPage:
+    """ProductPage (moteur config.MOTEUR_EXTRACTION) attachée à la page, créée au premier appel."""
+    page = getattr(html, 'produit', None)
+    if page is None:
+        page = _PAGES_PRODUIT[_moteur()](html)
+        if isinstance(html, PageHtml):
+            html.produit = page
+    return page
+
+
+def page_recherche(html: str) -> PageRecherche:
+    """PageRecherche selon config.MOTEUR_EXTRACTION."""
+    return _PAGES_RECHERCHE[_moteur()](html)
+
+
+# ============================================================================
+# CLI : comparaison des moteurs sur des pages enregistrées
+# ============================================================================
+
+def _pages_a_comparer(chemins: List[str]) -> Iterator[Tuple[str, str]]:
+    """(url ou fichier, html) : archives --record (index.jsonl) ou fichiers HTML."""
+    for chemin in chemins:
+        index = os.path.join(chemin, 'index.jsonl')
+        if os.path.isdir(chemin) and os.path.exists(index):
+            with open(index, 'r', encoding='utf-8') as f:
+                for ligne in f:
+                    entree = json.loads(ligne) if ligne.strip() else None
+                    if entree and entree.get('statut') == 200 and entree.get('corps'):
+                        with gzip.open(os.path.join(chemin, entree['corps']), 'rb') as g:
+                            yield entree['url'], decoder(g.read())
+        elif os.path.isdir(chemin):
+            for nom in sorted(os.listdir(chemin)):
+                if nom.endswith('.html'):
+                    with open(os.path.join(chemin, nom), 'r', encoding='utf-8', errors='replace') as f:
+                        yield nom, f.read()
+        else:
+            with open(chemin, 'r', encoding='utf-8', errors='replace') as f:
+                yield chemin, f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare les moteurs d'extraction bs4 et lxml sur des pages Amazon enregistrées")
+    parser.add_argument('chemins', nargs='+',
+                        help="Archive --record (dossier avec index.jsonl), dossier de .html ou fichiers .html")
+    args = parser.parse_args()
+
+    nb = {'produit': 0, 'recherche': 0}
+    for source, html in _pages_a_comparer(args.chemins):
+        if '/s?' in source or 's-result-item' in html:
+            nb['recherche'] += 1
+            DIFF_MOTEURS.comparer('recherche', source, resume_recherche(PageRecherche(html)),
+                                  resume_recherche(PageRechercheLxml(html)))
+        elif '/dp/' in source or 'productTitle' in html:
+            nb['produit'] += 1
+            DIFF_MOTEURS.comparer('produit', source, ProductPage(html).infos(), ProductPageLxml(html).infos())
+    logger.info(f"📄 {nb['produit']} page(s) produit, {nb['recherche']} page(s) de recherche")
+    DIFF_MOTEURS.log_resume()
+    return 1 if DIFF_MOTEURS.stats['desaccords'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
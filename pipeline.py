@@ -4,13 +4,10 @@
 MangaVega Tracker - Pipeline de recherche et traitement
 """
 
-import asyncio
-import random
 import re
 from datetime import datetime, timedelta
 from urllib.parse import quote_plus
 from typing import List, Dict, Optional, Set
-from bs4 import BeautifulSoup
 
 import aiohttp
 
@@ -19,14 +16,18 @@ from database import DatabaseManager
 from utils import (
     strip_type_suffix, est_format_papier, est_asin_hors_sujet_manuel,
     normaliser_editeur, editeur_match, convertir_editeur_romaji,
-    extraire_editeur, extraire_asin, est_asin_papier, est_ebook,
-    normaliser_titre, normaliser_url, extraire_numero_tome, analyser_tomes_manquants
+    extraire_editeur, extraire_asin, est_asin_papier,
+    normaliser_titre, normaliser_url, extraire_numero_tome_detail,
+    analyser_tomes_manquants
 )
 from scraper import (
-    get_html, extraire_version_papier, extraire_infos_produit,
-    extraire_item_amazon, extraire_infos_featured,
-    extraire_volumes_depuis_page, extraire_volumes_depuis_page_flat
+    get_html, invalider_page, pause, signaler_reponse, extraire_version_papier, extraire_infos_produit,
+    extraire_volumes_depuis_page, extraire_volumes_depuis_page_flat, PrechargementProduits
 )
+from analyse import EXECUTEUR
+from pages import classer_resultats
+from etages import EcrivainBdd
+from fraicheur import prochaine_verification_precommande
 
 logger = config.logger
 
@@ -116,7 +117,7 @@ async def rechercher_volumes_via_bulk_etendu(session: aiohttp.ClientSession, db:
                     continue
                 
                 # Récupérer les infos du produit
-                html_vol = await get_html(session, vol_url)
+                html_vol = await get_html(session, vol_url, sentinelles=config.SENTINELLES_PRODUIT)
                 if not html_vol:
                     continue
                 
@@ -193,8 +194,6 @@ async def rechercher_volumes_via_bulk_etendu(session: aiohttp.ClientSession, db:
                     'serie_recherchee': nom_serie  # Même série
                 })
                 
-                await asyncio.sleep(random.uniform(0.3, 0.6))
-                
         except Exception as e:
             logger.debug(f"      ⚠️ Erreur exploration {asin_source}: {e}")
             continue
@@ -228,7 +227,7 @@ async def corriger_tomes_manquants(session: aiohttp.ClientSession, db: 'Database
         try:
             logger.debug(f"   📖 Vérification {asin}...")
             
-            html = await get_html(session, url)
+            html = await get_html(session, url, sentinelles=config.SENTINELLES_PRODUIT)
             if not html:
                 continue
             
@@ -247,18 +246,16 @@ async def corriger_tomes_manquants(session: aiohttp.ClientSession, db: 'Database
             else:
                 # Essayer d'extraire depuis le titre
                 titre = infos.get('titre', '') or vol.get('titre_volume', '')
-                tome_extrait = extraire_numero_tome(titre)
+                tome_extrait, regle = extraire_numero_tome_detail(titre)
                 
                 if tome_extrait and str(tome_extrait).isdigit() and int(tome_extrait) > 0:
                     tome_int = int(tome_extrait)
                     db.update_tome_volume(asin, tome_int)
-                    logger.info(f"   ✅ {asin}: Tome extrait du titre → T{tome_int}")
+                    logger.info(f"   ✅ {asin}: Tome extrait du titre → T{tome_int} (règle {regle})")
                     corriges += 1
                 else:
                     logger.debug(f"   ⏭️ {asin}: Tome toujours inconnu")
             
-            await asyncio.sleep(random.uniform(0.3, 0.5))
-            
         except Exception as e:
             logger.debug(f"   ⚠️ Erreur {asin}: {e}")
             continue
@@ -269,6 +266,112 @@ async def corriger_tomes_manquants(session: aiohttp.ClientSession, db: 'Database
     return corriges
 
 
+async def _suivre_si_precommande(ecrivain: EcrivainBdd, db: DatabaseManager, asin: str, nom: str,
+                                 nom_bdd: str, url_norm: str, date_str: str):
+    """Alerte à date future : le volume entre dans la liste de suivi des précommandes."""
+    prochaine = prochaine_verification_precommande(date_str)
+    if prochaine:
+        await ecrivain.ecrire(db.suivre_precommande, asin, nom, nom_bdd, url_norm, date_str, prochaine)
+
+
+async def _comparer_date_precommande(ecrivain: EcrivainBdd, db: DatabaseManager, asin: str, nom: str,
+                                     url_norm: str, ancienne_date: str, papier_info: Dict) -> bool:
+    """
+    Compare la date re-lue (papier_info['date']) à celle de l'alerte et replanifie
+    la précommande. Date modifiée : alerte mise à jour, papier_info marqué
+    (date_modifiee, ancienne_date) et True.
+    """
+    nouvelle_date = papier_info['date']
+    await ecrivain.ecrire(db.replanifier_precommande, asin, nouvelle_date,
+                          prochaine_verification_precommande(nouvelle_date))
+    if nouvelle_date == ancienne_date:
+        logger.info(f"  🔄 [{asin}] Précommande re-vérifiée: date inchangée ({nouvelle_date})")
+        return False
+    logger.warning(f"  ⚠️  [{asin}] DATE MODIFIÉE ! {ancienne_date} → {nouvelle_date}")
+    await ecrivain.ecrire(db.update_alerte_date, nom, url_norm, nouvelle_date)
+    papier_info['est_nouveaute'] = True
+    papier_info['date_modifiee'] = True
+    papier_info['ancienne_date'] = ancienne_date
+    papier_info['deja_alerte'] = True
+    return True
+
+
+async def verifier_precommandes(session: aiohttp.ClientSession, db: DatabaseManager) -> List[Dict]:
+    """
+    Passe légère sur la liste de suivi des précommandes (table precommandes_suivi) :
+    seules les pages produit des précommandes dues sont re-lues, sans recherche
+    Featured ni Bulk. Chaque vérification replanifie la suivante selon la date
+    annoncée ; une précommande dont la date est passée quitte la liste.
+    
+    Les dates re-lues remplissent le cache de vérification : la Phase B des
+    séries ne refetch pas ces pages dans le même run.
+    
+    Retourne: les nouveautés "date modifiée" (même forme que rechercher_manga)
+    """
+    nb_importees = db.importer_precommandes_alertes()
+    if nb_importees:
+        logger.info(f"📌 {nb_importees} précommande(s) alertée(s) ajoutée(s) à la liste de suivi")
+    suivies = db.get_precommandes()
+    dues = db.get_precommandes_dues()
+    if not dues:
+        if suivies:
+            logger.info(f"\n📌 Précommandes: {len(suivies)} suivie(s), aucune à re-vérifier aujourd'hui")
+        return []
+    
+    logger.info(f"\n📌 Précommandes: {len(dues)}/{len(suivies)} à re-vérifier")
+    # Jamais depuis le cache disque : une copie de moins de 12 h replanifierait
+    # la précommande sans avoir vu un éventuel changement de date
+    prechargement = PrechargementProduits(session, {p['asin']: p['url'] for p in dues}, sans_cache=True)
+    ecrivain = EcrivainBdd(db)
+    modifiees = []
+    nb_verifiees = 0
+    try:
+        for p in dues:
+            asin, nom, url_norm = p['asin'], p['nom'], p['url']
+            html_prod, infos = await prechargement.obtenir(asin)
+            if not html_prod or infos.get('_page_invalide'):
+                # Reste due : nouvel essai au prochain run
+                raison = infos.get('_page_invalide') if infos else 'page indisponible'
+                logger.warning(f"  ⚠️  [{asin}] Précommande non vérifiable ({raison}), date non comparée")
+                if infos and infos['_page_invalide'] in ('captcha', 'rate_limit'):
+                    invalider_page(session, url_norm)
+                    prechargement.restreindre()
+                    await signaler_reponse(session, 'captcha', url=url_norm)
+                continue
+        
+            date_clean = _normaliser_date(infos.get('date', ''))
+            try:
+                datetime.strptime(date_clean or '', "%Y/%m/%d")
+            except ValueError:
+                logger.warning(f"  ⚠️  [{asin}] Précommande sans date lisible ({infos.get('date')}), date non comparée")
+                continue
+            nb_verifiees += 1
+        
+            await ecrivain.ecrire(db.sauvegarder_verification, asin, date_clean, str(infos.get('tome', 'N/A')),
+                                  infos.get('titre', '')[:100], infos.get('editeur'))
+            await ecrivain.ecrire(db.update_date_volume, asin, date_clean)
+            papier_info = {
+                'nom': nom,
+                'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                'tome': infos.get('tome', 'N/A'),
+                'date': date_clean,
+                'editeur': infos.get('editeur', 'Inconnu'),
+                'url': url_norm,
+                'asin': asin,
+                'couverture': infos.get('couverture_url', ''),
+                'est_nouveaute': False,
+                'serie_recherchee': p['serie'] or nom
+            }
+            if await _comparer_date_precommande(ecrivain, db, asin, nom, url_norm, p['date_annoncee'], papier_info):
+                modifiees.append(papier_info)
+    finally:
+        prechargement.fermer()
+        await ecrivain.fermer()
+    logger.info(f"📌 Précommandes: {nb_verifiees} vérifiée(s), {len(modifiees)} date(s) modifiée(s), "
+                f"{len(db.get_precommandes())} suivie(s)")
+    return modifiees
+
+
 async def rechercher_traductions(session: aiohttp.ClientSession, titre_japonais: str, db: DatabaseManager) -> tuple:
     """
     Recherche la traduction FR pour un titre japonais.
@@ -603,13 +706,9 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 logger.warning("❌ Featured inaccessible, utilisation des volumes connus")
             break
         
-        soup = BeautifulSoup(html, 'lxml')
-        items = soup.select('.s-result-item')
-
         # Détecter la dernière vraie page via la pagination Amazon :
         # si le bouton "次へ" (s-pagination-next) est absent ou désactivé → dernière page
-        btn_next = soup.select_one('.s-pagination-next')
-        derniere_vraie_page = (btn_next is None) or ('s-pagination-disabled' in btn_next.get('class', []))
+        derniere_vraie_page, items = await EXECUTEUR.recherche(html)
 
         if not items:
             # Page vide → exploration terminée
@@ -623,9 +722,9 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
         
         page_stats = {'nouveaux': 0, 'deja_vus': 0}
         
-        for item in items:
-            titre_txt, url_complete, asin = extraire_item_amazon(item)
-            if not titre_txt:
+        for item, classe in classer_resultats(items, titre_cle):
+            titre_txt, url_complete, asin = item.titre, item.url, item.asin
+            if classe is None:
                 stats['sans_info'] += 1
                 continue
             
@@ -637,7 +736,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
             source_label = f'featured_p{page_num}'
             
             # Filtre manuel hors-sujet (rejeté depuis viewer)
-            if est_asin_hors_sujet_manuel(asin):
+            if classe == 'manuel':
                 stats['hors_sujet'] += 1
                 asin_deja_vus.add(asin)
                 db.sauvegarder_featured(nom_bdd, asin, 'hors_sujet_titre', source_label, titre_txt)
@@ -645,8 +744,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 continue
             
             # Filtre titre
-            titre_txt_normalise = normaliser_titre(titre_txt)
-            if titre_cle not in titre_txt_normalise:
+            if classe == 'hors_sujet_titre':
                 stats['hors_sujet'] += 1
                 asin_deja_vus.add(asin)
                 db.sauvegarder_featured(nom_bdd, asin, 'hors_sujet_titre', source_label, titre_txt)
@@ -654,7 +752,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 continue
             
             # Filtre produits dérivés (liste centralisée dans config.py)
-            if any(mot in titre_txt for mot in config.MOTS_CLES_DERIVES):
+            if classe == 'derive':
                 stats['hors_sujet'] += 1
                 asin_deja_vus.add(asin)
                 db.sauvegarder_featured(nom_bdd, asin, 'derive', source_label, titre_txt)
@@ -662,7 +760,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 continue
             
             # Sponsorisé
-            if '/sspa/click' in url_complete or 'sspa' in url_complete:
+            if classe == 'sponsorise':
                 stats['sponsorise'] += 1
                 asin_deja_vus.add(asin)
                 db.sauvegarder_featured(nom_bdd, asin, 'sponsorise', source_label, titre_txt)
@@ -670,7 +768,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 continue
             
             # Ebook → chercher version papier (SANS Bulk en cascade)
-            if est_ebook(url_complete, titre_txt):
+            if classe == 'ebook':
                 stats['ebook'] += 1
                 asin_deja_vus.add(asin)
                 
@@ -702,7 +800,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 continue
             
             # Lots/Sets
-            if '巻セット' in titre_txt or ('セット' in titre_txt and ('1-' in titre_txt or '全巻' in titre_txt)):
+            if classe == 'lot':
                 stats['hors_sujet'] += 1
                 asin_deja_vus.add(asin)
                 db.sauvegarder_featured(nom_bdd, asin, 'lot', source_label, titre_txt)
@@ -710,7 +808,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
                 continue
             
             # Non-papier (ASIN B*)
-            if not est_asin_papier(asin):
+            if classe == 'non_papier':
                 stats['ebook'] += 1
                 asin_deja_vus.add(asin)
                 db.sauvegarder_featured(nom_bdd, asin, 'non_papier', source_label, titre_txt)
@@ -727,7 +825,7 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
             db.sauvegarder_featured(nom_bdd, asin, 'papier', source_label, titre_txt)
             
             # Extraire les métadonnées directement depuis Featured
-            feat_infos = extraire_infos_featured(item, titre_txt)
+            feat_infos = item.infos_featured()
             if feat_infos:
                 featured_metadata[asin] = feat_infos
         
@@ -829,490 +927,510 @@ async def rechercher_manga(session: aiohttp.ClientSession, db: DatabaseManager,
             logger.info(f"✅ Traduction FR officielle: {titre_fr_serie}")
     
     urls_alertees = db.get_alertes_existantes(nom)
+    precommandes = db.get_precommandes(nom)
     nouveautes = []
     tous_papiers = []
     captcha_consecutifs = 0  # Circuit breaker captcha
     
+    # Étape 1 : état de chaque candidat (alerte, précommande suivie, cache) ; les pages
+    # produit à vérifier passent par les étages récupération → analyse
+    # (etages.py, fenêtre bornée, pacer partagé) et sont classées ci-dessous
+    # dans l'ordre des candidats ; les écritures BDD des Phases B et C passent
+    # par un écrivain unique, par lots
+    etats_candidats = {}
     for asin, url_prod in candidats.items():
-        url_norm = normaliser_url(url_prod)
-        
-        # Filtre hors-sujet manuel
         if est_asin_hors_sujet_manuel(asin):
-            logger.info(f"  🚫 [{asin}] Marqué hors-sujet (skip)")
             continue
-        
+        url_norm = normaliser_url(url_prod)
         est_deja_alerte = url_norm in urls_alertees
         
-        # Précommandes : re-vérifier si date future
-        force_refetch = False
+        # Précommandes alertées : re-vérifiées selon leur calendrier par
+        # verifier_precommandes ; date comparée ici si la page est re-vérifiée
         date_alerte_enregistree = None
-        if est_deja_alerte:
-            date_alerte_enregistree = db.get_alerte_date(nom_bdd, url_norm)
-            if date_alerte_enregistree and date_alerte_enregistree != 'Date inconnue':
-                try:
-                    date_alerte = datetime.strptime(date_alerte_enregistree, "%Y/%m/%d")
-                    if date_alerte > datetime.now():
-                        force_refetch = True
-                except (ValueError, TypeError):
-                    pass
+        if est_deja_alerte and asin in precommandes:
+            date_alerte_enregistree = precommandes[asin]['date_annoncee']
         
-        # Cache vérification
-        cache = db.est_verifie_aujourdhui(asin) if not force_refetch else None
-        if cache:
-            editeur_cache = cache.get('editeur', '')
-            
-            # Filtre éditeur
-            if editeur_officiel_serie and editeur_cache and editeur_cache != 'Inconnu':
-                if not editeur_match(editeur_cache, editeur_officiel_serie):
-                    logger.info(f"  📚 [{asin}] Autre éditeur (cache): {editeur_cache} ≠ {editeur_officiel_serie} → skip")
-                    continue
-            
-            if est_deja_alerte:
-                logger.info(f"  ✓  [{asin}] Tome alerté précédemment (depuis cache)")
-            else:
-                logger.info(f"  💾 [{asin}] Utilisation du cache (vérifié aujourd'hui)")
+        # Cache vérification (TTL selon la date de sortie, fraicheur.py)
+        cache = db.est_verifie_aujourdhui(asin)
+        etats_candidats[asin] = (est_deja_alerte, date_alerte_enregistree, cache)
+    
+    prechargement = PrechargementProduits(session, {
+        asin: candidats[asin] for asin, etat in etats_candidats.items() if not etat[2]
+    })
+    ecrivain = EcrivainBdd(db)
+    try:
+        # Étape 2 : classement et enregistrement, dans l'ordre des candidats
+        for asin, url_prod in candidats.items():
+            url_norm = normaliser_url(url_prod)
+        
+            # Filtre hors-sujet manuel
+            if asin not in etats_candidats:
+                logger.info(f"  🚫 [{asin}] Marqué hors-sujet (skip)")
+                continue
+        
+            est_deja_alerte, date_alerte_enregistree, cache = etats_candidats[asin]
+            if cache:
+                editeur_cache = cache.get('editeur', '')
             
-            papier_info = {
-                'nom': nom,
-                'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
-                'tome': cache['tome'],
-                'date': cache['date'],
-                'editeur': editeur_cache or 'Inconnu',
-                'url': url_norm,
-                'asin': asin,
-                'couverture': '',
-                'est_nouveaute': False,
-                'deja_alerte': est_deja_alerte,
-                'serie_recherchee': nom_bdd
-            }
+                # Filtre éditeur
+                if editeur_officiel_serie and editeur_cache and editeur_cache != 'Inconnu':
+                    if not editeur_match(editeur_cache, editeur_officiel_serie):
+                        logger.info(f"  📚 [{asin}] Autre éditeur (cache): {editeur_cache} ≠ {editeur_officiel_serie} → skip")
+                        continue
             
-            if cache['date'] != 'Date inconnue' and cache['tome'] != 'N/A':
-                if editeur_cache:
-                    logger.info(f"      📖 {cache['date']}, Tome: {cache['tome']}, 📚 {editeur_cache}")
+                if est_deja_alerte:
+                    logger.info(f"  ✓  [{asin}] Tome alerté précédemment (depuis cache)")
                 else:
-                    logger.info(f"      📖 {cache['date']}, Tome: {cache['tome']}")
-            elif cache['date'] != 'Date inconnue':
-                logger.info(f"      📅 {cache['date']}")
-            
-            tous_papiers.append(papier_info)
+                    logger.info(f"  💾 [{asin}] Utilisation du cache (vérifié le {cache['date_verification'][:10]})")
             
-            # Nouveauté ?
-            if not est_deja_alerte and cache['date'] != 'Date inconnue':
-                try:
-                    date_parsee = datetime.strptime(cache['date'], "%Y/%m/%d")
-                    if date_parsee > config.DATE_SEUIL:
-                        logger.info(f"      ✨ Nouveauté (depuis cache): {cache['date']}, Tome: {cache['tome']}")
-                        papier_info['est_nouveaute'] = True
-                        nouveautes.append(papier_info)
-                        db.marquer_comme_alerte(nom, url_norm, cache['date'])
-                        urls_alertees.add(url_norm)
-                except ValueError:
-                    pass
-            continue
-        
-        # Pas de cache → fetch page produit
-        if force_refetch:
-            logger.info(f"  🔄 [{asin}] Re-vérification précommande ({date_alerte_enregistree})...")
-        html_prod = await get_html(session, url_prod)
-        if not html_prod:
-            logger.warning(f"  ❌ [{asin}] Impossible de récupérer la page")
-            logger.warning(f"      → {url_norm}")
-            # Fallback cache ancien
-            cache_fallback = db.get_verification_cache(asin)
-            if cache_fallback:
-                logger.info(f"      🔄 Utilisation du cache (fallback)")
                 papier_info = {
-                    'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
-                    'tome': cache_fallback['tome'], 'date': cache_fallback['date'],
-                    'editeur': cache_fallback.get('editeur', 'Inconnu'),
-                    'url': url_norm, 'asin': asin, 'couverture': '',
-                    'est_nouveaute': False, 'deja_alerte': est_deja_alerte,
+                    'nom': nom,
+                    'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                    'tome': cache['tome'],
+                    'date': cache['date'],
+                    'editeur': editeur_cache or 'Inconnu',
+                    'url': url_norm,
+                    'asin': asin,
+                    'couverture': '',
+                    'est_nouveaute': False,
+                    'deja_alerte': est_deja_alerte,
                     'serie_recherchee': nom_bdd
                 }
+            
+                if cache['date'] != 'Date inconnue' and cache['tome'] != 'N/A':
+                    if editeur_cache:
+                        logger.info(f"      📖 {cache['date']}, Tome: {cache['tome']}, 📚 {editeur_cache}")
+                    else:
+                        logger.info(f"      📖 {cache['date']}, Tome: {cache['tome']}")
+                elif cache['date'] != 'Date inconnue':
+                    logger.info(f"      📅 {cache['date']}")
+            
                 tous_papiers.append(papier_info)
-            continue
+            
+                # Nouveauté ?
+                if not est_deja_alerte and cache['date'] != 'Date inconnue':
+                    try:
+                        date_parsee = datetime.strptime(cache['date'], "%Y/%m/%d")
+                        if date_parsee > config.DATE_SEUIL:
+                            logger.info(f"      ✨ Nouveauté (depuis cache): {cache['date']}, Tome: {cache['tome']}")
+                            papier_info['est_nouveaute'] = True
+                            nouveautes.append(papier_info)
+                            await ecrivain.ecrire(db.marquer_comme_alerte, nom, url_norm, cache['date'])
+                            await _suivre_si_precommande(ecrivain, db, asin, nom, nom_bdd, url_norm, cache['date'])
+                            urls_alertees.add(url_norm)
+                    except ValueError:
+                        pass
+                continue
         
-        infos = await extraire_infos_produit(html_prod, debug=False)
+            # Pas de cache → fetch page produit
+            html_prod, infos = await prechargement.obtenir(asin)
+            if not html_prod:
+                logger.warning(f"  ❌ [{asin}] Impossible de récupérer la page")
+                logger.warning(f"      → {url_norm}")
+                # Fallback cache ancien
+                cache_fallback = db.get_verification_cache(asin)
+                if cache_fallback:
+                    logger.info(f"      🔄 Utilisation du cache (fallback)")
+                    papier_info = {
+                        'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                        'tome': cache_fallback['tome'], 'date': cache_fallback['date'],
+                        'editeur': cache_fallback.get('editeur', 'Inconnu'),
+                        'url': url_norm, 'asin': asin, 'couverture': '',
+                        'est_nouveaute': False, 'deja_alerte': est_deja_alerte,
+                        'serie_recherchee': nom_bdd
+                    }
+                    tous_papiers.append(papier_info)
+                continue
         
-        # Fallback Bulk : si le tome n'est pas détecté depuis le titre, utiliser le mapping Bulk
-        if 'tome' not in infos and asin in bulk_tomes_mapping:
-            infos['tome'] = bulk_tomes_mapping[asin]
-            logger.info(f"  📦 [{asin}] Tome depuis Bulk: T{infos['tome']}")
+            # Fallback Bulk : si le tome n'est pas détecté depuis le titre, utiliser le mapping Bulk
+            if 'tome' not in infos and asin in bulk_tomes_mapping:
+                infos['tome'] = bulk_tomes_mapping[asin]
+                logger.info(f"  📦 [{asin}] Tome depuis Bulk: T{infos['tome']}")
         
-        if 'tome' not in infos and not infos.get('est_lot') and not infos.get('_page_invalide'):
-            logger.warning(f"  ⚠️  [{asin}] Tome non détecté")
+            if 'tome' not in infos and not infos.get('est_lot') and not infos.get('_page_invalide'):
+                logger.warning(f"  ⚠️  [{asin}] Tome non détecté")
         
-        # Page invalide (captcha, rate limit)
-        if infos.get('_page_invalide'):
-            if force_refetch:
-                logger.warning(f"  ⚠️  [{asin}] Précommande non vérifiable ({infos['_page_invalide']}), date non comparée")
-            else:
-                logger.warning(f"  ⚠️  [{asin}] Page invalide: {infos['_page_invalide']}")
-            logger.warning(f"      → {url_norm}")
-            captcha_consecutifs += 1
-            # Fallback 1 : cache de vérification (runs précédents)
-            cache_fallback = db.get_verification_cache(asin)
-            if cache_fallback:
-                logger.info(f"      🔄 Utilisation du cache (fallback captcha)")
-                papier_info = {
-                    'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
-                    'tome': cache_fallback['tome'], 'date': cache_fallback['date'],
-                    'editeur': cache_fallback.get('editeur', 'Inconnu'),
-                    'url': url_norm, 'asin': asin, 'couverture': '',
-                    'est_nouveaute': False, 'deja_alerte': est_deja_alerte,
-                    'serie_recherchee': nom_bdd
-                }
-                tous_papiers.append(papier_info)
-            # Fallback 2 : infos extraites depuis Featured (même sans /dp/)
-            elif asin in featured_metadata:
-                feat = featured_metadata[asin]
-                feat_tome = feat.get('tome', 'N/A')
-                feat_date = _normaliser_date(feat.get('date', 'Date inconnue'))
-                feat_editeur = feat.get('editeur', 'Inconnu')
-                feat_titre = feat.get('titre', '')
-                logger.info(f"      📋 Utilisation des infos Featured: T{feat_tome}, {feat_date}, {feat_editeur}")
+            # Page invalide (captcha, rate limit)
+            if infos.get('_page_invalide'):
+                if date_alerte_enregistree:
+                    logger.warning(f"  ⚠️  [{asin}] Précommande non vérifiable ({infos['_page_invalide']}), date non comparée")
+                else:
+                    logger.warning(f"  ⚠️  [{asin}] Page invalide: {infos['_page_invalide']}")
+                logger.warning(f"      → {url_norm}")
+                captcha_consecutifs += 1
+                invalider_page(session, url_prod)
+                # Plus de lecture en avance : le disjoncteur doit vraiment couper le trafic
+                prechargement.restreindre()
+                # Captcha/blocage servi en 200 (page longue) : invisible pour get_html,
+                # on le signale au contrôleur de débit et à la sonde des cookies de la session
+                if infos['_page_invalide'] in ('captcha', 'rate_limit'):
+                    await signaler_reponse(session, 'captcha', url=url_prod)
+                # Fallback 1 : cache de vérification (runs précédents)
+                cache_fallback = db.get_verification_cache(asin)
+                if cache_fallback:
+                    logger.info(f"      🔄 Utilisation du cache (fallback captcha)")
+                    papier_info = {
+                        'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                        'tome': cache_fallback['tome'], 'date': cache_fallback['date'],
+                        'editeur': cache_fallback.get('editeur', 'Inconnu'),
+                        'url': url_norm, 'asin': asin, 'couverture': '',
+                        'est_nouveaute': False, 'deja_alerte': est_deja_alerte,
+                        'serie_recherchee': nom_bdd
+                    }
+                    tous_papiers.append(papier_info)
+                # Fallback 2 : infos extraites depuis Featured (même sans /dp/)
+                elif asin in featured_metadata:
+                    feat = featured_metadata[asin]
+                    feat_tome = feat.get('tome', 'N/A')
+                    feat_date = _normaliser_date(feat.get('date', 'Date inconnue'))
+                    feat_editeur = feat.get('editeur', 'Inconnu')
+                    feat_titre = feat.get('titre', '')
+                    logger.info(f"      📋 Utilisation des infos Featured: T{feat_tome}, {feat_date}, {feat_editeur}")
                 
-                # Sauvegarder dans le cache pour les prochains runs
-                db.sauvegarder_verification(asin, feat_date, str(feat_tome), feat_titre[:100], feat_editeur)
+                    # Sauvegarder dans le cache pour les prochains runs
+                    await ecrivain.ecrire(db.sauvegarder_verification, asin, feat_date, str(feat_tome), feat_titre[:100], feat_editeur)
                 
-                # Sauvegarder dans la table volumes
-                tome_int = None
-                try:
-                    if feat_tome and feat_tome != 'N/A':
-                        tome_int = int(feat_tome)
-                except (ValueError, TypeError):
-                    pass
+                    # Sauvegarder dans la table volumes
+                    tome_int = None
+                    try:
+                        if feat_tome and feat_tome != 'N/A':
+                            tome_int = int(feat_tome)
+                    except (ValueError, TypeError):
+                        pass
                 
-                # Filtre format depuis Featured metadata
-                feat_format = feat.get('format', '')
-                if filtre != "both" and feat_format:
-                    if filtre == "ln_only" and '文庫' not in feat_format:
-                        logger.info(f"      📚 Format Featured non-LN: {feat_format} → skip")
-                        continue
-                    elif filtre != "ln_only" and 'コミック' not in feat_format:
-                        logger.info(f"      📚 Format Featured non-manga: {feat_format} → skip")
-                        continue
+                    # Filtre format depuis Featured metadata
+                    feat_format = feat.get('format', '')
+                    if filtre != "both" and feat_format:
+                        if filtre == "ln_only" and '文庫' not in feat_format:
+                            logger.info(f"      📚 Format Featured non-LN: {feat_format} → skip")
+                            continue
+                        elif filtre != "ln_only" and 'コミック' not in feat_format:
+                            logger.info(f"      📚 Format Featured non-manga: {feat_format} → skip")
+                            continue
                 
-                # Filtre éditeur
-                if editeur_officiel_serie and feat_editeur and feat_editeur != 'Inconnu':
-                    if not editeur_match(feat_editeur, editeur_officiel_serie):
-                        logger.info(f"      📚 Éditeur Featured: {feat_editeur} ≠ {editeur_officiel_serie} → skip")
-                        continue
+                    # Filtre éditeur
+                    if editeur_officiel_serie and feat_editeur and feat_editeur != 'Inconnu':
+                        if not editeur_match(feat_editeur, editeur_officiel_serie):
+                            logger.info(f"      📚 Éditeur Featured: {feat_editeur} ≠ {editeur_officiel_serie} → skip")
+                            continue
                 
-                db.sauvegarder_volume(
-                    serie_jp=nom, serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
-                    tome=tome_int, asin=asin, url=url_norm,
-                    date_sortie_jp=feat_date, titre_volume=feat_titre[:200],
-                    editeur=feat_editeur
-                )
+                    await ecrivain.ecrire(db.sauvegarder_volume,
+                        serie_jp=nom, serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
+                        tome=tome_int, asin=asin, url=url_norm,
+                        date_sortie_jp=feat_date, titre_volume=feat_titre[:200],
+                        editeur=feat_editeur
+                    )
                 
-                papier_info = {
-                    'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
-                    'tome': feat_tome, 'date': feat_date,
-                    'editeur': feat_editeur, 'url': url_norm,
-                    'asin': asin, 'couverture': '', 'est_nouveaute': False,
-                    'deja_alerte': est_deja_alerte, 'serie_recherchee': nom_bdd
-                }
-                tous_papiers.append(papier_info)
+                    papier_info = {
+                        'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                        'tome': feat_tome, 'date': feat_date,
+                        'editeur': feat_editeur, 'url': url_norm,
+                        'asin': asin, 'couverture': '', 'est_nouveaute': False,
+                        'deja_alerte': est_deja_alerte, 'serie_recherchee': nom_bdd
+                    }
+                    tous_papiers.append(papier_info)
                 
-                # Vérifier nouveauté
-                if not est_deja_alerte and feat_date != 'Date inconnue':
-                    try:
-                        date_parsee = datetime.strptime(feat_date, "%Y/%m/%d")
-                        if date_parsee > config.DATE_SEUIL:
-                            logger.info(f"      ✨ Nouveauté (Featured): {feat_date}, Tome: {feat_tome}")
-                            papier_info['est_nouveaute'] = True
-                            nouveautes.append(papier_info)
-                            db.marquer_comme_alerte(nom, url_norm, feat_date)
-                            urls_alertees.add(url_norm)
-                    except ValueError:
-                        pass
-            # Circuit breaker : après 3 captchas consécutifs, pause longue
-            if captcha_consecutifs >= 3:
-                remaining = len([a for a in candidats if a not in {p.get('asin') for p in tous_papiers}])
-                if remaining > 0:
-                    logger.warning(f"  🛑 Circuit breaker: {captcha_consecutifs} captchas consécutifs, pause 30s...")
-                    await asyncio.sleep(30)
-                    captcha_consecutifs = 0  # Reset après la pause
-            continue
+                    # Vérifier nouveauté
+                    if not est_deja_alerte and feat_date != 'Date inconnue':
+                        try:
+                            date_parsee = datetime.strptime(feat_date, "%Y/%m/%d")
+                            if date_parsee > config.DATE_SEUIL:
+                                logger.info(f"      ✨ Nouveauté (Featured): {feat_date}, Tome: {feat_tome}")
+                                papier_info['est_nouveaute'] = True
+                                nouveautes.append(papier_info)
+                                await ecrivain.ecrire(db.marquer_comme_alerte, nom, url_norm, feat_date)
+                                await _suivre_si_precommande(ecrivain, db, asin, nom, nom_bdd, url_norm, feat_date)
+                                urls_alertees.add(url_norm)
+                        except ValueError:
+                            pass
+                # Circuit breaker : après 3 captchas consécutifs, pause longue
+                if captcha_consecutifs >= 3:
+                    remaining = len([a for a in candidats if a not in {p.get('asin') for p in tous_papiers}])
+                    if remaining > 0:
+                        logger.warning(f"  🛑 Circuit breaker: {captcha_consecutifs} captchas consécutifs, pause 30s...")
+                        await pause(session, 30)
+                        captcha_consecutifs = 0  # Reset après la pause
+                continue
         
-        # Éditeur
-        captcha_consecutifs = 0  # Reset : page OK
+            # Éditeur
+            captcha_consecutifs = 0  # Reset : page OK
         
-        # Filtre format : vérifier que le produit est du bon type (manga vs LN)
-        # Le format vient du champ Amazon : コミック (紙) / Comics (Paper) pour manga,
-        # 文庫 / Paperback Bunko pour LN
-        format_livre = infos.get('format', '')
-        if filtre != "both" and format_livre:
-            if filtre == "ln_only":
-                # Formats acceptés pour LN : 文庫 (bunko), ペーパーバック (paperback)
-                if ('文庫' not in format_livre and 'Bunko' not in format_livre
-                        and 'ペーパーバック' not in format_livre and 'Paperback' not in format_livre):
-                    logger.info(f"  📚 [{asin}] Format non-LN: {format_livre[:30]} → skip")
-                    continue
-            else:
-                # Manga par défaut : exiger コミック ou Comics
-                if 'コミック' not in format_livre and 'Comic' not in format_livre:
-                    logger.info(f"  📚 [{asin}] Format non-manga: {format_livre[:30]} → skip")
-                    continue
+            # Filtre format : vérifier que le produit est du bon type (manga vs LN)
+            # Le format vient du champ Amazon : コミック (紙) / Comics (Paper) pour manga,
+            # 文庫 / Paperback Bunko pour LN
+            format_livre = infos.get('format', '')
+            if filtre != "both" and format_livre:
+                if filtre == "ln_only":
+                    # Formats acceptés pour LN : 文庫 (bunko), ペーパーバック (paperback)
+                    if ('文庫' not in format_livre and 'Bunko' not in format_livre
+                            and 'ペーパーバック' not in format_livre and 'Paperback' not in format_livre):
+                        logger.info(f"  📚 [{asin}] Format non-LN: {format_livre[:30]} → skip")
+                        continue
+                else:
+                    # Manga par défaut : exiger コミック ou Comics
+                    if 'コミック' not in format_livre and 'Comic' not in format_livre:
+                        logger.info(f"  📚 [{asin}] Format non-manga: {format_livre[:30]} → skip")
+                        continue
         
-        editeur_volume = infos.get('editeur')
-        if not editeur_volume:
-            editeur_titre = extraire_editeur(infos.get('titre', ''))
-            if editeur_titre:
-                editeur_volume = convertir_editeur_romaji(editeur_titre)
+            editeur_volume = infos.get('editeur')
+            if not editeur_volume:
+                editeur_titre = extraire_editeur(infos.get('titre', ''))
+                if editeur_titre:
+                    editeur_volume = convertir_editeur_romaji(editeur_titre)
         
-        # Sauvegarder dans le cache de vérification
-        db.sauvegarder_verification(
-            asin, 
-            infos.get('date', 'Date inconnue'),
-            str(infos.get('tome', 'N/A')),
-            infos.get('titre', '')[:100],
-            editeur_volume
-        )
+            # Sauvegarder dans le cache de vérification
+            await ecrivain.ecrire(db.sauvegarder_verification,
+                asin, 
+                infos.get('date', 'Date inconnue'),
+                str(infos.get('tome', 'N/A')),
+                infos.get('titre', '')[:100],
+                editeur_volume
+            )
         
-        # Filtre éditeur
-        if editeur_officiel_serie and editeur_volume and editeur_volume != 'Inconnu':
-            if not editeur_match(editeur_volume, editeur_officiel_serie):
-                logger.info(f"      📚 Éditeur: {editeur_volume} ≠ officiel {editeur_officiel_serie} → skip")
-                continue
+            # Filtre éditeur
+            if editeur_officiel_serie and editeur_volume and editeur_volume != 'Inconnu':
+                if not editeur_match(editeur_volume, editeur_officiel_serie):
+                    logger.info(f"      📚 Éditeur: {editeur_volume} ≠ officiel {editeur_officiel_serie} → skip")
+                    continue
         
-        if editeur_volume:
-            logger.info(f"      📚 Éditeur: {editeur_volume}")
+            if editeur_volume:
+                logger.info(f"      📚 Éditeur: {editeur_volume}")
         
-        # Sauvegarder dans la table volumes
-        tome_int = None
-        try:
-            tome_val = infos.get('tome', 'N/A')
-            if tome_val and tome_val != 'N/A':
-                tome_int = int(tome_val)
-        except (ValueError, TypeError):
-            pass
+            # Sauvegarder dans la table volumes
+            tome_int = None
+            try:
+                tome_val = infos.get('tome', 'N/A')
+                if tome_val and tome_val != 'N/A':
+                    tome_int = int(tome_val)
+            except (ValueError, TypeError):
+                pass
         
-        db.sauvegarder_volume(
-            serie_jp=nom,
-            serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
-            tome=tome_int,
-            asin=asin,
-            url=url_norm,
-            date_sortie_jp=infos.get('date', 'Date inconnue'),
-            titre_volume=infos.get('titre', '')[:200],
-            editeur=editeur_volume
-        )
+            await ecrivain.ecrire(db.sauvegarder_volume,
+                serie_jp=nom,
+                serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
+                tome=tome_int,
+                asin=asin,
+                url=url_norm,
+                date_sortie_jp=infos.get('date', 'Date inconnue'),
+                titre_volume=infos.get('titre', '')[:200],
+                editeur=editeur_volume
+            )
         
-        # Construire papier_info
-        papier_info = {
-            'nom': nom,
-            'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
-            'tome': infos.get('tome', 'N/A'),
-            'date': infos.get('date', 'Date inconnue'),
-            'editeur': infos.get('editeur', 'Inconnu'),
-            'url': url_norm,
-            'asin': asin,
-            'couverture': infos.get('couverture_url', ''),
-            'est_nouveaute': False,
-            'serie_recherchee': nom_bdd
-        }
+            # Construire papier_info
+            papier_info = {
+                'nom': nom,
+                'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                'tome': infos.get('tome', 'N/A'),
+                'date': infos.get('date', 'Date inconnue'),
+                'editeur': infos.get('editeur', 'Inconnu'),
+                'url': url_norm,
+                'asin': asin,
+                'couverture': infos.get('couverture_url', ''),
+                'est_nouveaute': False,
+                'serie_recherchee': nom_bdd
+            }
         
-        if not infos.get('date'):
-            logger.warning(f"  ❌ [{asin}] Pas de date trouvée")
-            tous_papiers.append(papier_info)
-            continue
+            if not infos.get('date'):
+                logger.warning(f"  ❌ [{asin}] Pas de date trouvée")
+                tous_papiers.append(papier_info)
+                continue
         
-        try:
-            date_clean = _normaliser_date(infos['date'])
-            date_parsee = datetime.strptime(date_clean, "%Y/%m/%d")  # Lève ValueError si non parseable
-            infos['date'] = date_clean
-            papier_info['date'] = date_clean  # Mettre à jour papier_info (construit avant normalisation)
-            # Mettre à jour la table volumes avec la date normalisée
-            db.sauvegarder_volume(
-                serie_jp=nom, serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
-                tome=tome_int, asin=asin, url=url_norm,
-                date_sortie_jp=date_clean, titre_volume=infos.get('titre', '')[:200],
-                editeur=editeur_volume
-            )
+            try:
+                date_clean = _normaliser_date(infos['date'])
+                date_parsee = datetime.strptime(date_clean, "%Y/%m/%d")  # Lève ValueError si non parseable
+                infos['date'] = date_clean
+                papier_info['date'] = date_clean  # Mettre à jour papier_info (construit avant normalisation)
+                # Mettre à jour la table volumes avec la date normalisée
+                await ecrivain.ecrire(db.sauvegarder_volume,
+                    serie_jp=nom, serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
+                    tome=tome_int, asin=asin, url=url_norm,
+                    date_sortie_jp=date_clean, titre_volume=infos.get('titre', '')[:200],
+                    editeur=editeur_volume
+                )
 
-            # Précommandes : changement de date ?
-            if force_refetch and date_alerte_enregistree:
-                nouvelle_date = date_clean
-                if nouvelle_date != date_alerte_enregistree:
-                    logger.warning(f"  ⚠️  [{asin}] DATE MODIFIÉE ! {date_alerte_enregistree} → {nouvelle_date}")
-                    db.update_alerte_date(nom_bdd, url_norm, nouvelle_date)
-                    db.sauvegarder_verification(asin, nouvelle_date, infos.get('tome', 'N/A'), infos.get('titre', '')[:200], infos.get('editeur', ''))
-                    papier_info['est_nouveaute'] = True
-                    papier_info['date_modifiee'] = True
-                    papier_info['ancienne_date'] = date_alerte_enregistree
+                # Précommande suivie re-vérifiée : changement de date ?
+                if date_alerte_enregistree:
+                    if await _comparer_date_precommande(ecrivain, db, asin, nom, url_norm, date_alerte_enregistree, papier_info):
+                        await ecrivain.ecrire(db.sauvegarder_verification, asin, date_clean, infos.get('tome', 'N/A'), infos.get('titre', '')[:200], infos.get('editeur', ''))
+                        nouveautes.append(papier_info)
+                    tous_papiers.append(papier_info)
+                    continue
+
+                # Déjà alerté, page re-vérifiée (cache expiré) : pas de seconde alerte
+                if est_deja_alerte:
+                    logger.info(f"  ✓  [{asin}] Tome alerté précédemment ({infos['date']})")
                     papier_info['deja_alerte'] = True
-                    nouveautes.append(papier_info)
                     tous_papiers.append(papier_info)
                     continue
-                else:
-                    logger.info(f"  🔄 [{asin}] Précommande re-vérifiée: date inchangée ({nouvelle_date})")
+
+                if date_parsee <= config.DATE_SEUIL:
+                    if infos.get('est_lot'):
+                        if infos.get('lot_debut') and infos.get('lot_fin'):
+                            tome_display = f"📦 LOT volumes {infos['lot_debut']}-{infos['lot_fin']}"
+                        elif infos.get('lot_total'):
+                            tome_display = f"📦 COFFRET {infos['lot_total']} volumes"
+                        else:
+                            tome_display = "📦 LOT/SET"
+                    else:
+                        tome_display = f"Tome: {infos.get('tome', 'N/A')}"
+                    logger.info(f"  ⏳ [{asin}] Trop ancien: {infos['date']}, {tome_display}")
                     tous_papiers.append(papier_info)
                     continue
             
-            if date_parsee <= config.DATE_SEUIL:
+                # NOUVEAUTÉ !
                 if infos.get('est_lot'):
                     if infos.get('lot_debut') and infos.get('lot_fin'):
-                        tome_display = f"📦 LOT volumes {infos['lot_debut']}-{infos['lot_fin']}"
+                        lot_info = f"📦 LOT volumes {infos['lot_debut']}-{infos['lot_fin']}"
                     elif infos.get('lot_total'):
-                        tome_display = f"📦 COFFRET {infos['lot_total']} volumes"
+                        lot_info = f"📦 COFFRET {infos['lot_total']} volumes"
                     else:
-                        tome_display = "📦 LOT/SET"
+                        lot_info = "📦 LOT/SET"
+                    logger.info(f"  ✨ [{asin}] NOUVEAUTÉ ! Date: {infos['date']}, {lot_info}")
+                    logger.warning(f"      ⚠️  ATTENTION : Ceci est un LOT/SET, pas un volume individuel")
                 else:
-                    tome_display = f"Tome: {infos.get('tome', 'N/A')}"
-                logger.info(f"  ⏳ [{asin}] Trop ancien: {infos['date']}, {tome_display}")
-                tous_papiers.append(papier_info)
-                continue
+                    logger.info(f"  ✨ [{asin}] NOUVEAUTÉ ! Date: {infos['date']}, Tome: {infos.get('tome', 'N/A')}")
             
-            # NOUVEAUTÉ !
-            if infos.get('est_lot'):
-                if infos.get('lot_debut') and infos.get('lot_fin'):
-                    lot_info = f"📦 LOT volumes {infos['lot_debut']}-{infos['lot_fin']}"
-                elif infos.get('lot_total'):
-                    lot_info = f"📦 COFFRET {infos['lot_total']} volumes"
-                else:
-                    lot_info = "📦 LOT/SET"
-                logger.info(f"  ✨ [{asin}] NOUVEAUTÉ ! Date: {infos['date']}, {lot_info}")
-                logger.warning(f"      ⚠️  ATTENTION : Ceci est un LOT/SET, pas un volume individuel")
-            else:
-                logger.info(f"  ✨ [{asin}] NOUVEAUTÉ ! Date: {infos['date']}, Tome: {infos.get('tome', 'N/A')}")
-            
-            logger.info(f"      → {url_norm}")
+                logger.info(f"      → {url_norm}")
             
-            db.marquer_comme_alerte(nom, url_norm, infos['date'])
-            urls_alertees.add(url_norm)
+                await ecrivain.ecrire(db.marquer_comme_alerte, nom, url_norm, infos['date'])
+                await _suivre_si_precommande(ecrivain, db, asin, nom, nom_bdd, url_norm, infos['date'])
+                urls_alertees.add(url_norm)
             
-            papier_info['est_lot'] = infos.get('est_lot', False)
-            if infos.get('lot_debut') and infos.get('lot_fin'):
-                papier_info['lot_debut'] = infos['lot_debut']
-                papier_info['lot_fin'] = infos['lot_fin']
-            elif infos.get('lot_total'):
-                papier_info['lot_total'] = infos['lot_total']
+                papier_info['est_lot'] = infos.get('est_lot', False)
+                if infos.get('lot_debut') and infos.get('lot_fin'):
+                    papier_info['lot_debut'] = infos['lot_debut']
+                    papier_info['lot_fin'] = infos['lot_fin']
+                elif infos.get('lot_total'):
+                    papier_info['lot_total'] = infos['lot_total']
             
-            papier_info['est_nouveaute'] = True
-            nouveautes.append(papier_info)
-            tous_papiers.append(papier_info)
+                papier_info['est_nouveaute'] = True
+                nouveautes.append(papier_info)
+                tous_papiers.append(papier_info)
             
-        except ValueError:
-            logger.warning(f"  ⚠️  [{asin}] Date invalide: {infos.get('date')}")
-            tous_papiers.append(papier_info)
+            except ValueError:
+                logger.warning(f"  ⚠️  [{asin}] Date invalide: {infos.get('date')}")
+                tous_papiers.append(papier_info)
+        prechargement.fermer()
     
-    # =========================================================================
-    # PHASE C : RECHERCHE ÉTENDUE (après vérification, quand on connaît les tomes)
-    # =========================================================================
+        # =========================================================================
+        # PHASE C : RECHERCHE ÉTENDUE (après vérification, quand on connaît les tomes)
+        # =========================================================================
     
-    tomes_trouves_set = set()
-    for p in tous_papiers:
-        try:
-            tome_num = int(p.get('tome', 0))
-            if tome_num > 0:
-                tomes_trouves_set.add(tome_num)
-        except (ValueError, TypeError):
-            pass
-    
-    if tomes_trouves_set:
-        tome_max = max(tomes_trouves_set)
-        tomes_attendus = set(range(1, tome_max + 1))
-        tomes_manquants = tomes_attendus - tomes_trouves_set
+        tomes_trouves_set = set()
+        for p in tous_papiers:
+            try:
+                tome_num = int(p.get('tome', 0))
+                if tome_num > 0:
+                    tomes_trouves_set.add(tome_num)
+            except (ValueError, TypeError):
+                pass
+    
+        if tomes_trouves_set:
+            tome_max = max(tomes_trouves_set)
+            tomes_attendus = set(range(1, tome_max + 1))
+            tomes_manquants = tomes_attendus - tomes_trouves_set
         
-        if tomes_manquants and len(tous_papiers) > 0:
-            logger.info(f"\n⚠️  Tomes manquants: {sorted(tomes_manquants)}")
-            logger.info(f"   Trouvés: {sorted(tomes_trouves_set)} | Attendus: 1-{tome_max}")
-            logger.info(f"🔄 Recherche étendue (pages 2-4)...\n")
+            if tomes_manquants and len(tous_papiers) > 0:
+                logger.info(f"\n⚠️  Tomes manquants: {sorted(tomes_manquants)}")
+                logger.info(f"   Trouvés: {sorted(tomes_trouves_set)} | Attendus: 1-{tome_max}")
+                logger.info(f"🔄 Recherche étendue (pages 2-4)...\n")
             
-            if len(url_suffix) <= 10 and url_suffix not in config.TITRES_GENERIQUES:
-                recherche_exacte = url_suffix
-            else:
-                recherche_exacte = f'"{url_suffix}"'
+                if len(url_suffix) <= 10 and url_suffix not in config.TITRES_GENERIQUES:
+                    recherche_exacte = url_suffix
+                else:
+                    recherche_exacte = f'"{url_suffix}"'
             
-            titre_cle = normaliser_titre(url_suffix[:8] if len(url_suffix) >= 8 else url_suffix)
+                titre_cle = normaliser_titre(url_suffix[:8] if len(url_suffix) >= 8 else url_suffix)
             
-            for page_num in range(2, 5):
-                if not tomes_manquants:
-                    break
+                for page_num in range(2, 5):
+                    if not tomes_manquants:
+                        break
                 
-                url_page = f"https://www.amazon.co.jp/s?k={quote_plus(recherche_exacte)}&i=stripbooks&s=relevancerank&rh=p_6%3AAN1VRQENFRJN5&page={page_num}"
-                html_page = await get_html(session, url_page)
+                    url_page = f"https://www.amazon.co.jp/s?k={quote_plus(recherche_exacte)}&i=stripbooks&s=relevancerank&rh=p_6%3AAN1VRQENFRJN5&page={page_num}"
+                    html_page = await get_html(session, url_page)
                 
-                if not html_page:
-                    continue
+                    if not html_page:
+                        continue
                 
-                soup_page = BeautifulSoup(html_page, 'lxml')
-                items_page = soup_page.select('.s-result-item')[:30]
+                    _, items_page = await EXECUTEUR.recherche(html_page)
+                    items_page = items_page[:30]
                 
-                if not items_page:
-                    break
+                    if not items_page:
+                        break
                 
-                nouveaux_cette_page = 0
-                for item in items_page:
-                    titre_txt, url_complete, asin = extraire_item_amazon(item)
-                    if not titre_txt or not asin or asin in asin_deja_vus:
-                        continue
+                    nouveaux_cette_page = 0
+                    for item, classe in classer_resultats(items_page, titre_cle):
+                        titre_txt, url_complete, asin = item.titre, item.url, item.asin
+                        if not titre_txt or not asin or asin in asin_deja_vus:
+                            continue
                     
-                    titre_txt_normalise = normaliser_titre(titre_txt)
-                    if titre_cle not in titre_txt_normalise:
-                        continue
+                        if classe == 'hors_sujet_titre':
+                            continue
                     
-                    if est_ebook(url_complete, titre_txt) or not est_asin_papier(asin):
-                        asin_deja_vus.add(asin)
-                        continue
+                        # Mêmes filtres que la Phase A (ebook, non-papier, dérivé, lot, sponsorisé, rejet manuel)
+                        if classe != 'papier':
+                            asin_deja_vus.add(asin)
+                            continue
                     
-                    # Nouveau papier → vérifier directement
-                    logger.info(f"  ✅ Page {page_num}: [{asin}] {titre_txt[:50]}...")
-                    asin_deja_vus.add(asin)
-                    nouveaux_cette_page += 1
+                        # Nouveau papier → vérifier directement
+                        logger.info(f"  ✅ Page {page_num}: [{asin}] {titre_txt[:50]}...")
+                        asin_deja_vus.add(asin)
+                        nouveaux_cette_page += 1
                     
-                    # Fetch et vérification inline
-                    html_prod = await get_html(session, url_complete)
-                    if html_prod:
-                        infos = await extraire_infos_produit(html_prod)
-                        if not infos.get('_page_invalide'):
-                            editeur_ext = infos.get('editeur')
-                            if not editeur_ext:
-                                editeur_titre = extraire_editeur(infos.get('titre', ''))
-                                if editeur_titre:
-                                    editeur_ext = convertir_editeur_romaji(editeur_titre)
+                        # Fetch et vérification inline
+                        html_prod = await get_html(session, url_complete, sentinelles=config.SENTINELLES_PRODUIT)
+                        if html_prod:
+                            infos = await extraire_infos_produit(html_prod)
+                            if not infos.get('_page_invalide'):
+                                editeur_ext = infos.get('editeur')
+                                if not editeur_ext:
+                                    editeur_titre = extraire_editeur(infos.get('titre', ''))
+                                    if editeur_titre:
+                                        editeur_ext = convertir_editeur_romaji(editeur_titre)
                             
-                            db.sauvegarder_verification(asin, infos.get('date', 'Date inconnue'), str(infos.get('tome', 'N/A')), infos.get('titre', '')[:100], editeur_ext)
+                                await ecrivain.ecrire(db.sauvegarder_verification, asin, infos.get('date', 'Date inconnue'), str(infos.get('tome', 'N/A')), infos.get('titre', '')[:100], editeur_ext)
                             
-                            # Filtre éditeur
-                            if editeur_officiel_serie and editeur_ext and editeur_ext != 'Inconnu':
-                                if not editeur_match(editeur_ext, editeur_officiel_serie):
-                                    continue
+                                # Filtre éditeur
+                                if editeur_officiel_serie and editeur_ext and editeur_ext != 'Inconnu':
+                                    if not editeur_match(editeur_ext, editeur_officiel_serie):
+                                        continue
                             
-                            tome_int = None
-                            try:
-                                if infos.get('tome') and infos['tome'] != 'N/A':
-                                    tome_int = int(infos['tome'])
-                            except:
-                                pass
+                                tome_int = None
+                                try:
+                                    if infos.get('tome') and infos['tome'] != 'N/A':
+                                        tome_int = int(infos['tome'])
+                                except:
+                                    pass
                             
-                            db.sauvegarder_volume(
-                                serie_jp=nom, serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
-                                tome=tome_int, asin=asin,
-                                url=normaliser_url(url_complete),
-                                date_sortie_jp=infos.get('date', 'Date inconnue'),
-                                titre_volume=infos.get('titre', '')[:200], editeur=editeur_ext
-                            )
+                                await ecrivain.ecrire(db.sauvegarder_volume,
+                                    serie_jp=nom, serie_fr=titre_fr_serie or config.TRADUCTIONS_FR.get(nom),
+                                    tome=tome_int, asin=asin,
+                                    url=normaliser_url(url_complete),
+                                    date_sortie_jp=infos.get('date', 'Date inconnue'),
+                                    titre_volume=infos.get('titre', '')[:200], editeur=editeur_ext
+                                )
                             
-                            papier_info = {
-                                'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
-                                'tome': infos.get('tome', 'N/A'), 'date': infos.get('date', 'Date inconnue'),
-                                'editeur': editeur_ext or 'Inconnu', 'url': normaliser_url(url_complete),
-                                'asin': asin, 'couverture': '', 'est_nouveaute': False,
-                                'serie_recherchee': nom_bdd
-                            }
-                            tous_papiers.append(papier_info)
+                                papier_info = {
+                                    'nom': nom, 'nom_fr': config.TRADUCTIONS_FR.get(nom, strip_type_suffix(nom)),
+                                    'tome': infos.get('tome', 'N/A'), 'date': infos.get('date', 'Date inconnue'),
+                                    'editeur': editeur_ext or 'Inconnu', 'url': normaliser_url(url_complete),
+                                    'asin': asin, 'couverture': '', 'est_nouveaute': False,
+                                    'serie_recherchee': nom_bdd
+                                }
+                                tous_papiers.append(papier_info)
                             
-                            # Mettre à jour les tomes manquants
-                            if tome_int and tome_int in tomes_manquants:
-                                tomes_manquants.discard(tome_int)
+                                # Mettre à jour les tomes manquants
+                                if tome_int and tome_int in tomes_manquants:
+                                    tomes_manquants.discard(tome_int)
                 
-                if nouveaux_cette_page > 0:
-                    logger.info(f"   Page {page_num}: {nouveaux_cette_page} nouveau(x)")
-                else:
-                    logger.info(f"   Page {page_num}: rien de nouveau")
+                    if nouveaux_cette_page > 0:
+                        logger.info(f"   Page {page_num}: {nouveaux_cette_page} nouveau(x)")
+                    else:
+                        logger.info(f"   Page {page_num}: rien de nouveau")
+    finally:
+        prechargement.fermer()
+        # Écritures en attente appliquées avant les relectures (éditeur officiel, bulk étendu)
+        await ecrivain.fermer()
     
     # =========================================================================
     # FINALISATION
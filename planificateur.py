@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Scan concurrent des séries (nombre de séries en vol borné)
+"""
+
+import asyncio
+import contextvars
+import logging
+from typing import Awaitable, Callable, Dict, List
+
+import config
+from utils import normaliser_titre, strip_type_suffix
+
+logger = config.logger
+
+# Série scannée par la tâche courante (préfixe des lignes de log en mode concurrent)
+SERIE_COURANTE = contextvars.ContextVar('serie_courante', default=None)
+
+
+class PrefixeSerie(logging.Filter):
+    """Préfixe chaque ligne de log par le numéro de la série qui l'émet ([12] ...)."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        etiquette = SERIE_COURANTE.get()
+        if etiquette and isinstance(record.msg, str):
+            message = record.getMessage()
+            corps = message.lstrip('\n')
+            record.msg = f"{message[:len(message) - len(corps)]}[{etiquette}] {corps}"
+            record.args = None
+        return True
+
+
+def cle_chaine(manga: Dict) -> str:
+    """Séries d'une même œuvre (MANGA / LN, serie_id) : scannées l'une après l'autre."""
+    return normaliser_titre(manga.get('url_suffix') or strip_type_suffix(manga['nom']))
+
+
+class PlanificateurSeries:
+    """
+    Scanne jusqu'à `concurrence` séries à la fois ; la cadence réseau reste celle
+    du pacer partagé de SessionWrapper, quel que soit le nombre de séries en vol.
+
+    - les séries démarrent dans l'ordre de priorité reçu (get_priorite_serie)
+    - les séries d'une même œuvre (cle_chaine) forment une chaîne exécutée dans
+      l'ordre, comme en séquentiel : l'une lit en BDD ce que l'autre a écrit
+    - chaque série est une seule coroutine : ses écritures en BDD (synchrones)
+      gardent leur ordre
+    - les résultats sont rendus dans l'ordre d'entrée, quel que soit l'ordre de fin
+    """
+    def __init__(self, concurrence: int = None):
+        self.concurrence = max(1, concurrence or config.SERIES_CONCURRENTES)
+        self.stats = {'series': 0, 'en_vol_max': 0}
+        self._en_vol = 0
+
+    async def executer(self, mangas: List[Dict], scanner: Callable[[Dict, int, int], Awaitable]) -> List:
+        """scanner(manga, index, total) pour chaque série ; résultats dans l'ordre de `mangas`."""
+        total = len(mangas)
+        resultats = [None] * total
+        chaines: Dict[str, List[int]] = {}
+        for i, manga in enumerate(mangas):
+            chaines.setdefault(cle_chaine(manga), []).append(i)
+        semaphore = asyncio.Semaphore(self.concurrence)
+
+        async def executer_chaine(indices: List[int]):
+            for i in indices:
+                async with semaphore:
+                    self._en_vol += 1
+                    self.stats['en_vol_max'] = max(self.stats['en_vol_max'], self._en_vol)
+                    jeton = SERIE_COURANTE.set(f"{i + 1}/{total}" if self.concurrence > 1 else None)
+                    try:
+                        resultats[i] = await scanner(mangas[i], i + 1, total)
+                    finally:
+                        SERIE_COURANTE.reset(jeton)
+                        self._en_vol -= 1
+                        self.stats['series'] += 1
+
+        prefixe = PrefixeSerie()
+        if self.concurrence > 1:
+            logger.addFilter(prefixe)
+        try:
+            # Chaînes lancées dans l'ordre de leur première série : le sémaphore
+            # (FIFO) sert les séries prioritaires en premier
+            await asyncio.gather(*(executer_chaine(indices) for indices in chaines.values()))
+        finally:
+            logger.removeFilter(prefixe)
+        return resultats
+
+    def log_resume(self):
+        if self.stats['series']:
+            logger.info(f"🗂️  Planificateur: {self.stats['series']} série(s), "
+                        f"jusqu'à {self.stats['en_vol_max']} en parallèle (max {self.concurrence})")
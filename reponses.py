@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Classification des réponses HTTP Amazon (sur les octets bruts)
+"""
+
+import re
+from typing import Optional, Union
+
+# Résultats de classification (mêmes valeurs que les signaux de throttle.AdaptiveThrottle)
+CLASSE_OK = 'ok'
+CLASSE_CAPTCHA = 'captcha'
+CLASSE_RATE_LIMITED = 'rate_limited'
+CLASSE_SHORT = 'short'
+CLASSE_NOT_FOUND = 'not_found'
+
+TAILLE_PAGE_MIN = 500        # Octets : en dessous, réponse inexploitable
+TAILLE_PAGE_BLOCAGE = 5000   # Octets : en dessous, une page avec marqueur de bot est un captcha
+
+# Motifs précompilés, cherchés sans copie ni passage en minuscules du corps
+_MOTIF_BOT_OCTETS = re.compile(rb'captcha|robot|automated access', re.IGNORECASE)
+_MOTIF_CAPTCHA_OCTETS = re.compile(rb'captcha|robot', re.IGNORECASE)
+_MOTIF_CAPTCHA_TEXTE = re.compile(r'captcha|robot', re.IGNORECASE)
+_ACCES_AUTOMATISE_OCTETS = b'To discuss automated access'
+_ACCES_AUTOMATISE_TEXTE = 'To discuss automated access'
+
+
+def classer_reponse(statut: int, corps: bytes) -> Optional[str]:
+    """
+    Classe une réponse Amazon en un seul passage sur les octets bruts.
+    Retourne CLASSE_* ou None pour un statut HTTP non géré (erreur générique).
+    """
+    if statut == 404:
+        return CLASSE_NOT_FOUND
+    if statut == 503:
+        return CLASSE_RATE_LIMITED
+    if statut != 200:
+        return None
+    taille = len(corps) if corps else 0
+    if taille < TAILLE_PAGE_BLOCAGE and corps and _MOTIF_BOT_OCTETS.search(corps):
+        return CLASSE_CAPTCHA
+    if taille <= TAILLE_PAGE_MIN:
+        return CLASSE_SHORT
+    return CLASSE_OK
+
+
+def detecter_blocage(contenu: Union[str, bytes]) -> Optional[str]:
+    """Marqueur de blocage présent n'importe où dans la page : 'captcha', 'rate_limit' ou None."""
+    if isinstance(contenu, bytes):
+        if _MOTIF_CAPTCHA_OCTETS.search(contenu):
+            return 'captcha'
+        return 'rate_limit' if _ACCES_AUTOMATISE_OCTETS in contenu else None
+    if _MOTIF_CAPTCHA_TEXTE.search(contenu):
+        return 'captcha'
+    return 'rate_limit' if _ACCES_AUTOMATISE_TEXTE in contenu else None
+
+
+_NON_CALCULE = object()
+
+
+class PageHtml(str):
+    """
+    HTML décodé (une seule fois) d'une réponse Amazon, porteur de sa classification.
+
+    - classe : CLASSE_* attribuée par get_html
+    - tronquee : lecture arrêtée avant la fin du document (get_html avec sentinelles)
+    - blocage : marqueur captcha / rate_limit dans le corps, calculé au premier accès
+      (utilisé par les parseurs quand la page n'a pas le contenu attendu)
+    - produit : pages.ProductPage attachée au premier parsing de la page
+    - analyses : résultats des extracteurs exécutés dans un worker (analyse.py)
+    """
+    def __new__(cls, texte: str, classe: str = CLASSE_OK, corps: bytes = None, tronquee: bool = False):
+        page = super().__new__(cls, texte)
+        page.classe = classe
+        page.tronquee = tronquee
+        page.produit = None
+        page.analyses = None
+        page._blocage = _NON_CALCULE
+        if corps is not None and len(corps) < TAILLE_PAGE_BLOCAGE:
+            page._blocage = detecter_blocage(corps)
+        return page
+
+    @property
+    def blocage(self) -> Optional[str]:
+        if self._blocage is _NON_CALCULE:
+            self._blocage = detecter_blocage(str.__str__(self))
+        return self._blocage
+
+
+class LecteurSentinelles:
+    """
+    Lecture progressive d'un corps de réponse : accumule les morceaux reçus et
+    indique quand arrêter, c'est-à-dire une fois toutes les sentinelles vues
+    (plus `marge` octets pour la fin de la dernière section), ou à `octets_max`.
+    """
+    def __init__(self, sentinelles, octets_max: int, marge: int):
+        self.restantes = list(sentinelles)
+        self.octets_max = octets_max
+        self.marge = marge
+        self.corps = bytearray()
+        self.limite = octets_max
+        self.tronque = False
+        self._fin_sentinelles = 0
+
+    def ajouter(self, morceau: bytes) -> bool:
+        """Ajoute un morceau ; True si la lecture peut s'arrêter."""
+        debut = len(self.corps)
+        self.corps += morceau
+        if self.restantes:
+            restantes = []
+            for s in self.restantes:
+                position = self.corps.find(s, max(0, debut - len(s) + 1))
+                if position == -1:
+                    restantes.append(s)
+                else:
+                    self._fin_sentinelles = max(self._fin_sentinelles, position + len(s))
+            self.restantes = restantes
+            if not restantes:
+                self.limite = min(self.octets_max, self._fin_sentinelles + self.marge)
+        if len(self.corps) >= self.limite:
+            self.tronque = True
+            return True
+        return False
+
+    def resultat(self) -> bytes:
+        """Corps lu, coupé à la limite (résultat identique quel que soit le découpage en morceaux)."""
+        if self.tronque:
+            return bytes(self.corps[:self.limite])
+        return bytes(self.corps)
+
+
+def decoder(corps: bytes, encodage: str = None) -> str:
+    """Décode le corps d'une réponse (UTF-8 par défaut pour amazon.co.jp)."""
+    return corps.decode(encodage or 'utf-8', errors='replace')
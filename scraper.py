@@ -5,19 +5,29 @@ MangaVega Tracker - Scraper Amazon (HTTP, extraction HTML)
 """
 
 import asyncio
+import json
+import os
 import random
 import re
-from typing import List, Dict, Optional
+import time
+from collections import OrderedDict
+from http.cookies import SimpleCookie
+from typing import List, Dict, NamedTuple, Optional
 
 import aiohttp
-from bs4 import BeautifulSoup
 
 import config
-from utils import (
-    extraire_asin, extraire_numero_tome, extraire_editeur,
-    convertir_editeur_romaji, est_format_papier,
-    normaliser_titre, strip_type_suffix
+from http_archive import HorlogeVirtuelle, HttpRecorder, HttpReplayer
+from http_cache import ResponseCache, SingleFlight
+from analyse import EXECUTEUR
+from etages import ChaineEtages, Etage
+from pages import SearchResult, date_format_item, infos_resultat
+from reponses import (
+    CLASSE_OK, CLASSE_CAPTCHA, CLASSE_SHORT, CLASSE_RATE_LIMITED, CLASSE_NOT_FOUND,
+    LecteurSentinelles, PageHtml, classer_reponse, decoder
 )
+from throttle import RequestPacer, AdaptiveThrottle, classe_requete
+from utils import est_format_papier, normaliser_url
 
 logger = config.logger
 
@@ -26,76 +36,209 @@ if config.CURL_CFFI_DISPONIBLE:
     from curl_cffi.requests import AsyncSession as CurlAsyncSession
 
 
-async def get_html(session, url: str, delai: float = 0.6, max_retries: int = 2) -> Optional[str]:
-    """Récupère le HTML d'une URL Amazon avec anti-détection."""
-    est_recherche = '/s?' in url or '/s/' in url
-    est_produit = '/dp/' in url
+AMAZON_CANONIQUE = 'https://www.amazon.co.jp'
+
+
+def url_reseau(url: str) -> str:
+    """URL effectivement requêtée : redirige amazon.co.jp vers config.AMAZON_BASE_URL
+    (simulateur local). Les URLs manipulées par le pipeline restent canoniques."""
+    if config.AMAZON_BASE_URL != AMAZON_CANONIQUE and url.startswith(AMAZON_CANONIQUE):
+        return config.AMAZON_BASE_URL + url[len(AMAZON_CANONIQUE):]
+    return url
+
+
+async def get_html(session, url: str, delai: float = 0.6, max_retries: int = 2,
+                   sentinelles: tuple = None, octets_max: int = None, sans_cache: bool = False) -> Optional[str]:
+    """Récupère le HTML d'une URL Amazon avec anti-détection.
+    Les requêtes identiques (URL normalisée) d'un même run partagent un seul
+    aller-retour réseau via session.dedup (requête en vol + mémo).
+    
+    sentinelles : marqueurs (octets) attendus dans la page ; le corps est lu
+    progressivement et la lecture s'arrête une fois tous vus (+ STREAMING_MARGE)
+    ou à octets_max. Une page tronquée a sa propre clé (mémo et cache disque,
+    URL#sentinelles) ; une page complète déjà en mémo ou en cache est réutilisée.
+    
+    sans_cache : ignore les pages du cache disque (vérification qui doit voir la
+    page actuelle, ex: précommandes) ; le mémo du run reste utilisé."""
+    if sentinelles and octets_max is None:
+        octets_max = config.STREAMING_OCTETS_MAX
+    fetch = lambda: _recuperer_html(session, url, delai, max_retries, sentinelles, octets_max, sans_cache)
+    dedup = getattr(session, 'dedup', None)
+    if dedup is None:
+        return await fetch()
+    cle = normaliser_url(url)
+    if sentinelles:
+        complete = dedup.consulter(cle)
+        if complete is not None:
+            return complete
+        cle += '#' + variante_sentinelles(sentinelles)
+    return await dedup.executer(cle, fetch)
+
+
+def variante_sentinelles(sentinelles: tuple) -> str:
+    """Suffixe de clé (mémo, cache disque) d'une page lue jusqu'à ces sentinelles."""
+    return '|'.join(s.decode('ascii', 'replace') for s in sentinelles)
+
+
+async def pause(session, secondes: float):
+    """Pause du scan : réelle, ou virtuelle en mode rejeu (session.dormir)."""
+    await getattr(session, 'dormir', asyncio.sleep)(secondes)
+
+
+async def signaler_reponse(session, resultat: str, http=None, url: str = None):
+    """Transmet le résultat d'une réponse au débit adaptatif et à la session du pool
+    qui l'a servie (score de santé, sonde des cookies restaurés).
+    Sans `http`, la session est retrouvée depuis l'URL servie."""
+    throttle = getattr(session, 'throttle', None)
+    if throttle:
+        throttle.signaler(resultat)
+    if not hasattr(session, 'signaler_session'):
+        return
+    if http is None and url:
+        http = session.session_origine(url)
+    if http is not None:
+        await session.signaler_session(http, resultat)
+
+
+async def _recuperer_html(session, url: str, delai: float, max_retries: int,
+                          sentinelles: tuple = None, octets_max: int = None,
+                          sans_cache: bool = False) -> Optional[str]:
+    """Cache disque (sauf sans_cache), puis réseau avec cadence, retries et classification des réponses."""
+    classe = classe_requete(url)
+    est_recherche = classe == 'recherche'
+    est_produit = classe == 'produit'
     url_courte = url.split('?')[0][-60:] if '?' in url else url[-60:]
+    pacer = getattr(session, 'pacer', None)
+    cache = getattr(session, 'cache', None)
+    rejeu = getattr(session, 'rejeu', None)
+    enregistreur = getattr(session, 'enregistreur', None)
+    
+    variante = variante_sentinelles(sentinelles) if sentinelles else None
+    
+    if cache and not sans_cache:
+        entree = cache.lire(url, variante)
+        if entree is not None:
+            statut_cache, html_cache, partielle = entree
+            logger.info(f"      [CACHE] {statut_cache}{' (partielle)' if partielle else ''} | {url_courte}")
+            return PageHtml(html_cache, tronquee=partielle) if html_cache else html_cache
     
     for attempt in range(max_retries + 1):
+        http = None
         try:
             if attempt > 0:
                 wait = min(10 * (2 ** attempt) + random.uniform(0, 5), 60)
                 logger.info(f"      ⏳ Backoff retry #{attempt}: {wait:.0f}s...")
-                await asyncio.sleep(wait)
+                await pause(session, wait)
+            
+            # Cadence : le pacer de SessionWrapper décide du créneau de chaque requête
+            if pacer:
+                await pacer.acquerir(classe)
             elif est_recherche:
-                wait = random.uniform(2.0, 4.5)
-                await asyncio.sleep(wait)
+                await asyncio.sleep(random.uniform(2.0, 4.5))
             elif est_produit:
-                wait = random.uniform(0.8, 2.0)
-                await asyncio.sleep(wait)
+                await asyncio.sleep(random.uniform(0.8, 2.0))
             else:
-                wait = random.uniform(delai * 0.5, delai * 1.5)
-                await asyncio.sleep(wait)
+                await asyncio.sleep(random.uniform(delai * 0.5, delai * 1.5))
             
-            if config.CURL_CFFI_DISPONIBLE and hasattr(session, '_curl_cffi_session'):
-                cffi_session = session._curl_cffi_session
+            # Session du pool la plus saine, choisie au moment de l'envoi (un retry peut en changer)
+            choisir = getattr(session, 'choisir_session', None)
+            http = choisir(url) if choisir else session
+            if choisir:
+                http.en_cours += 1
+            
+            aio = False
+            tronquee = False
+            lecteur = LecteurSentinelles(sentinelles, octets_max, config.STREAMING_MARGE) if sentinelles else None
+            if rejeu:
+                # Mode rejeu : réponse de l'archive, classée comme une réponse réseau
+                reponse = rejeu.servir(url)
+                if reponse is None:
+                    logger.warning(f"      [REPLAY] absente de l'archive | {url_courte}")
+                    return None
+                status, corps = reponse
+                encodage = None
+                if lecteur:
+                    lecteur.ajouter(corps)
+                    corps, tronquee = lecteur.resultat(), lecteur.tronque
+                logger.info(f"      [REPLAY] {status} | {len(corps):,} octets | {url_courte}")
+            elif config.CURL_CFFI_DISPONIBLE and getattr(http, '_curl_cffi_session', None) is not None:
+                cffi_session = http._curl_cffi_session
                 extra_headers = {"Accept-Language": "ja-JP,ja;q=0.9"}
                 if est_produit:
                     extra_headers["Referer"] = "https://www.amazon.co.jp/"
                 
-                response = await cffi_session.get(url, headers=extra_headers, timeout=30, allow_redirects=True)
+                debut = time.monotonic()
+                if lecteur:
+                    response = await cffi_session.get(url_reseau(url), headers=extra_headers, timeout=30,
+                                                      allow_redirects=True, stream=True)
+                    try:
+                        async for morceau in response.aiter_content():
+                            if lecteur.ajouter(morceau):
+                                break
+                    finally:
+                        await response.aclose()
+                    corps, tronquee = lecteur.resultat(), lecteur.tronque
+                else:
+                    response = await cffi_session.get(url_reseau(url), headers=extra_headers, timeout=30, allow_redirects=True)
+                    corps = response.content or b''
                 status = response.status_code
-                content_len = len(response.text) if response.text else 0
+                encodage = getattr(response, 'encoding', None)
+                if enregistreur:
+                    enregistreur.enregistrer(url, status, corps, time.monotonic() - debut)
                 cookies_count = len(cffi_session.cookies) if hasattr(cffi_session, 'cookies') else -1
-                logger.info(f"      [HTTP] {status} | {content_len:,} chars | cookies:{cookies_count} | {url_courte}")
-                
-                if status == 200:
-                    html = response.text
-                    if html and len(html) < 5000:
-                        html_lower = html.lower()
-                        if 'captcha' in html_lower or 'robot' in html_lower or 'automated access' in html_lower:
-                            logger.warning(f"      ⚠️  Captcha/bot détecté dans réponse 200 ({content_len} chars)")
-                            continue
-                    if html and content_len > 500:
-                        return html
-                    else:
-                        logger.warning(f"      ⚠️  Réponse trop courte ({content_len} chars)")
-                        continue
-                elif status == 503:
-                    logger.warning(f"      ⚠️  Rate limit (503)")
-                    continue
-                elif status == 404:
-                    logger.info(f"      ℹ️  Page introuvable (404)")
-                    return None
-                else:
-                    logger.warning(f"      ⚠️  HTTP {status}")
-                    continue
+                logger.info(f"      [HTTP] {status} | {len(corps):,} octets{' (lecture arrêtée)' if tronquee else ''} "
+                            f"| cookies:{cookies_count} | {url_courte}")
             else:
-                aio_session = session._aiohttp_session if hasattr(session, '_aiohttp_session') else session
-                async with aio_session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    content = await response.text()
-                    content_len = len(content) if content else 0
-                    logger.info(f"      [HTTP-aio] {response.status} | {content_len:,} chars | {url_courte}")
-                    if response.status == 200:
-                        return content
-                    elif response.status == 503:
-                        logger.warning(f"      ⚠️  Rate limit (503), attente 10s...")
-                        await asyncio.sleep(10)
-                        continue
+                aio = True
+                aio_session = http._aiohttp_session if hasattr(http, '_aiohttp_session') else http
+                debut = time.monotonic()
+                async with aio_session.get(url_reseau(url), timeout=aiohttp.ClientTimeout(total=30)) as response:
+                    status = response.status
+                    encodage = response.charset
+                    if lecteur:
+                        async for morceau in response.content.iter_chunked(64 * 1024):
+                            if lecteur.ajouter(morceau):
+                                response.close()  # abandonne le reste du corps
+                                break
+                        corps, tronquee = lecteur.resultat(), lecteur.tronque
                     else:
-                        logger.warning(f"      ⚠️  HTTP {response.status}")
-                        return None
+                        corps = await response.read()
+                if enregistreur:
+                    enregistreur.enregistrer(url, status, corps, time.monotonic() - debut)
+                logger.info(f"      [HTTP-aio] {status} | {len(corps):,} octets{' (lecture arrêtée)' if tronquee else ''} | {url_courte}")
+            
+            # Classification unique sur les octets bruts ; le corps n'est décodé que s'il est servi
+            resultat = classer_reponse(status, corps)
+            if resultat == CLASSE_OK:
+                await signaler_reponse(session, resultat, http)
+                html = PageHtml(decoder(corps, encodage), resultat, corps, tronquee)
+                if cache:
+                    cache.ecrire(url, 200, html, variante if tronquee else None)
+                return html
+            elif resultat == CLASSE_CAPTCHA:
+                logger.warning(f"      ⚠️  Captcha/bot détecté dans réponse 200 ({len(corps)} octets)")
+                await signaler_reponse(session, resultat, http)
+                continue
+            elif resultat == CLASSE_SHORT:
+                logger.warning(f"      ⚠️  Réponse trop courte ({len(corps)} octets)")
+                await signaler_reponse(session, resultat, http)
+                continue
+            elif resultat == CLASSE_RATE_LIMITED:
+                logger.warning(f"      ⚠️  Rate limit (503)" + (", attente 10s..." if aio else ""))
+                await signaler_reponse(session, resultat, http)
+                if aio:
+                    await pause(session, 10)
+                continue
+            elif resultat == CLASSE_NOT_FOUND:
+                logger.info(f"      ℹ️  Page introuvable (404)")
+                if cache:
+                    cache.ecrire(url, 404, None)
+                return None
+            else:
+                logger.warning(f"      ⚠️  HTTP {status}")
+                if aio:
+                    return None
+                continue
                     
         except asyncio.TimeoutError:
             logger.warning(f"      ⚠️  Timeout (attempt {attempt+1}/{max_retries+1})")
@@ -106,43 +249,183 @@ async def get_html(session, url: str, delai: float = 0.6, max_retries: int = 2)
             logger.warning(f"      ⚠️  Erreur (attempt {attempt+1}/{max_retries+1}): {err_str}")
             if attempt >= max_retries:
                 logger.error(f"      ❌ Erreur définitive: {err_str}")
+        finally:
+            if http is not None and http is not session:
+                http.en_cours -= 1
     return None
 
 
-class SessionWrapper:
-    """Encapsule curl_cffi AsyncSession pour le scraping Amazon."""
-    def __init__(self):
+def invalider_page(session, url: str):
+    """Oublie une page servie en 200 mais reconnue invalide (captcha dans une page longue)."""
+    cache = getattr(session, 'cache', None)
+    if cache:
+        cache.invalider(url)
+    dedup = getattr(session, 'dedup', None)
+    if dedup:
+        dedup.oublier(normaliser_url(url))
+
+
+class SessionHttp:
+    """Une session HTTP du pool : son propre jar de cookies, son profil
+    d'impersonation curl_cffi et un score de santé alimenté par les réponses.
+    Les cookies sont persistés entre les runs (un fichier par session) : un jar
+    restauré remplace le warm-up tant qu'Amazon ne le rejette pas."""
+    def __init__(self, index: int, profil: str, pacer: RequestPacer):
+        self.index = index
+        self.profil = profil if config.CURL_CFFI_DISPONIBLE else 'aiohttp'
+        self.nom = f"#{index} {self.profil}"
+        self.pacer = pacer
+        self.fichier_cookies = config.COOKIES_FILE.format(session=f"{index}_{self.profil}")
         self._curl_cffi_session = None
         self._aiohttp_session = None
         self._warmed_up = False
-    
-    async def __aenter__(self):
+        self.cookies_restaures = False
+        self._cookies_valides = False  # Au moins une réponse 'ok' avec ce jar
+        self.sante = 1.0
+        self.en_quarantaine = False
+        self.en_cours = 0
+        self.stats = {'ok': 0, 'negatifs': 0, 'quarantaines': 0}
+    
+    async def ouvrir(self):
         if config.CURL_CFFI_DISPONIBLE:
-            self._curl_cffi_session = CurlAsyncSession(impersonate="chrome", timeout=30)
+            self._curl_cffi_session = CurlAsyncSession(impersonate=self.profil, timeout=30)
             await self._curl_cffi_session.__aenter__()
-            logger.info("🌐 Session HTTP: curl_cffi (impersonate=chrome, TLS+HTTP/2 fingerprint)")
-            logger.info("   📋 Headers: Accept-Language: ja-JP (force pages japonaises)")
         else:
             self._aiohttp_session = aiohttp.ClientSession(headers=config.HEADERS)
             await self._aiohttp_session.__aenter__()
-            logger.warning("🌐 Session HTTP: aiohttp (⚠️ PAS de TLS impersonation)")
-            logger.warning("   ⚠️  curl_cffi non disponible - installer avec: pip install curl-cffi")
-        return self
+        self.cookies_restaures = self._restaurer_cookies()
     
-    async def __aexit__(self, *args):
+    async def fermer(self, *args):
+        self._sauvegarder_cookies()
         if self._curl_cffi_session:
             await self._curl_cffi_session.__aexit__(*args)
         if self._aiohttp_session:
             await self._aiohttp_session.__aexit__(*args)
     
-    async def warm_up(self):
-        """Visite amazon.co.jp pour initialiser les cookies de session."""
-        if self._warmed_up:
+    def _lister_cookies(self) -> List[Dict]:
+        """Cookies courants de la session, sous forme sérialisable."""
+        if self._curl_cffi_session:
+            jar = getattr(self._curl_cffi_session.cookies, 'jar', None)
+            if jar is None:
+                return []
+            return [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+                     'expires': c.expires, 'secure': bool(c.secure)} for c in jar]
+        if self._aiohttp_session:
+            # aiohttp ne publie pas les expirations : seul COOKIES_AGE_MAX s'applique
+            return [{'name': m.key, 'value': m.value, 'domain': m['domain'] or '.amazon.co.jp',
+                     'path': m['path'] or '/', 'expires': None, 'secure': bool(m['secure'])}
+                    for m in self._aiohttp_session.cookie_jar]
+        return []
+    
+    def _injecter_cookie(self, cookie: Dict):
+        if self._curl_cffi_session:
+            self._curl_cffi_session.cookies.set(cookie['name'], cookie['value'],
+                                                domain=cookie['domain'], path=cookie['path'],
+                                                secure=cookie.get('secure', False))
+        elif self._aiohttp_session:
+            morsel = SimpleCookie()
+            morsel[cookie['name']] = cookie['value']
+            morsel[cookie['name']]['domain'] = cookie['domain']
+            morsel[cookie['name']]['path'] = cookie['path']
+            self._aiohttp_session.cookie_jar.update_cookies(morsel)
+    
+    def _vider_cookies(self):
+        if self._curl_cffi_session:
+            self._curl_cffi_session.cookies.clear()
+        elif self._aiohttp_session:
+            self._aiohttp_session.cookie_jar.clear()
+    
+    def _restaurer_cookies(self) -> bool:
+        """Recharge le jar du run précédent s'il est récent et complet."""
+        if not os.path.exists(self.fichier_cookies):
+            return False
+        try:
+            with open(self.fichier_cookies, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"   ⚠️  Cookies sauvegardés illisibles: {str(e)[:80]}")
+            return False
+        maintenant = time.time()
+        age = maintenant - data.get('sauvegarde', 0)
+        if age > config.COOKIES_AGE_MAX:
+            logger.info(f"🍪 [{self.nom}] Cookies sauvegardés trop anciens ({age / 3600:.1f}h) → warm-up")
+            return False
+        cookies = [c for c in data.get('cookies', []) if not c.get('expires') or c['expires'] > maintenant]
+        noms = {c['name'] for c in cookies}
+        manquants = [n for n in config.COOKIES_REQUIS if n not in noms]
+        if manquants:
+            logger.info(f"🍪 [{self.nom}] Cookies sauvegardés incomplets (manque: {', '.join(manquants)}) → warm-up")
+            return False
+        try:
+            for cookie in cookies:
+                self._injecter_cookie(cookie)
+        except Exception as e:
+            logger.warning(f"   ⚠️  Restauration des cookies échouée: {str(e)[:80]}")
+            self._vider_cookies()
+            return False
+        logger.info(f"🍪 [{self.nom}] {len(cookies)} cookie(s) restauré(s) (sauvegardés il y a {age / 60:.0f} min)")
+        return True
+    
+    def _sauvegarder_cookies(self):
+        """Écrit le jar sur disque, seulement s'il a produit au moins une réponse valide."""
+        if not self._cookies_valides:
+            return
+        cookies = self._lister_cookies()
+        if not cookies:
+            return
+        tmp = self.fichier_cookies + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'sauvegarde': time.time(), 'cookies': cookies}, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.fichier_cookies)
+            logger.info(f"🍪 [{self.nom}] {len(cookies)} cookie(s) sauvegardé(s) pour le prochain run")
+        except OSError as e:
+            logger.warning(f"   ⚠️  Sauvegarde des cookies échouée: {str(e)[:80]}")
+    
+    def reinitialiser_cookies(self):
+        """Oublie le jar courant (mémoire et disque) : le prochain warm-up repart de zéro."""
+        self.cookies_restaures = False
+        self._cookies_valides = False
+        self._vider_cookies()
+        try:
+            os.remove(self.fichier_cookies)
+        except OSError:
+            pass
+    
+    async def signaler(self, resultat: str):
+        """Met à jour le score de santé et sonde la validité d'un jar restauré :
+        un captcha ou un 503 avant toute réponse valide → jar supprimé, warm-up complet."""
+        if resultat == 'ok':
+            self.stats['ok'] += 1
+            self.sante = min(1.0, self.sante + config.SANTE_GAIN_OK)
+            self._cookies_valides = True
+            return
+        if resultat not in AdaptiveThrottle.SIGNAUX_NEGATIFS:
+            return
+        self.stats['negatifs'] += 1
+        self.sante *= config.SANTE_PENALITE
+        if not self.cookies_restaures or self._cookies_valides:
+            return
+        if resultat not in ('captcha', 'rate_limited'):
+            return
+        logger.warning(f"🍪 [{self.nom}] Cookies restaurés rejetés ({resultat}) → suppression et warm-up complet")
+        self.reinitialiser_cookies()
+        await self.warm_up(force=True)
+    
+    async def warm_up(self, force: bool = False):
+        """Visite amazon.co.jp pour initialiser les cookies de session.
+        Ignoré si un jar valide a été restauré (sauf force=True)."""
+        if self._warmed_up and not force:
+            return
+        if self.cookies_restaures and not force:
+            logger.info(f"   🍪 [{self.nom}] Warm-up ignoré: session restaurée depuis le run précédent")
+            self._warmed_up = True
             return
         try:
-            logger.info("   🔥 Warm-up: visite amazon.co.jp pour recevoir les cookies...")
+            logger.info(f"   🔥 [{self.nom}] Warm-up: visite amazon.co.jp pour recevoir les cookies...")
+            await self.pacer.acquerir('warmup')
             if self._curl_cffi_session:
-                response = await self._curl_cffi_session.get("https://www.amazon.co.jp/", timeout=15, allow_redirects=True)
+                response = await self._curl_cffi_session.get(url_reseau(AMAZON_CANONIQUE + "/"), timeout=15, allow_redirects=True)
                 status = response.status_code
                 
                 # Forcer la langue japonaise via le cookie i18n-prefs
@@ -171,18 +454,154 @@ class SessionWrapper:
                 else:
                     logger.info(f"   ✅ Warm-up: HTTP {status}")
             elif self._aiohttp_session:
-                async with self._aiohttp_session.get("https://www.amazon.co.jp/", timeout=aiohttp.ClientTimeout(total=15)) as response:
+                async with self._aiohttp_session.get(url_reseau(AMAZON_CANONIQUE + "/"), timeout=aiohttp.ClientTimeout(total=15)) as response:
                     logger.info(f"   ✅ Warm-up: HTTP {response.status}")
             self._warmed_up = True
-            pause = random.uniform(2.0, 4.0)
-            logger.info(f"   ⏸️  Pause post-warm-up: {pause:.1f}s")
-            await asyncio.sleep(pause)
         except Exception as e:
             logger.warning(f"   ⚠️  Warm-up échoué: {str(e)[:80]}")
             logger.warning(f"   → On continue quand même (le scan fonctionnera, mais risque accru de 503)")
             self._warmed_up = True
 
 
+class SessionWrapper:
+    """Pool de sessions HTTP pour le scraping Amazon (curl_cffi, aiohttp en secours).
+    Porte le pacer (cadence de toutes les requêtes, partagée par le pool) et le
+    contrôleur adaptatif qui ajuste ce débit selon les réponses d'Amazon.
+    
+    Chaque requête part sur la session la plus saine ; une session dont la santé
+    passe sous SANTE_SEUIL_QUARANTAINE est mise à l'écart puis réchauffée en
+    tâche de fond (cookies neufs) avant de revenir dans le pool.
+    
+    record : dossier où archiver chaque réponse réseau (http_archive.HttpRecorder)
+    replay : dossier d'archive à rejouer sans réseau, sur une horloge virtuelle"""
+    def __init__(self, cache_mode: str = None, taille: int = None,
+                 record: str = None, replay: str = None):
+        self.horloge = HorlogeVirtuelle() if replay else None
+        horloge = self.horloge.maintenant if self.horloge else time.monotonic
+        self.dormir = self.horloge.dormir if self.horloge else asyncio.sleep
+        self.pacer = RequestPacer(horloge=horloge, dormir=self.dormir)
+        self.throttle = AdaptiveThrottle(self.pacer, horloge=horloge)
+        self.enregistreur = HttpRecorder(record) if record else None
+        self.rejeu = HttpReplayer(replay, self.horloge) if replay else None
+        if record or replay:
+            cache_mode = 'off'  # l'archive doit couvrir toutes les requêtes du run
+        cache_mode = cache_mode or config.CACHE_HTTP_MODE
+        self.cache = ResponseCache(cache_mode) if cache_mode != 'off' else None
+        self.dedup = SingleFlight(horloge=horloge)
+        taille = max(1, taille or config.HTTP_POOL_TAILLE)
+        profils = config.HTTP_POOL_PROFILS
+        self.sessions = [SessionHttp(i, profils[i % len(profils)], self.pacer) for i in range(taille)]
+        self._origines = OrderedDict()  # URL normalisée -> session qui l'a servie
+        self._taches = set()
+    
+    async def __aenter__(self):
+        EXECUTEUR.demarrer()  # avant les threads des sessions HTTP (fork des workers)
+        if self.rejeu:
+            logger.info(f"🎞️  Mode rejeu: {self.rejeu.nb} réponse(s) depuis {self.rejeu.dossier} "
+                        f"(aucun accès réseau, horloge virtuelle)")
+            return self
+        for http in self.sessions:
+            await http.ouvrir()
+        if self.enregistreur:
+            logger.info(f"🎞️  Enregistrement des réponses HTTP dans {self.enregistreur.dossier}")
+        if config.CURL_CFFI_DISPONIBLE:
+            profils = ', '.join(http.profil for http in self.sessions)
+            logger.info(f"🌐 Session HTTP: curl_cffi × {len(self.sessions)} (impersonate={profils}, TLS+HTTP/2 fingerprint)")
+            logger.info("   📋 Headers: Accept-Language: ja-JP (force pages japonaises)")
+        else:
+            logger.warning(f"🌐 Session HTTP: aiohttp × {len(self.sessions)} (⚠️ PAS de TLS impersonation)")
+            logger.warning("   ⚠️  curl_cffi non disponible - installer avec: pip install curl-cffi")
+        return self
+    
+    async def __aexit__(self, *args):
+        for tache in list(self._taches):
+            tache.cancel()
+        if not self.rejeu:
+            for http in self.sessions:
+                await http.fermer(*args)
+        if self.enregistreur:
+            self.enregistreur.fermer()
+        if self.rejeu:
+            self.rejeu.log_resume()
+        self.dedup.log_resume()
+        EXECUTEUR.log_resume()
+        EXECUTEUR.fermer()
+        if self.cache:
+            self.cache.log_resume()
+            self.cache.fermer()
+    
+    # Compatibilité : session principale du pool
+    @property
+    def _curl_cffi_session(self):
+        return self.sessions[0]._curl_cffi_session
+    
+    @property
+    def _aiohttp_session(self):
+        return self.sessions[0]._aiohttp_session
+    
+    @property
+    def cookies_restaures(self) -> bool:
+        """True si toutes les sessions du pool ont repris le jar du run précédent."""
+        return all(http.cookies_restaures for http in self.sessions)
+    
+    async def warm_up(self, force: bool = False):
+        """Warm-up de chaque session du pool (ignoré pour les jars restaurés et en rejeu)."""
+        if self.rejeu:
+            return
+        for http in self.sessions:
+            await http.warm_up(force=force)
+    
+    def choisir_session(self, url: str = None) -> SessionHttp:
+        """Session la plus saine hors quarantaine (la moins chargée à santé égale).
+        Si tout le pool est en quarantaine, on prend quand même la meilleure."""
+        disponibles = [h for h in self.sessions if not h.en_quarantaine] or self.sessions
+        http = max(disponibles, key=lambda h: (h.sante, -h.en_cours, -h.index))
+        if url:
+            cle = normaliser_url(url)
+            self._origines[cle] = http
+            self._origines.move_to_end(cle)
+            while len(self._origines) > config.MEMO_HTTP_MAX:
+                self._origines.popitem(last=False)
+        return http
+    
+    def session_origine(self, url: str) -> Optional[SessionHttp]:
+        """Session qui a servi cette URL en dernier (pour les blocages détectés après coup)."""
+        return self._origines.get(normaliser_url(url))
+    
+    async def signaler_session(self, http: SessionHttp, resultat: str):
+        """Transmet un résultat à une session et la met en quarantaine si sa santé s'effondre."""
+        await http.signaler(resultat)
+        if http.en_quarantaine or http.sante >= config.SANTE_SEUIL_QUARANTAINE:
+            return
+        http.en_quarantaine = True
+        http.stats['quarantaines'] += 1
+        logger.warning(f"🩺 Session {http.nom} en quarantaine (santé {http.sante:.2f}) → "
+                       f"réchauffage dans {config.SANTE_QUARANTAINE}s")
+        tache = asyncio.create_task(self._rechauffer(http))
+        self._taches.add(tache)
+        tache.add_done_callback(self._taches.discard)
+    
+    async def _rechauffer(self, http: SessionHttp):
+        await self.dormir(config.SANTE_QUARANTAINE)
+        if self.rejeu:
+            http.sante = config.SANTE_REPRISE
+            http.en_quarantaine = False
+            return
+        http.reinitialiser_cookies()
+        await http.warm_up(force=True)
+        http.sante = config.SANTE_REPRISE
+        http.en_quarantaine = False
+        logger.info(f"🩺 Session {http.nom} réchauffée, remise en service (santé {http.sante:.2f})")
+    
+    def log_sante(self):
+        """Affiche la santé et les réponses de chaque session du pool."""
+        for http in self.sessions:
+            st = http.stats
+            etat = " (quarantaine)" if http.en_quarantaine else ""
+            logger.info(f"🩺 Session {http.nom}: santé {http.sante:.2f}{etat} | {st['ok']} ok, "
+                        f"{st['negatifs']} négatif(s), {st['quarantaines']} quarantaine(s)")
+
+
 async def extraire_version_papier(html: str, format_cible: str = None, debug: bool = False) -> Optional[str]:
     """Extrait le lien vers la version papier depuis une page Kindle
     
@@ -196,117 +615,7 @@ async def extraire_version_papier(html: str, format_cible: str = None, debug: bo
     """
     if not html:
         return None
-    
-    soup = BeautifulSoup(html, 'lxml')
-    
-    # Définir les keywords selon le format cible
-    if format_cible == "ln":
-        # Light Novel : chercher Bunko
-        papier_keywords = ['文庫', 'Bunko']
-    elif format_cible == "all":
-        # Tous les formats papier
-        papier_keywords = ['コミック', 'Comic', '文庫', 'Bunko', '単行本', 'Tankobon', 'ペーパーバック', 'Paperback']
-    else:
-        # Par défaut : Manga uniquement
-        papier_keywords = ['コミック', 'Comic']
-    
-    kindle_keywords = ['kindle', 'Kindle', 'デジタル', '電子']
-    
-    # Pattern pour extraire un ASIN depuis différents formats d'URL Amazon
-    asin_patterns = [
-        r'/dp/([A-Z0-9]{10})',           # /dp/ASIN (classique)
-        r'/gp/product/([A-Z0-9]{10})',   # /gp/product/ASIN (ancien format)
-        r'/product/([A-Z0-9]{10})',      # /product/ASIN
-    ]
-    
-    def extraire_asin_from_href(href: str) -> Optional[str]:
-        """Extrait un ASIN depuis un href avec plusieurs patterns"""
-        for pattern in asin_patterns:
-            match = re.search(pattern, href)
-            if match:
-                return match.group(1)
-        return None
-    
-    def extraire_asin_from_element(element) -> Optional[str]:
-        """Extrait un ASIN depuis un élément HTML (href, data-asin, data-value)"""
-        # 1. Chercher dans le href
-        href = element.get('href', '')
-        asin = extraire_asin_from_href(href)
-        if asin:
-            return asin
-        
-        # 2. Chercher dans les attributs data-* de l'élément lui-même
-        for attr in ['data-asin', 'data-value', 'data-dp-url']:
-            val = element.get(attr, '')
-            if val:
-                asin = extraire_asin_from_href(val)
-                if asin:
-                    return asin
-                # data-asin peut contenir directement l'ASIN sans URL
-                if re.match(r'^[A-Z0-9]{10}$', val):
-                    return val
-        
-        # 3. Chercher dans les attributs data-* du parent (li, span, div)
-        parent = element.parent
-        if parent:
-            for attr in ['data-asin', 'data-value', 'data-dp-url']:
-                val = parent.get(attr, '')
-                if val:
-                    asin = extraire_asin_from_href(val)
-                    if asin:
-                        return asin
-                    if re.match(r'^[A-Z0-9]{10}$', val):
-                        return val
-        
-        return None
-    
-    # Chercher dans la section des formats (tmmSwatches ou MediaMatrix)
-    formats_section = soup.find("div", {"id": "tmmSwatches"}) or soup.find("div", {"id": "MediaMatrix"})
-    
-    if debug:
-        logger.info(f"      [DEBUG] formats_section trouvée: {formats_section is not None}")
-    
-    if formats_section:
-        for link in formats_section.find_all("a"):
-            text = link.get_text().strip()
-            href = link.get('href', '')
-            
-            is_papier = any(kw in text for kw in papier_keywords)
-            is_kindle = any(kw in text for kw in kindle_keywords)
-            
-            if debug:
-                logger.info(f"      [DEBUG] Link: '{text[:30]}' papier={is_papier} kindle={is_kindle} href={href[:50]}")
-            
-            if is_papier and not is_kindle:
-                asin_papier = extraire_asin_from_element(link)
-                if asin_papier:
-                    if debug:
-                        logger.info(f"      [DEBUG] ASIN extrait: {asin_papier}")
-                    return f"https://www.amazon.co.jp/dp/{asin_papier}"
-    
-    # Alternative: chercher les swatches individuels
-    swatches = soup.find_all("li", class_=lambda x: x and 'swatchElement' in x)
-    
-    if debug:
-        logger.info(f"      [DEBUG] Swatches trouvés: {len(swatches)}")
-    
-    for swatch in swatches:
-        text = swatch.get_text().strip()
-        link = swatch.find("a", href=True)
-        
-        if link:
-            is_papier = any(kw in text for kw in papier_keywords)
-            is_kindle = any(kw in text for kw in kindle_keywords)
-            
-            if is_papier and not is_kindle:
-                asin_papier = extraire_asin_from_element(link)
-                # Aussi chercher dans le swatch (li) directement
-                if not asin_papier:
-                    asin_papier = extraire_asin_from_element(swatch)
-                if asin_papier:
-                    return f"https://www.amazon.co.jp/dp/{asin_papier}"
-    
-    return None
+    return await EXECUTEUR.version_papier(html, format_cible, debug)
 
 
 async def extraire_volumes_depuis_page(session: aiohttp.ClientSession, url_ou_asin: str, nom_manga: str, 
@@ -356,175 +665,7 @@ async def extraire_volumes_depuis_page(session: aiohttp.ClientSession, url_ou_as
             f.write(html)
         logger.info(f"      🔍 HTML sauvegardé: debug_page_{asin}.html")
     
-    soup = BeautifulSoup(html, 'lxml')
-    asins_trouves = set()
-    asins_trouves.add(asin)  # Ajouter l'ASIN source pour ne pas le re-traiter
-    
-    # ========================================
-    # SECTION 1: Bulk purchases (新品まとめ買い)
-    # Le plus fiable - contient uniquement les volumes de la série
-    # ========================================
-    if "bulk" in sources:
-        bulk_asins = []
-        bulk_tomes = {}  # {asin: tome_num} — mapping tome depuis le label Bulk
-        
-        # Méthode 1: pbnx-desktop-box avec titre du manga
-        bulk_boxes = soup.find_all("div", class_="pbnx-desktop-box")
-        for box in bulk_boxes:
-            titre_span = box.find("span", class_="a-size-base")
-            if titre_span:
-                titre_texte = titre_span.get_text(strip=True)
-                nom_clean = strip_type_suffix(nom_manga); titre_cle = nom_clean[:8] if len(nom_clean) >= 8 else nom_clean
-                if normaliser_titre(titre_cle) in normaliser_titre(titre_texte):
-                    # Extraire chaque item du Bulk avec son label de tome
-                    items = box.find_all("div", class_="pbnx-single-product")
-                    if not items:
-                        items = box.find_all("li")
-                    for item in items:
-                        link = item.find("a", href=True)
-                        if not link:
-                            continue
-                        match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                        if match and match.group(1) not in asins_trouves:
-                            vol_asin = match.group(1)
-                            bulk_asins.append(vol_asin)
-                            asins_trouves.add(vol_asin)
-                            # Extraire le label de tome (ex: "1巻", "Vol. 1")
-                            label = item.get_text()
-                            tome_match = re.search(r'(?:Vol\.?\s*|第?\s*)(\d+(?:[.,]\d+)?)\s*巻?|(\d+(?:[.,]\d+)?)\s*巻', label)
-                            if tome_match:
-                                raw = tome_match.group(1) or tome_match.group(2)
-                                v = float(raw.replace(',', '.'))
-                                bulk_tomes[vol_asin] = int(v) if v == int(v) else v
-                    # Fallback : si items non trouvés, extraire les liens bruts (ancien code)
-                    if not bulk_asins:
-                        for link in box.find_all("a", href=True):
-                            match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                            if match and match.group(1) not in asins_trouves:
-                                bulk_asins.append(match.group(1))
-                                asins_trouves.add(match.group(1))
-                    break
-        
-        # Méthode 2: Header "Bulk purchases" ou "新品まとめ買い"
-        if not bulk_asins:
-            bulk_header = soup.find(lambda tag: tag.name in ['h2', 'h3', 'div', 'span'] and
-                                    ('Bulk purchases' in tag.get_text() or '新品まとめ買い' in tag.get_text()))
-            if bulk_header:
-                parent = bulk_header.find_parent('div', class_=lambda x: x and 'a-section' in x) or bulk_header.find_parent('div')
-                # Si ce parent ne contient pas de liens produits, essayer l'ancêtre supérieur
-                # (cas où header et items sont dans des branches DOM séparées)
-                if parent and not any(
-                    re.search(r'/dp/[A-Z0-9]{10}', a.get('href', ''))
-                    for a in parent.find_all("a", href=True)
-                ):
-                    parent = parent.find_parent('div') or parent
-                if parent:
-                    # Essayer d'extraire avec labels de tome
-                    items = parent.find_all("div", class_="pbnx-single-product")
-                    if not items:
-                        items = parent.find_all("li")
-                    for item in items:
-                        link = item.find("a", href=True)
-                        if link:
-                            match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                            if match and match.group(1) not in asins_trouves:
-                                vol_asin = match.group(1)
-                                bulk_asins.append(vol_asin)
-                                asins_trouves.add(vol_asin)
-                                label = item.get_text()
-                                tome_match = re.search(r'(?:Vol\.?\s*|第?\s*)(\d+(?:[.,]\d+)?)\s*巻?|(\d+(?:[.,]\d+)?)\s*巻', label)
-                                if tome_match:
-                                    raw = tome_match.group(1) or tome_match.group(2)
-                                    v = float(raw.replace(',', '.'))
-                                    bulk_tomes[vol_asin] = int(v) if v == int(v) else v
-                    # Fallback liens bruts
-                    if not bulk_asins:
-                        for link in parent.find_all("a", href=True):
-                            match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                            if match and match.group(1) not in asins_trouves:
-                                bulk_asins.append(match.group(1))
-                                asins_trouves.add(match.group(1))
-        
-        if bulk_asins:
-            if bulk_tomes:
-                logger.info(f"      📦 Bulk: {len(bulk_asins)} volume(s) trouvé(s) ({len(bulk_tomes)} tome(s) identifié(s))")
-            else:
-                logger.info(f"      📦 Bulk: {len(bulk_asins)} volume(s) trouvé(s)")
-        
-        result["bulk"] = bulk_asins
-        result["bulk_tomes"] = bulk_tomes
-    
-    # Si le Bulk a trouvé des résultats, pas besoin de Publisher (source moins précise)
-    # Mais on continue si FBT est demandé (source complémentaire utile)
-    if result["bulk"] and "frequently_bought" not in sources:
-        return result
-    
-    # ========================================
-    # SECTION 2: From the Publisher / 出版社より
-    # Fallback si Bulk absent — même éditeur
-    # ========================================
-    if "publisher" in sources and not result["bulk"]:
-        publisher_asins = []
-        
-        # Chercher la section "From the Publisher" ou "出版社より"
-        publisher_header = soup.find(lambda tag: tag.name in ['h2', 'h3', 'div', 'span'] and 
-                                      ('From the Publisher' in tag.get_text() or 
-                                       '出版社より' in tag.get_text() or
-                                       'Products related' in tag.get_text()))
-        
-        if publisher_header:
-            parent = publisher_header.find_parent('div', class_='a-section') or publisher_header.find_parent('div')
-            if parent:
-                for link in parent.find_all("a", href=True):
-                    match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                    if match and match.group(1) not in asins_trouves:
-                        publisher_asins.append(match.group(1))
-                        asins_trouves.add(match.group(1))
-        
-        if publisher_asins:
-            logger.info(f"      🏢 From Publisher: {len(publisher_asins)} volume(s) trouvé(s)")
-        
-        result["publisher"] = publisher_asins
-    
-    # ========================================
-    # SECTION 3: Frequently bought together / よく一緒に購入されている商品
-    # Désactivé par défaut car retourne des hors-sujets
-    # Mais utile pour les nouvelles séries ajoutées manuellement
-    # ========================================
-    if "frequently_bought" in sources:
-        frequently_asins = []
-        
-        # Chercher la section "Frequently bought together" ou "よく一緒に購入されている商品"
-        fbt_header = soup.find(lambda tag: tag.name in ['h2', 'h3', 'div', 'span'] and 
-                                  ('Frequently bought together' in tag.get_text() or 
-                                   'よく一緒に購入されている商品' in tag.get_text()))
-        
-        if fbt_header:
-            # Remonter au conteneur parent
-            parent = fbt_header.find_parent('div', id='sims-fbt') or \
-                     fbt_header.find_parent('div', class_='a-section') or \
-                     fbt_header.find_parent('div')
-            if parent:
-                for link in parent.find_all("a", href=True):
-                    match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                    if match and match.group(1) not in asins_trouves:
-                        frequently_asins.append(match.group(1))
-                        asins_trouves.add(match.group(1))
-        
-        # Alternative: chercher par ID "sims-fbt"
-        if not frequently_asins:
-            fbt_section = soup.find('div', id='sims-fbt')
-            if fbt_section:
-                for link in fbt_section.find_all("a", href=True):
-                    match = re.search(r'/dp/([A-Z0-9]{10})', link.get('href', ''))
-                    if match and match.group(1) not in asins_trouves:
-                        frequently_asins.append(match.group(1))
-                        asins_trouves.add(match.group(1))
-        
-        if frequently_asins:
-            logger.info(f"      🛒 Frequently bought: {len(frequently_asins)} volume(s) trouvé(s)")
-        
-        result["frequently_bought"] = frequently_asins
+    result = await EXECUTEUR.volumes_lies(html, asin, nom_manga, sources)
     
     # Log total
     total = sum(len(v) for v in result.values())
@@ -553,160 +694,78 @@ def extraire_volumes_depuis_page_flat(result_dict: Dict[str, List[str]]) -> List
 
 
 async def extraire_infos_produit(html: str, debug: bool = False) -> Dict:
-    """Extrait les infos du produit"""
+    """Extrait les infos du produit (parsing hors boucle et partagé avec les autres extracteurs, voir analyse.py)"""
     if not html:
         return {}
-    
-    soup = BeautifulSoup(html, 'lxml')
-    infos = {}
-    
-    # DÉTECTION PAGE INVALIDE (captcha, rate limit, etc.)
-    # Si pas de titre ET pas de détails produit, c'est probablement une page invalide
-    titre = soup.find("span", {"id": "productTitle"})
-    titre_texte = titre.get_text(strip=True) if titre else ""
-    
-    if not titre_texte:
-        # Vérifier si c'est un captcha ou une page d'erreur
-        if 'captcha' in html.lower() or 'robot' in html.lower():
-            infos['_page_invalide'] = 'captcha'
-        elif 'To discuss automated access' in html:
-            infos['_page_invalide'] = 'rate_limit'
-        elif len(html) < 5000:  # Page trop courte = probablement erreur
-            infos['_page_invalide'] = 'page_courte'
-        else:
-            infos['_page_invalide'] = 'titre_non_trouve'
-    
-    infos['titre'] = titre_texte  # Sauvegarder le titre pour debug
-    
-    # DEBUG: Afficher le titre brut si demandé
-    if debug and titre_texte:
-        logger.info(f"      [DEBUG] Titre brut: '{titre_texte}'")
-    
-    # Détecter si c'est un lot/set
-    if '巻セット' in titre_texte or ('セット' in titre_texte and ('1-' in titre_texte or '全巻' in titre_texte)):
-        infos['est_lot'] = True
-        # Essayer d'extraire la plage (ex: "1-3巻" ou "全5巻")
-        match_plage = re.search(r'(\d+)-(\d+)巻', titre_texte)
-        if match_plage:
-            infos['lot_debut'] = int(match_plage.group(1))
-            infos['lot_fin'] = int(match_plage.group(2))
-        elif '全' in titre_texte:
-            match_total = re.search(r'全(\d+)巻', titre_texte)
-            if match_total:
-                infos['lot_total'] = int(match_total.group(1))
-    else:
-        infos['est_lot'] = False
-    
-    # Date et Éditeur
-    # Note : Amazon peut servir la page en japonais (発売日/出版社) ou en anglais
-    # (Publication date/Publisher) selon les cookies de session. On cherche les deux.
-    details = soup.find("div", {"id": "detailBulletsWrapper_feature_div"})
-    if details:
-        for li in details.find_all("li"):
-            text = li.get_text()
-            if "発売日" in text or "Publication date" in text:
-                date_texte = text.split(":")[-1].strip()
-                # Nettoyer les caractères Unicode invisibles (U+200E, U+200F, etc.)
-                date_texte = re.sub(r'[\u200e\u200f\u200b\u202a\u202b\u202c\xa0]', '', date_texte).strip()
-                infos['date'] = date_texte
-            elif "出版社" in text or "Publisher" in text:
-                editeur_texte = text.split(":")[-1].strip()
-                # Nettoyer les caractères Unicode invisibles
-                editeur_texte = re.sub(r'[\u200e\u200f\u200b\u202a\u202b\u202c\xa0]', '', editeur_texte).strip()
-                # Nettoyer l'éditeur (enlever la date entre parenthèses)
-                editeur_brut = re.split(r'\s*\(', editeur_texte)[0].strip()
-                # Convertir en romaji
-                infos['editeur'] = convertir_editeur_romaji(editeur_brut)
-                if debug:
-                    logger.info(f"      [DEBUG] Éditeur trouvé: {editeur_brut} → {infos['editeur']}")
-    
-    # Tome — appel à la fonction unique de parsing (utils.py)
-    # Seulement si ce n'est pas un lot
-    if not infos.get('est_lot') and titre:
-        tome = extraire_numero_tome(titre_texte)
-        if tome is not None:
-            infos['tome'] = tome
-            if debug:
-                logger.info(f"      [DEBUG] Tome trouvé: {tome}")
-        elif debug:
-            logger.warning(f"      [DEBUG] ⚠️  AUCUN TOME trouvé dans: '{titre_texte}'")
-    
-    # Couverture
-    image = soup.find("img", {"id": "landingImage"})
-    if image and image.get('src'):
-        infos['couverture_url'] = image['src']
-    
-    # FORMAT DU LIVRE (単行本, 文庫, ペーパーバック, Kindle版, etc.)
-    # Méthode 1: Chercher dans le sélecteur de format (tmmSwatches)
-    format_section = soup.find("div", {"id": "tmmSwatches"})
-    if format_section:
-        selected = format_section.find("span", class_="a-button-selected") or format_section.find("li", class_="selected")
-        if selected:
-            format_text = selected.get_text(strip=True)
-            infos['format'] = format_text
-            if debug:
-                logger.info(f"      [DEBUG] Format trouvé (tmmSwatches): {format_text}")
-    
-    # Méthode 2: Chercher dans les détails du produit
-    if 'format' not in infos or not infos['format']:
-        detail_bullets = soup.find("div", {"id": "detailBullets_feature_div"})
-        if detail_bullets:
-            for li in detail_bullets.find_all("li"):
-                text = li.get_text()
-                # Chercher les mots-clés de format
-                if any(f in text for f in ['単行本', '文庫', 'ペーパーバック', 'コミック', 'Paperback', 'Tankobon']):
-                    infos['format'] = text.strip()[:50]
-                    if debug:
-                        logger.info(f"      [DEBUG] Format trouvé (détails): {infos['format']}")
-                    break
-    
-    # Méthode 3: Chercher dans le titre lui-même (souvent entre parenthèses)
-    if 'format' not in infos or not infos['format']:
-        # Patterns courants: (角川スニーカー文庫), (富士見L文庫), (コミックス), etc.
-        if '文庫' in titre_texte:
-            infos['format'] = '文庫'
-            if debug:
-                logger.info(f"      [DEBUG] Format trouvé (titre): 文庫")
-        elif 'コミック' in titre_texte:
-            infos['format'] = 'コミック'
-            if debug:
-                logger.info(f"      [DEBUG] Format trouvé (titre): コミック")
-    
-    # Méthode 4: Chercher le breadcrumb ou la catégorie
-    if 'format' not in infos or not infos['format']:
-        breadcrumb = soup.find("div", {"id": "wayfinding-breadcrumbs_feature_div"})
-        if breadcrumb:
-            bc_text = breadcrumb.get_text()
-            if '文庫' in bc_text:
-                infos['format'] = '文庫'
-            elif 'コミック' in bc_text or 'マンガ' in bc_text:
-                infos['format'] = 'コミック'
-            elif '単行本' in bc_text:
-                infos['format'] = '単行本'
-    
-    return infos
+    return await EXECUTEUR.infos_produit(html, debug)
+
+
+class FicheProduit(NamedTuple):
+    """Page produit analysée (sortie de l'étage d'analyse de la Phase B)."""
+    html: Optional[str]
+    infos: Optional[Dict]
+
+
+FICHE_ABSENTE = FicheProduit(None, None)
+
+
+class PrechargementProduits:
+    """
+    Pages produit de la Phase B : découverte → récupération → analyse (etages.py),
+    lues dans l'ordre par le classement du pipeline.
+
+    Au plus `fenetre` pages sont en cours ou prêtes avant le consommateur, et les
+    requêtes passent toujours par le pacer partagé. Dès la première page invalide
+    (captcha), restreindre() coupe la lecture en avance : la pause du disjoncteur
+    arrête alors vraiment le trafic de la série. obtenir(asin)
+    rend une FicheProduit, (None, None) si la page n'a pas pu être récupérée.
+    sans_cache : pages re-lues sur Amazon même si le cache disque en a une copie.
+    """
+    def __init__(self, session, urls: Dict[str, str], fenetre: int = None, fetchers: int = None,
+                 sans_cache: bool = False):
+        self.session = session
+        self.sans_cache = sans_cache
+        self.urls = urls
+        self.chaine = ChaineEtages('Phase B', [
+            Etage('récupération', self._recuperer, workers=fetchers or config.VERIFICATION_FETCHERS),
+            Etage('analyse', self._analyser, workers=config.ANALYSE_WORKERS),
+        ], fenetre).demarrer(urls.items())
+
+    async def _recuperer(self, url: str) -> Optional[str]:
+        # Lecture progressive : seules les sections lues par extraire_infos_produit sont nécessaires
+        return await get_html(self.session, url, sentinelles=config.SENTINELLES_PRODUIT,
+                              sans_cache=self.sans_cache)
+
+    async def _analyser(self, html: Optional[str]) -> FicheProduit:
+        if not html:
+            return FICHE_ABSENTE
+        return FicheProduit(html, await extraire_infos_produit(html, debug=False))
+
+    async def obtenir(self, asin: str) -> FicheProduit:
+        return await self.chaine.obtenir(asin) or FICHE_ABSENTE
+
+    def restreindre(self):
+        """
+        Page invalide vue par le classement : plus de pages lues en avance, les
+        suivantes sont récupérées une à une à la demande. Les pages déjà lues mais
+        pas encore classées sont re-lues à la demande (depuis le mémo si valides,
+        sur Amazon si c'était déjà un captcha).
+        """
+        for asin, fiche in self.chaine.restreindre().items():
+            if fiche and fiche.infos and fiche.infos.get('_page_invalide'):
+                invalider_page(self.session, self.urls[asin])
+
+    def fermer(self):
+        """Arrête les étages (sortie anticipée du consommateur) et cumule leurs métriques."""
+        self.chaine.fermer()
 
 
 def extraire_item_amazon(item):
-    """Extrait titre, lien, URL et ASIN d'un élément résultat Amazon.
-    Retourne (titre_txt, url_complete, asin) ou (None, None, None) si invalide."""
-    titre_elem = item.select_one('.a-text-normal') or item.select_one('h2 a span')
-    if not titre_elem:
-        return None, None, None
-    
-    lien_elem = item.select_one('.a-link-normal') or item.select_one('h2 a')
-    if not lien_elem or not lien_elem.get('href'):
-        return None, None, None
-    
-    url_complete = f"https://www.amazon.co.jp{lien_elem['href']}"
-    titre_txt = titre_elem.get_text()
-    asin = extraire_asin(url_complete)
-    
-    # Aussi essayer data-asin du parent
-    if (not asin or asin == '?') and item.get('data-asin'):
-        asin = item['data-asin']
-    
-    return titre_txt, url_complete, asin
+    """Extrait titre, lien, URL et ASIN d'un élément résultat Amazon (Tag bs4 ou élément lxml).
+    Retourne (titre_txt, url_complete, asin) ou (None, None, None) si invalide.
+    Le pipeline lit directement les SearchResult de pages.page_recherche()."""
+    resultat = SearchResult.depuis_item(item)
+    return resultat.titre, resultat.url, resultat.asin
 
 
 def extraire_infos_featured(item, titre_txt: str) -> Dict:
@@ -715,47 +774,4 @@ def extraire_infos_featured(item, titre_txt: str) -> Dict:
     Retourne un dict avec les infos disponibles (titre, date, editeur, tome, format).
     Ces infos permettent de remplir le cache SANS fetcher la page /dp/.
     """
-    infos = {'titre': titre_txt}
-    
-    # Extraire le numéro de tome depuis le titre
-    tome = extraire_numero_tome(titre_txt)
-    if tome is not None:
-        infos['tome'] = tome
-    
-    # Extraire l'éditeur depuis le titre (entre parenthèses japonaises ou normales)
-    editeur_titre = extraire_editeur(titre_txt)
-    if editeur_titre:
-        infos['editeur'] = convertir_editeur_romaji(editeur_titre)
-    
-    # Extraire la date de publication depuis les spans sous le titre
-    # Pattern Amazon JP : "コミック – 2026/1/23" ou "文庫 – 2024/8/30"
-    for span in item.select('span.a-text-normal, span.a-size-base, span.a-color-secondary'):
-        text = span.get_text(strip=True)
-        # Chercher un pattern date YYYY/M/D ou YYYY/MM/DD
-        date_match = re.search(r'(\d{4}/\d{1,2}/\d{1,2})', text)
-        if date_match:
-            infos['date'] = date_match.group(1)
-            # Le format est souvent juste avant la date : "コミック – 2026/1/23"
-            format_match = re.search(r'(コミック|文庫|単行本|新書|大型本|ムック)', text)
-            if format_match:
-                infos['format'] = format_match.group(1)
-            break
-    
-    # Aussi chercher la date dans les sous-divs (parfois dans une structure différente)
-    if 'date' not in infos:
-        for div in item.select('.a-row'):
-            div_text = div.get_text(strip=True)
-            date_match = re.search(r'(\d{4}/\d{1,2}/\d{1,2})', div_text)
-            if date_match:
-                infos['date'] = date_match.group(1)
-                break
-    
-    # Normaliser la date au format YYYY/MM/DD
-    if 'date' in infos:
-        parts = infos['date'].split('/')
-        if len(parts) == 3:
-            infos['date'] = f"{parts[0]}/{int(parts[1]):02d}/{int(parts[2]):02d}"
-    
-    return infos
-
-
+    return infos_resultat(titre_txt, *date_format_item(item))
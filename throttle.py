@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MangaVega Tracker - Cadence des requêtes HTTP (token buckets)
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict
+
+import config
+
+logger = config.logger
+
+
+def classe_requete(url: str) -> str:
+    """Détermine la classe de cadence d'une URL Amazon : recherche, produit ou autre."""
+    if '/s?' in url or '/s/' in url:
+        return 'recherche'
+    if '/dp/' in url:
+        return 'produit'
+    return 'autre'
+
+
+class TokenBucket:
+    """
+    Seau à jetons avec réservation : chaque requête consomme un jeton,
+    quitte à rendre le solde négatif. Le délai renvoyé est le temps
+    nécessaire pour rembourser la dette au débit nominal.
+    """
+    def __init__(self, rpm: float, rafale: float = 1, horloge=time.monotonic):
+        self._horloge = horloge
+        self.rpm = float(rpm)
+        self.capacite = max(1.0, float(rafale))
+        self.jetons = self.capacite
+        self._derniere_maj = horloge()
+
+    @property
+    def debit(self) -> float:
+        """Débit en jetons par seconde."""
+        return self.rpm / 60.0
+
+    def _remplir(self):
+        maintenant = self._horloge()
+        ecoule = maintenant - self._derniere_maj
+        self._derniere_maj = maintenant
+        if ecoule > 0:
+            self.jetons = min(self.capacite, self.jetons + ecoule * self.debit)
+
+    def reserver(self) -> float:
+        """Consomme un jeton et retourne le délai (s) avant de pouvoir l'utiliser."""
+        self._remplir()
+        self.jetons -= 1
+        if self.jetons >= 0:
+            return 0.0
+        return -self.jetons / self.debit
+
+
+class RequestPacer:
+    """
+    Point unique de cadence HTTP : un seau global (budget requêtes/minute du scan)
+    et un seau par classe de requête (recherche, produit, warmup, autre).
+    Une requête attend que les deux seaux l'autorisent.
+    """
+    def __init__(self, rpm_global: float = None, classes: Dict[str, Dict] = None,
+                 jitter: float = None, horloge=time.monotonic, dormir=asyncio.sleep):
+        rpm_global = config.PACER_RPM_GLOBAL if rpm_global is None else rpm_global
+        classes = config.PACER_CLASSES if classes is None else classes
+        self.jitter = config.PACER_JITTER if jitter is None else jitter
+        self._dormir = dormir
+        self.global_bucket = TokenBucket(rpm_global, rafale=1, horloge=horloge)
+        self.buckets = {
+            nom: TokenBucket(params['rpm'], rafale=params.get('rafale', 1), horloge=horloge)
+            for nom, params in classes.items()
+        }
+        self.stats = {nom: {'requetes': 0, 'attente': 0.0} for nom in self.buckets}
+        self._rpm_nominaux = {nom: b.rpm for nom, b in self.buckets.items()}
+        self._rpm_global_nominal = self.global_bucket.rpm
+        self.facteur = 1.0
+
+    def set_facteur(self, facteur: float):
+        """Applique un multiplicateur de débit à tous les seaux (piloté par AdaptiveThrottle)."""
+        self.facteur = facteur
+        for nom, bucket in self.buckets.items():
+            bucket._remplir()  # solder les jetons acquis à l'ancien débit
+            bucket.rpm = self._rpm_nominaux[nom] * facteur
+        self.global_bucket._remplir()
+        self.global_bucket.rpm = self._rpm_global_nominal * facteur
+
+    def _bucket(self, classe: str) -> TokenBucket:
+        return self.buckets.get(classe) or self.buckets['autre']
+
+    async def acquerir(self, classe: str = 'autre'):
+        """Attend le créneau de la prochaine requête de cette classe."""
+        if classe not in self.buckets:
+            classe = 'autre'
+        bucket = self._bucket(classe)
+        # Réservation atomique (pas d'await entre les deux seaux)
+        attente = max(bucket.reserver(), self.global_bucket.reserver())
+        if attente > 0 and self.jitter:
+            attente += random.uniform(0, self.jitter) / bucket.debit
+        self.stats[classe]['requetes'] += 1
+        self.stats[classe]['attente'] += attente
+        if attente > 0:
+            await self._dormir(attente)
+
+    def log_resume(self):
+        """Affiche le nombre de requêtes et le temps d'attente par classe."""
+        total_req = sum(s['requetes'] for s in self.stats.values())
+        if not total_req:
+            return
+        total_attente = sum(s['attente'] for s in self.stats.values())
+        logger.info(f"⏱️  Cadence HTTP: {total_req} requête(s), {total_attente:.0f}s d'attente "
+                    f"(budget {self.global_bucket.rpm:.0f} req/min)")
+        for nom, s in self.stats.items():
+            if s['requetes']:
+                logger.info(f"   {nom:<10} {s['requetes']:>4} req | attente {s['attente']:.0f}s "
+                            f"| {self._bucket(nom).rpm:.0f} req/min")
+
+
+class AdaptiveThrottle:
+    """
+    Contrôleur AIMD (additive increase / multiplicative decrease) du débit global.
+    
+    Alimenté par get_html avec le résultat de chaque réponse :
+    - 'ok' : après N réponses propres consécutives, le débit augmente d'un pas
+    - 'rate_limited' (503), 'captcha', 'short' : le débit est divisé (×AIMD_REDUCTION)
+    Une période réfractaire évite de diviser plusieurs fois pour une même rafale de 503.
+    Le débit est appliqué au RequestPacer via un facteur multiplicatif.
+    """
+    SIGNAUX_NEGATIFS = ('rate_limited', 'captcha', 'short')
+
+    def __init__(self, pacer: RequestPacer, horloge=time.monotonic):
+        self.pacer = pacer
+        self._horloge = horloge
+        self._debut = horloge()
+        self.facteur = config.AIMD_FACTEUR_INITIAL
+        self.facteur_min = config.AIMD_FACTEUR_MIN
+        self.facteur_max = config.AIMD_FACTEUR_MAX
+        self._ok_consecutifs = 0
+        self._derniere_reduction = None
+        self.compteurs = {'ok': 0, 'rate_limited': 0, 'captcha': 0, 'short': 0}
+        self.historique = []
+        self._appliquer('init')
+
+    @property
+    def rate_courant(self) -> float:
+        """Débit global effectif (requêtes/minute)."""
+        return self.pacer.global_bucket.rpm
+
+    def _appliquer(self, evenement: str):
+        self.pacer.set_facteur(self.facteur)
+        self.historique.append({
+            't': round(self._horloge() - self._debut, 1),
+            'evenement': evenement,
+            'facteur': round(self.facteur, 3),
+            'rpm': round(self.rate_courant, 1),
+        })
+
+    def signaler(self, resultat: str):
+        """Enregistre le résultat d'une réponse HTTP et ajuste le débit."""
+        self.compteurs[resultat] = self.compteurs.get(resultat, 0) + 1
+        if resultat == 'ok':
+            self._ok_consecutifs += 1
+            if self._ok_consecutifs >= config.AIMD_FENETRE_OK and self.facteur < self.facteur_max:
+                self._ok_consecutifs = 0
+                self.facteur = min(self.facteur_max, self.facteur + config.AIMD_PAS)
+                self._appliquer('hausse')
+            return
+        if resultat not in self.SIGNAUX_NEGATIFS:
+            return
+        self._ok_consecutifs = 0
+        maintenant = self._horloge()
+        if (self._derniere_reduction is not None
+                and maintenant - self._derniere_reduction < config.AIMD_REFRACTAIRE):
+            return
+        self._derniere_reduction = maintenant
+        ancien = self.rate_courant
+        self.facteur = max(self.facteur_min, self.facteur * config.AIMD_REDUCTION)
+        self._appliquer(resultat)
+        logger.warning(f"      🐢 Débit réduit ({resultat}): {ancien:.0f} → {self.rate_courant:.0f} req/min")
+
+    def log_resume(self):
+        """Affiche le débit courant, les extrêmes atteints et les réponses par type."""
+        rpms = [h['rpm'] for h in self.historique]
+        nb_reductions = sum(1 for h in self.historique if h['evenement'] in self.SIGNAUX_NEGATIFS)
+        compteurs = " | ".join(f"{v} {k}" for k, v in self.compteurs.items() if v)
+        logger.info(f"📈 Débit adaptatif: {self.rate_courant:.0f} req/min "
+                    f"(min {min(rpms):.0f}, max {max(rpms):.0f}, {nb_reductions} réduction(s))")
+        if compteurs:
+            logger.info(f"   Réponses: {compteurs}")
@@ -6,6 +6,8 @@ MangaVega Tracker - Fonctions utilitaires pures
 
 import re
 import unicodedata
+from collections import Counter
+from functools import lru_cache
 from typing import List, Dict, Optional, Set
 
 import config
@@ -50,6 +52,231 @@ def est_asin_hors_sujet_manuel(asin: str) -> bool:
 # NORMALISATION ÉDITEUR
 # ============================================================================
 
+# Index des éditeurs, construit une fois au chargement du module :
+# - _LABEL_VERS_PARENT : clé normalisée (minuscules, sans espaces ni ponctuation)
+#   d'un label/collection → éditeur parent
+# - _EDITEURS_ROMAJI : nom japonais (kana/kanji) d'un éditeur ou label → romaji
+_LABEL_VERS_PARENT = {
+    # === KODANSHA ===
+    'shonenmagazine': 'kodansha',
+    'shonenmagazinekc': 'kodansha',
+    'magazinekc': 'kodansha',
+    'kcdeluxe': 'kodansha',
+    'kc': 'kodansha',
+    'youngmagazine': 'kodansha',
+    'youngmagazinekc': 'kodansha',
+    'morning': 'kodansha',
+    'morningkc': 'kodansha',
+    'afternoon': 'kodansha',
+    'afternoonkc': 'kodansha',
+    'eveningkc': 'kodansha',
+    'kodansha': 'kodansha',
+    'kodanshacomics': 'kodansha',
+    'kcmanga': 'kodansha',
+    'sirius': 'kodansha',
+    'siriuskc': 'kodansha',
+    'rivierekc': 'kodansha',
+    'palcykc': 'kodansha',
+    'dayscomics': 'kodansha',
+    # === KADOKAWA ===
+    'kadokawa': 'kadokawa',
+    'kadokawacomics': 'kadokawa',
+    'kadokawacomicsace': 'kadokawa',
+    'kadokawasneakerbunko': 'kadokawa',
+    'dengeki': 'kadokawa',
+    'dengekicomics': 'kadokawa',
+    'dengekibunko': 'kadokawa',
+    'dengekidaioh': 'kadokawa',
+    'asciimediaworks': 'kadokawa',
+    'mediaworks': 'kadokawa',
+    'enterbrain': 'kadokawa',
+    'mfbunko': 'kadokawa',
+    'mfbunkoj': 'kadokawa',
+    'mfc': 'kadokawa',
+    'dragoncomicsage': 'kadokawa',
+    'dragoncomics': 'kadokawa',
+    'compace': 'kadokawa',
+    'comptiq': 'kadokawa',
+    'bcomicskadoboku': 'kadokawa',
+    'flos': 'kadokawa',
+    'floscomics': 'kadokawa',
+    # === SHUEISHA ===
+    'shueisha': 'shueisha',
+    'jumpcomics': 'shueisha',
+    'youngjump': 'shueisha',
+    'youngjumpcomics': 'shueisha',
+    'grandjump': 'shueisha',
+    'ultrajump': 'shueisha',
+    'margaretcomics': 'shueisha',
+    'ribon': 'shueisha',
+    'ribbon': 'shueisha',
+    'dashxbunko': 'shueisha',
+    # === SHOGAKUKAN ===
+    'shogakukan': 'shogakukan',
+    'sunday': 'shogakukan',
+    'sundaycomics': 'shogakukan',
+    'bigcomics': 'shogakukan',
+    'bigcomic': 'shogakukan',
+    'bigcomicsspirits': 'shogakukan',
+    'flowercomics': 'shogakukan',
+    'gangan': 'shogakukan',
+    'uracomics': 'shogakukan',
+    # === SQUARE ENIX ===
+    'squareenix': 'squareenix',
+    'gangancomics': 'squareenix',
+    'gangancomicsonline': 'squareenix',
+    'gangancomicsjoker': 'squareenix',
+    'gfantasy': 'squareenix',
+    'younggangan': 'squareenix',
+    'biggangancomics': 'squareenix',
+    # === HAKUSENSHA ===
+    'hakusensha': 'hakusensha',
+    'younganimal': 'hakusensha',
+    'younganimalcomics': 'hakusensha',
+    'hanatoname': 'hakusensha',
+    'hanatoamecomics': 'hakusensha',
+    'lala': 'hakusensha',
+    'melody': 'hakusensha',
+    'jets': 'hakusensha',
+    'jetscomics': 'hakusensha',
+    # === AKITA SHOTEN ===
+    'akitashoten': 'akitashoten',
+    'champion': 'akitashoten',
+    'championcomics': 'akitashoten',
+    'shonenchampion': 'akitashoten',
+    # === AUTRES ===
+    'ichijinsha': 'ichijinsha',
+    'gene': 'ichijinsha',
+    'rexcomics': 'ichijinsha',
+    'futabasha': 'futabasha',
+    'action': 'futabasha',
+    'actioncomics': 'futabasha',
+    'houbunsha': 'houbunsha',
+    'harta': 'kadokawa',    # Harta est un label Kadokawa (via Enterbrain)
+    'hartacomics': 'kadokawa',
+    'hue': 'kadokawa',
+    'bunch': 'coamix',
+    'bunchcomics': 'coamix',
+    'coamix': 'coamix',
+    'overlap': 'overlap',
+    'overlapbunko': 'overlap',
+    'hobbyjapan': 'hobbyjapan',
+    'hjbunko': 'hobbyjapan',
+    'sbcreative': 'sbcreative',
+    'gabunko': 'sbcreative',
+    'heroes': 'heroes',
+    'heroescomics': 'heroes',
+    'flexcomics': 'flexcomics',
+    'maggarden': 'maggarden',
+    'bladecomics': 'maggarden',
+    'leed': 'leed',
+    'ran': 'leed',
+    'northstarspictures': 'northstarspictures',
+    'shinchosha': 'shinchosha',
+    'bungeishunju': 'bungeishunju',
+    'kobunsha': 'kobunsha',
+    'gentosha': 'gentosha',
+    'shonengazosha': 'shonengazosha',
+    'pixiv': 'pixiv',
+}
+
+# Caractères retirés de la clé d'un éditeur (espaces, point médian, tirets)
+_TABLE_CLE_EDITEUR = str.maketrans('', '', ' \u3000・-−')
+
+# Longueurs des clés, de la plus longue à la plus courte, pour la recherche du
+# plus long préfixe connu ("dengekicomicsnext" → "dengekicomics" → kadokawa).
+# Les clés trop courtes (kc, mfc, ran, hue) ne valent qu'en correspondance exacte.
+_PREFIXE_EDITEUR_MIN = 4
+_LONGUEURS_LABELS = sorted({len(k) for k in _LABEL_VERS_PARENT if len(k) >= _PREFIXE_EDITEUR_MIN}, reverse=True)
+# Seuls des suffixes d'impression connus peuvent suivre ce préfixe ("kadokawav" reste "kadokawav")
+_SUFFIXES_LABEL = ('comics', 'comic', 'bunko', 'next', 'novels', 'books', 'ace', 'kc',
+                   'コミックス', 'コミック', '文庫', 'ノベルス', 'ブックス')
+_RE_SUFFIXES_LABEL = re.compile('(?:' + '|'.join(map(re.escape, _SUFFIXES_LABEL)) + ')+')
+
+_EDITEURS_ROMAJI = {
+    # Majeurs
+    'KADOKAWA': 'Kadokawa',
+    '角川書店': 'Kadokawa',
+    'カドカワ': 'Kadokawa',
+    '角川': 'Kadokawa',
+    '講談社': 'Kodansha',
+    '小学館': 'Shogakukan',
+    '集英社': 'Shueisha',
+    'スクウェア・エニックス': 'Square Enix',
+    'スクエニ': 'Square Enix',
+    '白泉社': 'Hakusensha',
+    '秋田書店': 'Akita Shoten',
+    '双葉社': 'Futabasha',
+    '芳文社': 'Houbunsha',
+    '一迅社': 'Ichijinsha',
+    'アスキー・メディアワークス': 'ASCII Media Works',
+    'メディアワークス': 'Media Works',
+    '電撃': 'Dengeki',
+    'マッグガーデン': 'Mag Garden',
+    'エンターブレイン': 'Enterbrain',
+    'ホビージャパン': 'Hobby Japan',
+    'オーバーラップ': 'Overlap',
+    'アース・スター': 'Earth Star',
+    'SBクリエイティブ': 'SB Creative',
+    'ソフトバンク': 'SoftBank',
+    '新潮社': 'Shinchosha',
+    '文藝春秋': 'Bungeishunju',
+    '光文社': 'Kobunsha',
+    '幻冬舎': 'Gentosha',
+    'リイド社': 'Leed',
+    '少年画報社': 'Shonen Gahosha',
+    'コアミックス': 'Coamix',
+    'ノース・スターズ・ピクチャーズ': 'North Stars Pictures',
+    # Labels/Collections
+    '角川コミックス': 'Kadokawa Comics',
+    '角川スニーカー文庫': 'Kadokawa Sneaker Bunko',
+    '電撃コミックス': 'Dengeki Comics',
+    '電撃文庫': 'Dengeki Bunko',
+    '少年マガジン': 'Shonen Magazine',
+    'マガジンKC': 'Magazine KC',
+    'ヤングマガジン': 'Young Magazine',
+    'ジャンプコミックス': 'Jump Comics',
+    'サンデー': 'Sunday',
+    'ガンガン': 'Gangan',
+    'ビッグコミックス': 'Big Comics',
+    'ビッグコミック': 'Big Comics',
+    'モーニング': 'Morning',
+    'アフタヌーン': 'Afternoon',
+    'ハルタ': 'Harta',
+    'ハルタコミックス': 'Harta Comics',
+    'MFC': 'MFC',
+    'MF文庫': 'MF Bunko',
+    'フレックスコミックス': 'Flex Comics',
+    'ヒーローズ': 'Heroes',
+    'バンチ': 'Bunch',
+    'BUNCH': 'Bunch',
+    'アクション': 'Action',
+    'ヤングアニマル': 'Young Animal',
+    'チャンピオン': 'Champion',
+    'ジーン': 'Gene',
+    'ピクシブ': 'Pixiv',
+    'フロース': 'Flos',
+    'ヒュー': 'Hue',
+    '乱': 'Ran',
+    'KC': 'KC',
+    'KCデラックス': 'KC Deluxe',
+}
+
+# Noms japonais du plus long au plus court (à longueur égale, ordre de la table) ;
+# l'alternative en lookahead donne, à chaque position, le plus long nom qui y commence
+_ROMAJI_PAR_LONGUEUR = sorted(_EDITEURS_ROMAJI, key=len, reverse=True)
+_RANG_ROMAJI = {jp: rang for rang, jp in enumerate(_ROMAJI_PAR_LONGUEUR)}
+_RE_EDITEURS_ROMAJI = re.compile('(?=(' + '|'.join(map(re.escape, _ROMAJI_PAR_LONGUEUR)) + '))')
+
+
+@lru_cache(maxsize=4096)
+def _cle_editeur(editeur: str) -> str:
+    """normaliser_editeur sans la recherche par préfixe (label exact uniquement)."""
+    cle = editeur.translate(_TABLE_CLE_EDITEUR).lower()
+    return _LABEL_VERS_PARENT.get(cle, cle)
+
+
+@lru_cache(maxsize=4096)
 def normaliser_editeur(editeur: str) -> str:
     """
     Normalise le nom d'un éditeur pour permettre la comparaison.
@@ -60,150 +287,28 @@ def normaliser_editeur(editeur: str) -> str:
     - "角川コミックス・エース" → "kadokawa"  (label Kadokawa)
     - "Kadokawa Sneaker Bunko" → "kadokawa"
     - "Shonen Magazine" → "kodansha"
+    - "Dengeki Comics NEXT" → "kadokawa"  (plus long préfixe connu : dengekicomics)
     """
     if not editeur:
         return ""
     
-    # Table label → éditeur parent (en minuscules, sans espaces/ponctuation)
-    # Appliquée APRÈS le nettoyage de base
-    LABEL_VERS_PARENT = {
-        # === KODANSHA ===
-        'shonenmagazine': 'kodansha',
-        'shonenmagazinekc': 'kodansha',
-        'magazinekc': 'kodansha',
-        'kcdeluxe': 'kodansha',
-        'kc': 'kodansha',
-        'youngmagazine': 'kodansha',
-        'youngmagazinekc': 'kodansha',
-        'morning': 'kodansha',
-        'morningkc': 'kodansha',
-        'afternoon': 'kodansha',
-        'afternoonkc': 'kodansha',
-        'eveningkc': 'kodansha',
-        'kodansha': 'kodansha',
-        'kodanshacomics': 'kodansha',
-        'kcmanga': 'kodansha',
-        'sirius': 'kodansha',
-        'siriuskc': 'kodansha',
-        'rivierekc': 'kodansha',
-        'palcykc': 'kodansha',
-        'dayscomics': 'kodansha',
-        # === KADOKAWA ===
-        'kadokawa': 'kadokawa',
-        'kadokawacomics': 'kadokawa',
-        'kadokawacomicsace': 'kadokawa',
-        'kadokawasneakerbunko': 'kadokawa',
-        'dengeki': 'kadokawa',
-        'dengekicomics': 'kadokawa',
-        'dengekibunko': 'kadokawa',
-        'dengekidaioh': 'kadokawa',
-        'asciimediaworks': 'kadokawa',
-        'mediaworks': 'kadokawa',
-        'enterbrain': 'kadokawa',
-        'mfbunko': 'kadokawa',
-        'mfbunkoj': 'kadokawa',
-        'mfc': 'kadokawa',
-        'dragoncomicsage': 'kadokawa',
-        'dragoncomics': 'kadokawa',
-        'compace': 'kadokawa',
-        'comptiq': 'kadokawa',
-        'bcomicskadoboku': 'kadokawa',
-        'flos': 'kadokawa',
-        'floscomics': 'kadokawa',
-        # === SHUEISHA ===
-        'shueisha': 'shueisha',
-        'jumpcomics': 'shueisha',
-        'youngjump': 'shueisha',
-        'youngjumpcomics': 'shueisha',
-        'grandjump': 'shueisha',
-        'ultrajump': 'shueisha',
-        'margaretcomics': 'shueisha',
-        'ribon': 'shueisha',
-        'ribbon': 'shueisha',
-        'dashxbunko': 'shueisha',
-        # === SHOGAKUKAN ===
-        'shogakukan': 'shogakukan',
-        'sunday': 'shogakukan',
-        'sundaycomics': 'shogakukan',
-        'bigcomics': 'shogakukan',
-        'bigcomic': 'shogakukan',
-        'bigcomicsspirits': 'shogakukan',
-        'flowercomics': 'shogakukan',
-        'gangan': 'shogakukan',
-        'uracomics': 'shogakukan',
-        # === SQUARE ENIX ===
-        'squareenix': 'squareenix',
-        'gangancomics': 'squareenix',
-        'gangancomicsonline': 'squareenix',
-        'gangancomicsjoker': 'squareenix',
-        'gfantasy': 'squareenix',
-        'younggangan': 'squareenix',
-        'biggangancomics': 'squareenix',
-        # === HAKUSENSHA ===
-        'hakusensha': 'hakusensha',
-        'younganimal': 'hakusensha',
-        'younganimalcomics': 'hakusensha',
-        'hanatoname': 'hakusensha',
-        'hanatoamecomics': 'hakusensha',
-        'lala': 'hakusensha',
-        'melody': 'hakusensha',
-        'jets': 'hakusensha',
-        'jetscomics': 'hakusensha',
-        # === AKITA SHOTEN ===
-        'akitashoten': 'akitashoten',
-        'champion': 'akitashoten',
-        'championcomics': 'akitashoten',
-        'shonenchampion': 'akitashoten',
-        # === AUTRES ===
-        'ichijinsha': 'ichijinsha',
-        'gene': 'ichijinsha',
-        'rexcomics': 'ichijinsha',
-        'futabasha': 'futabasha',
-        'action': 'futabasha',
-        'actioncomics': 'futabasha',
-        'houbunsha': 'houbunsha',
-        'harta': 'kadokawa',    # Harta est un label Kadokawa (via Enterbrain)
-        'hartacomics': 'kadokawa',
-        'hue': 'kadokawa',
-        'bunch': 'coamix',
-        'bunchcomics': 'coamix',
-        'coamix': 'coamix',
-        'overlap': 'overlap',
-        'overlapbunko': 'overlap',
-        'hobbyjapan': 'hobbyjapan',
-        'hjbunko': 'hobbyjapan',
-        'sbcreative': 'sbcreative',
-        'gabunko': 'sbcreative',
-        'heroes': 'heroes',
-        'heroescomics': 'heroes',
-        'flexcomics': 'flexcomics',
-        'maggarden': 'maggarden',
-        'bladecomics': 'maggarden',
-        'leed': 'leed',
-        'ran': 'leed',
-        'northstarspictures': 'northstarspictures',
-        'shinchosha': 'shinchosha',
-        'bungeishunju': 'bungeishunju',
-        'kobunsha': 'kobunsha',
-        'gentosha': 'gentosha',
-        'shonengazosha': 'shonengazosha',
-        'pixiv': 'pixiv',
-    }
-    
-    # Supprimer les espaces
-    editeur = editeur.replace(' ', '').replace('　', '')
-    
-    # Supprimer les caractères de ponctuation
-    editeur = editeur.replace('・', '').replace('-', '').replace('−', '')
-    
-    # Convertir en minuscules pour la comparaison
-    editeur = editeur.lower()
+    # Supprimer espaces et ponctuation, puis passer en minuscules
+    cle = editeur.translate(_TABLE_CLE_EDITEUR).lower()
     
     # Résoudre le label vers l'éditeur parent
-    if editeur in LABEL_VERS_PARENT:
-        return LABEL_VERS_PARENT[editeur]
+    parent = _LABEL_VERS_PARENT.get(cle)
+    if parent is not None:
+        return parent
     
-    return editeur
+    # Sinon le plus long label connu en préfixe, suivi uniquement de suffixes
+    # d'impression (comics, bunko, next...)
+    for longueur in _LONGUEURS_LABELS:
+        if longueur < len(cle):
+            parent = _LABEL_VERS_PARENT.get(cle[:longueur])
+            if parent is not None and _RE_SUFFIXES_LABEL.fullmatch(cle, longueur):
+                return parent
+    
+    return cle
 
 
 def editeur_match(editeur_volume: str, editeur_officiel: str) -> bool:
@@ -215,104 +320,38 @@ def editeur_match(editeur_volume: str, editeur_officiel: str) -> bool:
     if not editeur_volume or not editeur_officiel:
         return True  # Pas de filtre si info manquante
     a = normaliser_editeur(editeur_volume)
-    b = normaliser_editeur(editeur_officiel) if editeur_officiel == editeur_officiel.lower() else normaliser_editeur(editeur_officiel)
+    b = normaliser_editeur(editeur_officiel)
     # L'un contient l'autre (kadokawacomics contient kadokawa, ou l'inverse)
+    if a in b or b in a:
+        return True
+    # Sans la résolution par préfixe : une paire acceptée sans elle le reste
+    a = _cle_editeur(editeur_volume)
+    b = _cle_editeur(editeur_officiel)
     return a in b or b in a
 
 
+@lru_cache(maxsize=4096)
 def convertir_editeur_romaji(editeur: str) -> str:
     """
     Convertit le nom d'un éditeur japonais en romaji.
     
-    Maintient une table de correspondance des éditeurs majeurs.
+    Correspondance exacte dans _EDITEURS_ROMAJI, sinon le plus long nom connu
+    contenu dans la chaîne ; à défaut, la chaîne est retournée telle quelle.
     """
     if not editeur:
         return ""
     
-    # Table de correspondance éditeurs japonais → romaji
-    EDITEURS_ROMAJI = {
-        # Majeurs
-        'KADOKAWA': 'Kadokawa',
-        '角川書店': 'Kadokawa',
-        'カドカワ': 'Kadokawa',
-        '角川': 'Kadokawa',
-        '講談社': 'Kodansha',
-        '小学館': 'Shogakukan',
-        '集英社': 'Shueisha',
-        'スクウェア・エニックス': 'Square Enix',
-        'スクエニ': 'Square Enix',
-        '白泉社': 'Hakusensha',
-        '秋田書店': 'Akita Shoten',
-        '双葉社': 'Futabasha',
-        '芳文社': 'Houbunsha',
-        '一迅社': 'Ichijinsha',
-        'アスキー・メディアワークス': 'ASCII Media Works',
-        'メディアワークス': 'Media Works',
-        '電撃': 'Dengeki',
-        'マッグガーデン': 'Mag Garden',
-        'エンターブレイン': 'Enterbrain',
-        'ホビージャパン': 'Hobby Japan',
-        'オーバーラップ': 'Overlap',
-        'アース・スター': 'Earth Star',
-        'SBクリエイティブ': 'SB Creative',
-        'ソフトバンク': 'SoftBank',
-        '新潮社': 'Shinchosha',
-        '文藝春秋': 'Bungeishunju',
-        '光文社': 'Kobunsha',
-        '幻冬舎': 'Gentosha',
-        'リイド社': 'Leed',
-        '少年画報社': 'Shonen Gahosha',
-        'コアミックス': 'Coamix',
-        'ノース・スターズ・ピクチャーズ': 'North Stars Pictures',
-        # Labels/Collections
-        '角川コミックス': 'Kadokawa Comics',
-        '角川スニーカー文庫': 'Kadokawa Sneaker Bunko',
-        '電撃コミックス': 'Dengeki Comics',
-        '電撃文庫': 'Dengeki Bunko',
-        '少年マガジン': 'Shonen Magazine',
-        'マガジンKC': 'Magazine KC',
-        'ヤングマガジン': 'Young Magazine',
-        'ジャンプコミックス': 'Jump Comics',
-        'サンデー': 'Sunday',
-        'ガンガン': 'Gangan',
-        'ビッグコミックス': 'Big Comics',
-        'ビッグコミック': 'Big Comics',
-        'モーニング': 'Morning',
-        'アフタヌーン': 'Afternoon',
-        'ハルタ': 'Harta',
-        'ハルタコミックス': 'Harta Comics',
-        'MFC': 'MFC',
-        'MF文庫': 'MF Bunko',
-        'フレックスコミックス': 'Flex Comics',
-        'ヒーローズ': 'Heroes',
-        'バンチ': 'Bunch',
-        'BUNCH': 'Bunch',
-        'アクション': 'Action',
-        'ヤングアニマル': 'Young Animal',
-        'チャンピオン': 'Champion',
-        'ジーン': 'Gene',
-        'ピクシブ': 'Pixiv',
-        'フロース': 'Flos',
-        'ヒュー': 'Hue',
-        '乱': 'Ran',
-        'KC': 'KC',
-        'KCデラックス': 'KC Deluxe',
-    }
-    
     # Chercher une correspondance exacte
-    if editeur in EDITEURS_ROMAJI:
-        return EDITEURS_ROMAJI[editeur]
+    romaji = _EDITEURS_ROMAJI.get(editeur)
+    if romaji is not None:
+        return romaji
     
     # Chercher une correspondance partielle (du plus long au plus court pour éviter les faux positifs)
-    for jp, romaji in sorted(EDITEURS_ROMAJI.items(), key=lambda x: -len(x[0])):
-        if jp in editeur:
-            return romaji
-    
-    # Si déjà en romaji/anglais, retourner tel quel
-    if re.match(r'^[A-Za-z\s\-\.]+$', editeur):
-        return editeur
+    trouves = [m.group(1) for m in _RE_EDITEURS_ROMAJI.finditer(editeur)]
+    if trouves:
+        return _EDITEURS_ROMAJI[min(trouves, key=_RANG_ROMAJI.__getitem__)]
     
-    # Sinon retourner l'original
+    # Déjà en romaji/anglais, ou inconnu : retourner l'original
     return editeur
 
 
@@ -391,58 +430,80 @@ def est_ebook(url: str, titre: str) -> bool:
     return any(mot in titre for mot in mots_cles)
 
 
+# Marqueurs cherchés en une seule passe sur un titre de résultat : produits
+# dérivés (config.MOTS_CLES_DERIVES) et composants des lots/sets. Lookahead :
+# les marqueurs qui se chevauchent ("全巻セット" → 全巻, 巻セット, セット) sont tous vus.
+_MARQUEURS_TITRE = {mot: 'derive' for mot in config.MOTS_CLES_DERIVES}
+_MARQUEURS_TITRE.update({'巻セット': 'tomes_set', 'セット': 'set', '1-': 'plage', '全巻': 'integrale'})
+_RE_MARQUEURS_TITRE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_MARQUEURS_TITRE, key=len, reverse=True))) + '))')
+
+
+@lru_cache(maxsize=4096)
+def marqueurs_titre(titre: str) -> frozenset:
+    """Marqueurs présents dans le titre : 'derive', 'tomes_set', 'set', 'plage', 'integrale'."""
+    return frozenset(_MARQUEURS_TITRE[m.group(1)] for m in _RE_MARQUEURS_TITRE.finditer(titre))
+
+
+def est_produit_derive(titre: str) -> bool:
+    """Produit dérivé (cosplay, figurine, guide...) d'après config.MOTS_CLES_DERIVES"""
+    return 'derive' in marqueurs_titre(titre)
+
+
+def est_lot_titre(titre: str) -> bool:
+    """Lot/set : "巻セット", ou "セット" avec une plage "1-" ou "全巻"."""
+    marqueurs = marqueurs_titre(titre)
+    return 'tomes_set' in marqueurs or ('set' in marqueurs and ('plage' in marqueurs or 'integrale' in marqueurs))
+
+
 # ============================================================================
 # NORMALISATION TITRE
 # ============================================================================
 
+# Correspondances caractère → caractère de normaliser_titre (une seule passe str.translate)
+_TABLE_TITRE = str.maketrans({
+    # Lettres grecques visuellement similaires aux latines
+    'Α': 'A', 'Β': 'B', 'Ε': 'E', 'Ζ': 'Z', 'Η': 'H', 'Ι': 'I',
+    'Κ': 'K', 'Μ': 'M', 'Ν': 'N', 'Ο': 'O', 'Ρ': 'P', 'Τ': 'T',
+    'Υ': 'Y', 'Χ': 'X',
+    'α': 'a', 'β': 'b', 'ε': 'e', 'ζ': 'z', 'η': 'h', 'ι': 'i',
+    'κ': 'k', 'μ': 'm', 'ν': 'n', 'ο': 'o', 'ρ': 'p', 'τ': 't',
+    'υ': 'y', 'χ': 'x',
+    # Tirets variés → tiret ASCII (SAUF ー chōon katakana U+30FC)
+    '―': '-', '─': '-', '—': '-', '–': '-', '−': '-', '〜': '-', '～': '-',
+    # Ponctuation pleine largeur → ASCII (certaines survivent à NFKC)
+    '！': '!', '？': '?', '（': '(', '）': ')',
+    '：': ':', '；': ';', '，': ',', '。': '.',
+})
+
+# Équivalences hiragana/kanji courantes (une seule substitution, alternance du plus long au plus court)
+_EQUIVALENCES_TITRE = {
+    'わたしの': '私の',  # watashi no
+    'わたし': '私',      # watashi
+    'ぼく': '僕',        # boku
+    'おれ': '俺',        # ore
+    'かれ': '彼',        # kare
+    'かのじょ': '彼女',  # kanojo
+}
+_RE_EQUIVALENCES_TITRE = re.compile('|'.join(
+    re.escape(k) for k in sorted(_EQUIVALENCES_TITRE, key=len, reverse=True)))
+
+
+@lru_cache(maxsize=8192)
 def normaliser_titre(texte: str) -> str:
     """
     Normalise les variations de caractères pour la comparaison de titres.
     Gère : NFKC (pleine largeur→demi), lettres grecques→latines, tirets,
     ponctuation, équivalences hiragana/kanji.
     Note : ne met PAS en lowercase (les appelants le font si nécessaire).
+    Résultat mémorisé par titre (LRU) : la clé de série est renormalisée à chaque item.
     """
     # NFKC : pleine largeur → demi-largeur, ligatures, compatibilité
     texte = unicodedata.normalize('NFKC', texte)
-    
-    # Lettres grecques visuellement similaires aux latines
-    greek_to_latin = {
-        'Α': 'A', 'Β': 'B', 'Ε': 'E', 'Ζ': 'Z', 'Η': 'H', 'Ι': 'I',
-        'Κ': 'K', 'Μ': 'M', 'Ν': 'N', 'Ο': 'O', 'Ρ': 'P', 'Τ': 'T',
-        'Υ': 'Y', 'Χ': 'X',
-        'α': 'a', 'β': 'b', 'ε': 'e', 'ζ': 'z', 'η': 'h', 'ι': 'i',
-        'κ': 'k', 'μ': 'm', 'ν': 'n', 'ο': 'o', 'ρ': 'p', 'τ': 't',
-        'υ': 'y', 'χ': 'x',
-    }
-    for greek, latin in greek_to_latin.items():
-        texte = texte.replace(greek, latin)
-    
-    # Tirets variés → tiret ASCII (SAUF ー chōon katakana U+30FC)
-    for ch in ['―', '─', '—', '–', '−', '〜', '～']:
-        texte = texte.replace(ch, '-')
-    
-    # Ponctuation pleine largeur → ASCII (certaines survivent à NFKC)
-    texte = texte.replace('！', '!').replace('？', '?')
-    texte = texte.replace('（', '(').replace('）', ')')
-    texte = texte.replace('：', ':').replace('；', ';')
-    texte = texte.replace('，', ',').replace('。', '.')
-    
-    # Équivalences hiragana/kanji courantes
-    equivalences = [
-        ('わたし', '私'),      # watashi
-        ('わたしの', '私の'),  # watashi no
-        ('ぼく', '僕'),        # boku
-        ('おれ', '俺'),        # ore
-        ('かれ', '彼'),        # kare
-        ('かのじょ', '彼女'),  # kanojo
-    ]
-    for hiragana, kanji in equivalences:
-        texte = texte.replace(hiragana, kanji)
-    
+    texte = texte.translate(_TABLE_TITRE)
+    texte = _RE_EQUIVALENCES_TITRE.sub(lambda m: _EQUIVALENCES_TITRE[m.group()], texte)
     # Espaces multiples → espace simple
-    texte = ' '.join(texte.split())
-    
-    return texte.strip()
+    return ' '.join(texte.split())
 
 
 def normaliser_url(url: str) -> str:
@@ -494,6 +555,157 @@ def _tome_val(s: str):
     return int(v) if v == int(v) else v
 
 
+# --- Moteur de règles (compilé une fois au chargement du module) ---
+
+_RE_DAI = re.compile(r'第\s*(\d+)\s*[巻集]')
+_RE_KAN = re.compile(r'0*(\d+(?:[.,]\d+)?)\s*巻')
+_RE_PARENTHESES = re.compile(r'[（(]\s*0*(\d+(?:[.,]\d+)?)\s*[)）]')
+_RE_FINAL = re.compile(r'[\s　](\d{1,2})[（(]完[)）]')
+_RE_VOL = re.compile(r'vol(?:ume)?\.?\s*0*(\d+)', re.IGNORECASE)
+# Alternances romains / kanji dans l'ordre des dictionnaires (du plus long au plus court) ;
+# le séparateur de fin est en lookahead pour que des chiffres consécutifs soient tous vus
+_RE_ROMAINS = re.compile(r'\s(' + '|'.join(CHIFFRES_ROMAINS) + r')(?=\s|$|[)）]|巻)')
+_RE_KANJI = re.compile(r'[\s　](' + '|'.join(CHIFFRES_KANJI) + r')(?=\s|　|$|[)）(（]|巻)')
+_RE_SPECIAUX = [(re.compile(pattern), numero) for pattern, numero in FORMATS_SPECIAUX.items()]
+_RE_AVANT_PAREN = re.compile(r'\s(\d+)\s+[（(]')
+_RE_TIRET = re.compile(r'[\s　]?[-−]\s*(\d{1,2})(?:\s|$|[（(])')
+_RE_COLLE_JP = re.compile(_JP + r'(\d{1,2})\s+\S')
+_RE_ENTRE_JP = re.compile(_JP + r'\s+(\d{1,2})\s+' + _JP)
+_RE_FIN = re.compile(r'[\s　](\d{1,2})\s*$')
+_RE_ISOLE = re.compile(r'(?<![0-9])(\d{1,2})(?![0-9])')
+
+_RANG_ROMAINS = {romain: rang for rang, romain in enumerate(CHIFFRES_ROMAINS)}
+_RANG_KANJI = {kanji: rang for rang, kanji in enumerate(CHIFFRES_KANJI)}
+
+
+def _prioritaire(regex, titre: str, rangs: Dict[str, int]) -> Optional[str]:
+    """Chiffre trouvé le plus haut dans l'ordre du dictionnaire (et non le plus à gauche)."""
+    trouves = {m.group(1) for m in regex.finditer(titre)}
+    return min(trouves, key=rangs.__getitem__) if trouves else None
+
+
+def _regle_dai(titre):
+    match = _RE_DAI.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_kan(titre):
+    if '巻セット' in titre:  # hors lots
+        return None
+    match = _RE_KAN.search(titre)
+    return _tome_val(match.group(1)) if match else None
+
+
+def _regle_parentheses(titre):
+    match = _RE_PARENTHESES.search(titre)
+    return _tome_val(match.group(1)) if match else None
+
+
+def _regle_final(titre):
+    match = _RE_FINAL.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_vol(titre):
+    match = _RE_VOL.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_romain(titre):
+    romain = _prioritaire(_RE_ROMAINS, titre, _RANG_ROMAINS)
+    return CHIFFRES_ROMAINS[romain] if romain else None
+
+
+def _regle_kanji(titre):
+    kanji = _prioritaire(_RE_KANJI, titre, _RANG_KANJI)
+    return CHIFFRES_KANJI[kanji] if kanji else None
+
+
+def _regle_special(titre):
+    for regex, numero in _RE_SPECIAUX:
+        if regex.search(titre):
+            return numero
+    return None
+
+
+def _regle_avant_paren(titre):
+    match = _RE_AVANT_PAREN.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_tiret(titre):
+    match = _RE_TIRET.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_colle_jp(titre):
+    match = _RE_COLLE_JP.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_entre_jp(titre):
+    match = _RE_ENTRE_JP.search(titre)
+    return int(match.group(1)) if match and int(match.group(1)) <= 50 else None
+
+
+def _regle_fin(titre):
+    match = _RE_FIN.search(titre)
+    return int(match.group(1)) if match else None
+
+
+def _regle_isole(titre):
+    # Ignore les grands nombres comme 9004 qui font partie du titre
+    if len(titre) <= 10:
+        return None
+    match = _RE_ISOLE.search(titre[10:])
+    return int(match.group(1)) if match and int(match.group(1)) <= 50 else None
+
+
+# Règles dans l'ordre d'application (du plus spécifique au plus générique)
+REGLES_TOME = (
+    # --- Patterns précis (sans ambiguïté) ---
+    ('dai', _regle_dai),                  # 1.  第X巻 / 第X集 — format japonais formel
+    ('kan', _regle_kan),                  # 2.  X巻 / X.5巻 — format japonais simple
+    ('parentheses', _regle_parentheses),  # 3.  (X) / （X） / (X.5)
+    ('final', _regle_final),              # 4.  X（完） — tome final
+    ('vol', _regle_vol),                  # 5.  Vol.X / Volume X — format occidental
+    ('romain', _regle_romain),            # 6.  Chiffres romains — I, II, III...
+    ('kanji', _regle_kanji),              # 7.  Chiffres kanji — 一, 二, 三...
+    ('special', _regle_special),          # 8.  上/下/前/後/完結
+    # --- Patterns moins précis (fallbacks) ---
+    ('avant_paren', _regle_avant_paren),  # 9.  " X (" — chiffre isolé devant parenthèse
+    ('tiret', _regle_tiret),              # 10. -X / −X
+    ('colle_jp', _regle_colle_jp),        # 11. collé à la fin d'un mot japonais : しました1 MFC
+    ('entre_jp', _regle_entre_jp),        # 12. entre japonais : す 1 懲
+    ('fin', _regle_fin),                  # 13. fin de titre : タイトル 7
+    ('isole', _regle_isole),              # 14. dernier recours : 1-2 chiffres après les 10 premiers chars
+)
+
+# Règle ayant donné le tome, par appel (None : aucun tome) — voir log_regles_tome()
+STATS_REGLES_TOME = Counter()
+
+
+@lru_cache(maxsize=4096)
+def _appliquer_regles_tome(titre: str):
+    for nom, regle in REGLES_TOME:
+        tome = regle(titre)
+        if tome is not None:
+            return tome, nom
+    return None, None
+
+
+def extraire_numero_tome_detail(titre: str):
+    """
+    Comme extraire_numero_tome(), mais retourne (tome, nom de la règle appliquée),
+    ou (None, None). Résultat mémorisé par titre (LRU).
+    """
+    if not titre:
+        return None, None
+    resultat = _appliquer_regles_tome(str(titre))
+    STATS_REGLES_TOME[resultat[1]] += 1
+    return resultat
+
+
 def extraire_numero_tome(titre: str):
     """
     Extrait le numéro de tome depuis un titre Amazon japonais.
@@ -503,108 +715,24 @@ def extraire_numero_tome(titre: str):
     - extraire_infos_featured() (résultat de recherche)
     - pipeline.py (corrections et recherche étendue)
     
-    Patterns testés dans l'ordre (du plus spécifique au plus générique) :
-    1.  第X巻 / 第X集         — format japonais formel
-    2.  X巻                   — format japonais simple
-    3.  (X) / （X）           — parenthèses (le plus courant)
-    4.  X（完）               — tome final
-    5.  Vol.X / Volume X      — format occidental
-    6.  Chiffres romains      — I, II, III...
-    7.  Chiffres kanji        — 一, 二, 三...
-    8.  上/下/前/後           — formats spéciaux
-    9.  " X (" avant paren   — chiffre isolé devant parenthèse
-    10. -X / −X              — tiret suivi d'un numéro
-    11. Collé fin JP          — しました1 MFC
-    12. Entre japonais        — す 1 懲 (chiffre entre deux kanji/kana)
-    13. Fin de titre          — タイトル 7
-    14. Dernier recours       — chiffre 1-2 digits isolé (après 10 premiers chars)
+    Les règles sont appliquées dans l'ordre de REGLES_TOME (du plus spécifique
+    au plus générique) ; la première qui trouve un numéro l'emporte.
     
     Returns:
         int ou None. Peut aussi retourner 'FIN' pour 完結編.
     """
-    if not titre:
-        return None
-    
-    titre = str(titre)
-    
-    # --- Patterns précis (sans ambiguïté) ---
-    
-    # 1. 第X巻 / 第X集 (format japonais formel)
-    match = re.search(r'第\s*(\d+)\s*[巻集]', titre)
-    if match:
-        return int(match.group(1))
-
-    # 2. X巻 ou X.5巻 (format japonais simple, hors lots)
-    if '巻セット' not in titre:
-        match = re.search(r'0*(\d+(?:[.,]\d+)?)\s*巻', titre)
-        if match:
-            return _tome_val(match.group(1))
-
-    # 3. (X) / （X） / (X.5) — parenthèses, avec ou sans décimale
-    match = re.search(r'[（(]\s*0*(\d+(?:[.,]\d+)?)\s*[)）]', titre)
-    if match:
-        return _tome_val(match.group(1))
-    
-    # 4. X（完）— tome final avec marqueur de fin
-    match = re.search(r'[\s　](\d{1,2})[（(]完[)）]', titre)
-    if match:
-        return int(match.group(1))
-    
-    # 5. Vol.X / Volume X / vol X (format occidental)
-    match = re.search(r'vol(?:ume)?\.?\s*0*(\d+)', titre, re.IGNORECASE)
-    if match:
-        return int(match.group(1))
-    
-    # 6. Chiffres romains isolés (espace avant + espace/fin/parenthèse/巻 après)
-    for romain, numero in CHIFFRES_ROMAINS.items():
-        if re.search(r'\s' + romain + r'(\s|$|[)）]|巻)', titre):
-            return numero
-    
-    # 7. Chiffres kanji (espace avant + espace/fin/parenthèse/巻 après)
-    for kanji, numero in CHIFFRES_KANJI.items():
-        if re.search(r'[\s　]' + kanji + r'(\s|　|$|[)）(（]|巻)', titre):
-            return numero
-    
-    # 8. Formats spéciaux japonais 上/下/前/後/完結
-    for pattern, numero in FORMATS_SPECIAUX.items():
-        if re.search(pattern, titre):
-            return numero
-    
-    # --- Patterns moins précis (fallbacks) ---
-    
-    # 9. Chiffre isolé devant parenthèse : " 2 (" ou " 2 （"
-    match = re.search(r'\s(\d+)\s+[（(]', titre)
-    if match:
-        return int(match.group(1))
-    
-    # 10. Tiret suivi d'un numéro : "-4" ou "−4"
-    match = re.search(r'[\s　]?[-−]\s*(\d{1,2})(?:\s|$|[（(])', titre)
-    if match:
-        return int(match.group(1))
-    
-    # 11. Numéro collé à la fin d'un mot japonais : "しました1 MFC"
-    match = re.search(_JP + r'(\d{1,2})\s+\S', titre)
-    if match:
-        return int(match.group(1))
-    
-    # 12. Chiffre isolé entre caractères japonais : "す 1 懲"
-    match = re.search(_JP + r'\s+(\d{1,2})\s+' + _JP, titre)
-    if match and int(match.group(1)) <= 50:
-        return int(match.group(1))
-    
-    # 13. Chiffre en fin de titre : "タイトル 7"
-    match = re.search(r'[\s　](\d{1,2})\s*$', titre)
-    if match:
-        return int(match.group(1))
-    
-    # 14. Dernier recours : chiffre 1-2 digits isolé (après les 10 premiers chars)
-    # Ignore les grands nombres comme 9004 qui font partie du titre
-    if len(titre) > 10:
-        match = re.search(r'(?<![0-9])(\d{1,2})(?![0-9])', titre[10:])
-        if match and int(match.group(1)) <= 50:
-            return int(match.group(1))
-    
-    return None
+    return extraire_numero_tome_detail(titre)[0]
+
+
+def log_regles_tome():
+    """Répartition des titres par règle de tome (taux de hit de chaque règle)."""
+    total = sum(STATS_REGLES_TOME.values())
+    if not total:
+        return
+    cache = _appliquer_regles_tome.cache_info()
+    repartition = ', '.join(f"{nom or 'aucune'} {nb * 100 / total:.0f}%"
+                            for nom, nb in STATS_REGLES_TOME.most_common())
+    config.logger.info(f"🔢 Tomes: {total} titre(s) analysé(s) ({cache.hits} depuis le mémo) | {repartition}")
 
 
 def analyser_tomes_manquants(volumes: List[Dict]) -> Dict: